@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import platform
+import statistics
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class Benchmark:
+    """
+    Benchmark class times a coroutine function and records its latency and allocation profile.
+
+    Timing and allocation tracking are done in separate passes, because tracemalloc slows every
+    allocation down and would otherwise distort the latency figures.
+
+    Attributes:
+        iterations (int): The number of timed calls.
+        warmup (int): The number of untimed calls made before timing starts.
+        alloc_iterations (int): The number of calls made with tracemalloc enabled.
+
+    Methods:
+        percentile(samples, q): Returns the q-th percentile of sorted samples.
+        run(fn): Times fn and returns a result dictionary.
+
+    Example usage:
+        benchmark = Benchmark(iterations=100, warmup=10)
+        result = asyncio.run(benchmark.run(your_coroutine_function))
+        print(result['mean_ns'], result['p50_ns'], result['p99_ns'])
+    """
+    def __init__(self, iterations=100, warmup=10, alloc_iterations=10):
+        if iterations <= 0:
+            raise ValueError('iterations must be positive')
+        self.iterations = iterations
+        self.warmup = warmup
+        self.alloc_iterations = alloc_iterations
+
+    @staticmethod
+    def percentile(samples, q):
+        """
+        Returns the q-th percentile of sorted samples, using the nearest-rank method.
+
+        Parameters:
+            samples (list): The sorted samples.
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            int: The percentile value.
+        """
+        rank = max(int(-(-q * len(samples) // 100)), 1)
+        return samples[rank - 1]
+
+    async def run(self, fn):
+        """
+        Times fn and profiles its allocations.
+
+        Parameters:
+            fn (function): A coroutine function taking no arguments.
+
+        Returns:
+            dict: A dictionary containing 'samples', 'mean_ns', 'p50_ns', 'p99_ns', 'min_ns', 'max_ns',
+                  'alloc_bytes' (mean bytes still held after a call) and 'alloc_peak_bytes' (peak traced memory during a call).
+        """
+        for _ in range(self.warmup):
+            await fn()
+
+        samples = []
+        for _ in range(self.iterations):
+            start = time.perf_counter_ns()
+            await fn()
+            samples.append(time.perf_counter_ns() - start)
+        samples.sort()
+
+        allocated = []
+        peak = 0
+        tracemalloc.start()
+        try:
+            for _ in range(self.alloc_iterations):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                await fn()
+                current, call_peak = tracemalloc.get_traced_memory()
+                allocated.append(max(current - before, 0))
+                peak = max(peak, call_peak - before)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'samples': len(samples),
+            'mean_ns': int(statistics.fmean(samples)),
+            'p50_ns': self.percentile(samples, 50),
+            'p99_ns': self.percentile(samples, 99),
+            'min_ns': samples[0],
+            'max_ns': samples[-1],
+            'alloc_bytes': int(statistics.fmean(allocated)) if allocated else 0,
+            'alloc_peak_bytes': peak
+        }
+
+
+async def run_matrix(scenarios, benchmark, only=None):
+    """
+    Runs every scenario of the matrix through the benchmark.
+
+    Parameters:
+        scenarios (Scenarios): The scenario builder.
+        benchmark (Benchmark): The benchmark to run each phase with.
+        only (list, optional): Scenario names to restrict the run to.
+
+    A phase whose KDF or factor backend is not installed is recorded as None, with the missing module
+    under 'skipped', so one absent backend does not abort the whole run.
+
+    Returns:
+        list: One result dictionary per scenario, each containing 'name', 'setup' and 'derive', and
+              'skipped' mapping a skipped phase to the reason.
+    """
+    results = []
+    for name, (setup, derive) in scenarios.matrix().items():
+        if only and name not in only:
+            continue
+        entry = {'name': name}
+        for phase, fn in (('setup', setup), ('derive', derive)):
+            print(f'{name}: {phase}', file=sys.stderr)
+            try:
+                entry[phase] = await benchmark.run(fn)
+            except ImportError as error:
+                print(f'{name}: {phase} skipped, {error}', file=sys.stderr)
+                entry[phase] = None
+                entry.setdefault('skipped', {})[phase] = f'missing backend {error.name}'
+        results.append(entry)
+    return results
+
+
+def environment():
+    """
+    Describes the host the benchmark ran on, so results from different machines are not compared blindly.
+
+    Returns:
+        dict: A dictionary describing the interpreter, platform and CPU count.
+    """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'timestamp': int(time.time())
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Compares results against a baseline run.
+
+    Parameters:
+        results (dict): The current benchmark document.
+        baseline (dict): A previous benchmark document.
+        tolerance (float): The allowed relative slowdown of p50, e.g. 0.1 for 10%.
+
+    Returns:
+        list: A list of (name, phase, baseline_ns, current_ns) tuples for every regressed phase.
+    """
+    previous = {entry['name']: entry for entry in baseline['results']}
+    found = []
+    for entry in results['results']:
+        if entry['name'] not in previous:
+            continue
+        for phase in ('setup', 'derive'):
+            if not previous[entry['name']].get(phase) or not entry.get(phase):
+                continue
+            before = previous[entry['name']][phase]['p50_ns']
+            after = entry[phase]['p50_ns']
+            if after > before * (1 + tolerance):
+                found.append((entry['name'], phase, before, after))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time SKDF setup and derive, and write the results to JSON and HTML.')
+    parser.add_argument('--iterations', type=int, default=100, help='timed calls per phase')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed calls per phase before timing')
+    parser.add_argument('--alloc-iterations', type=int, default=10, help='calls per phase traced for allocations')
+    parser.add_argument('--only', action='append', help='restrict the run to a scenario name (repeatable)')
+    parser.add_argument('--output', default=os.path.join(HERE, 'results.json'), help='results JSON path')
+    parser.add_argument('--html', default=os.path.join(HERE, 'SKDF_Benchmarking.html'), help='HTML report path')
+    parser.add_argument('--baseline', help='previous results JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative p50 slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    from scenarios import Scenarios
+    from report import Report
+
+    benchmark = Benchmark(args.iterations, args.warmup, args.alloc_iterations)
+    document = {
+        'environment': environment(),
+        'config': {'iterations': args.iterations, 'warmup': args.warmup, 'alloc_iterations': args.alloc_iterations},
+        'results': asyncio.run(run_matrix(Scenarios(), benchmark, args.only))
+    }
+
+    with open(args.output, 'w') as handle:
+        json.dump(document, handle, indent=2)
+    Report(document).write(args.html)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            found = regressions(document, json.load(handle), args.tolerance)
+        for name, phase, before, after in found:
+            print(f'regression: {name} {phase} p50 {before} ns -> {after} ns', file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
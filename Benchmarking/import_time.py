@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Code')
+
+MODULES = [
+    'src.secrets.xor',
+    'src.secrets.combine',
+    'src.secrets.recover',
+    'src.secrets.shamir',
+    'src.setup.kdf',
+    'src.setup.executor',
+    'src.derive.factors.password',
+    'src.derive.factors.question',
+    'src.derive.factors.totp',
+    'src.derive.key',
+    'src.policy.derive'
+]
+
+HEAVY = ['numpy', 'zxcvbn', 'argon2', 'bcrypt', 'scrypt', 'pbkdf2', 'hkdf', 'jsonschema']
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(name for name in {heavy!r} if name in sys.modules))
+'''
+
+
+def measure(module, runs):
+    """
+    Imports a module in fresh interpreters and times the import.
+
+    Parameters:
+        module (str): The dotted module name, relative to the Code directory.
+        runs (int): The number of fresh interpreters to start.
+
+    Returns:
+        dict: A dictionary containing 'module', 'median_ms', 'min_ms' and 'loaded' (the heavy dependencies
+              pulled in by the import), or 'module' and 'error' if the import failed.
+    """
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+            cwd=SOURCE_ROOT, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            return {'module': module, 'error': lines[-1] if lines else 'exit status %d' % process.returncode}
+        elapsed, modules = process.stdout.split('\n')[:2]
+        timings.append(float(elapsed) * 1000)
+        loaded = [name for name in modules.split(',') if name]
+    return {
+        'module': module,
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'loaded': loaded
+    }
+
+
+def main():
+    """
+    Measures the cold-start import time of the package modules and prints or writes the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description='Measure cold-start import time of the SKDF modules.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--only', nargs='*', default=None, help='modules to measure (default: all)')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = [measure(module, args.runs) for module in (args.only or MODULES)]
+    for result in results:
+        if 'error' in result:
+            print('%-32s failed: %s' % (result['module'], result['error']))
+        else:
+            print('%-32s %9.3f ms  loads: %s' % (result['module'], result['median_ms'], ', '.join(result['loaded']) or '-'))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'python': sys.version.split()[0], 'runs': args.runs, 'results': results}, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
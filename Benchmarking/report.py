@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import html
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>SKDF Benchmarking</title>
+  <style>
+    table {{
+      width: 80%;
+      margin: 30px auto;
+      border-collapse: collapse;
+    }}
+
+    th, td {{
+      border: 1px solid #ddd;
+      padding: 8px;
+      text-align: center;
+    }}
+
+    th {{
+      background-color: #f2f2f2;
+    }}
+
+    td.stats {{
+      color: #666;
+      font-size: 0.9em;
+    }}
+
+    body {{
+      text-align: center;
+      font-family: Arial, sans-serif;
+    }}
+
+    h1 {{
+      color: #3498db;
+    }}
+
+    #participants {{
+      position: fixed;
+      bottom: 10px;
+      right: 10px;
+      color: #888;
+    }}
+
+    #description {{
+      margin: 20px 0;
+    }}
+  </style>
+</head>
+<body>
+
+  <h1>SKDF Benchmarking</h1>
+  <div id="description">
+    <p>{description}</p>
+    <p>{environment}</p>
+  </div>
+
+  <div id="participants">
+    Team Members : Bhanu, Pavan M, Aditya, Pavan K
+  </div>
+
+  <table id="resultTable">
+    <thead>
+      <tr>
+        <th rowspan="2">RESULTS</th>
+        <th colspan="2">SETUP TIME</th>
+        <th colspan="2">DERIVE TIME</th>
+      </tr>
+      <tr>
+        <th>mean</th>
+        <th>p50 / p99 / peak alloc</th>
+        <th>mean</th>
+        <th>p50 / p99 / peak alloc</th>
+      </tr>
+    </thead>
+    <tbody>
+{rows}
+    </tbody>
+  </table>
+
+</body>
+</html>
+"""
+
+ROW = """      <tr>
+        <td>{name}</td>
+        <td>{setup_mean}</td>
+        <td class="stats">{setup_stats}</td>
+        <td>{derive_mean}</td>
+        <td class="stats">{derive_stats}</td>
+      </tr>"""
+
+
+class Report:
+    """
+    Report class renders benchmark results as the SKDF_Benchmarking.html page.
+
+    Attributes:
+        document (dict): A benchmark document, as written by benchmark.py.
+
+    Methods:
+        duration(ns): Formats a duration in nanoseconds.
+        size(count): Formats a byte count.
+        render(): Returns the HTML page.
+        write(path): Writes the HTML page to a file.
+
+    Example usage:
+        with open('results.json') as handle:
+            report = Report(json.load(handle))
+        report.write('SKDF_Benchmarking.html')
+    """
+    def __init__(self, document=None):
+        self.document = document or {'results': []}
+
+    @staticmethod
+    def duration(ns):
+        """
+        Formats a duration in nanoseconds with the largest unit that keeps it at or above 1.
+
+        Parameters:
+            ns (int): The duration in nanoseconds.
+
+        Returns:
+            str: The formatted duration, e.g. '7.7 ms'.
+        """
+        for unit, scale in (('s', 10 ** 9), ('ms', 10 ** 6), ('µs', 10 ** 3)):
+            if ns >= scale:
+                return f'{ns / scale:.1f} {unit}'
+        return f'{ns} ns'
+
+    @staticmethod
+    def size(count):
+        """
+        Formats a byte count.
+
+        Parameters:
+            count (int): The number of bytes.
+
+        Returns:
+            str: The formatted size, e.g. '1.5 KiB'.
+        """
+        for unit, scale in (('MiB', 1 << 20), ('KiB', 1 << 10)):
+            if count >= scale:
+                return f'{count / scale:.1f} {unit}'
+        return f'{count} B'
+
+    def cells(self, phase, skipped=None):
+        if phase is None:
+            return ('skipped', skipped) if skipped else ('not measured', '')
+        mean = f'x̄ = {self.duration(phase["mean_ns"])}'
+        stats = f'{self.duration(phase["p50_ns"])} / {self.duration(phase["p99_ns"])} / {self.size(phase["alloc_peak_bytes"])}'
+        return mean, stats
+
+    def render(self):
+        """
+        Returns the HTML page for the benchmark document.
+
+        Returns:
+            str: The HTML page.
+        """
+        rows = []
+        for entry in self.document['results']:
+            skipped = entry.get('skipped', {})
+            setup_mean, setup_stats = self.cells(entry.get('setup'), skipped.get('setup'))
+            derive_mean, derive_stats = self.cells(entry.get('derive'), skipped.get('derive'))
+            rows.append(ROW.format(
+                name=html.escape(entry['name']),
+                setup_mean=html.escape(setup_mean),
+                setup_stats=html.escape(setup_stats),
+                derive_mean=html.escape(derive_mean),
+                derive_stats=html.escape(derive_stats)
+            ))
+
+        if 'environment' in self.document:
+            env = self.document['environment']
+            config = self.document.get('config', {})
+            description = (f'Measured with Benchmarking/benchmark.py: {config.get("iterations", "?")} timed calls per phase '
+                           f'after {config.get("warmup", "?")} warmup calls.')
+            environment = f'Python {env["python"]} ({env["implementation"]}) on {env["platform"]}, {env["cpus"]} CPUs.'
+        else:
+            description = 'No results yet. Run Benchmarking/benchmark.py to measure setup and derive on this host.'
+            environment = ''
+
+        return TEMPLATE.format(description=html.escape(description), environment=html.escape(environment), rows='\n'.join(rows))
+
+    def write(self, path):
+        """
+        Writes the HTML page to a file.
+
+        Parameters:
+            path (str): The output path.
+        """
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.render())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate SKDF_Benchmarking.html from benchmark results.')
+    parser.add_argument('--input', default=os.path.join(HERE, 'results.json'), help='results JSON path')
+    parser.add_argument('--html', default=os.path.join(HERE, 'SKDF_Benchmarking.html'), help='HTML report path')
+    args = parser.parse_args(argv)
+
+    document = None
+    if os.path.exists(args.input):
+        with open(args.input) as handle:
+            document = json.load(handle)
+    Report(document).write(args.html)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
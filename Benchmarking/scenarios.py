@@ -0,0 +1,275 @@
+import os
+import sys
+import base64
+import struct
+import time
+
+SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Code')
+if SOURCE_ROOT not in sys.path:
+    sys.path.insert(0, SOURCE_ROOT)
+
+from src.derive.key import Key
+from src.derive.factors.password import Password
+from src.derive.factors.hotp import HOTP
+from src.derive.factors.totp import TOTP
+from src.derive.factors.hmacsha import HMACSHA1
+from src.derive.factors.stack import Stack
+from src.derive.factors.otp import OTP
+from src.secrets.shamir import ShamirContext
+from src.setup.kdf import KeyDerivationFunction
+from src.setup.default import (
+    DEFAULT_KDF, DEFAULT_KEY, DEFAULT_PASSWORD, DEFAULT_HOTP, DEFAULT_TOTP, DEFAULT_STACK, DEFAULT_HMACSHA1
+)
+
+
+class Scenarios:
+    """
+    Scenarios class builds the setup and derive workloads timed by the benchmark harness.
+
+    Every scenario is a pair of coroutine functions: 'setup' performs the work done when a factor or
+    key is first enrolled, and 'derive' performs the work done on every login. The derive fixtures are
+    prepared once, outside of the timed region, so that only Key.generate_key and the factor classes
+    are measured.
+
+    Attributes:
+        size (int): The key size (bytes) used by every scenario.
+        password (str): The password presented to the password factor.
+        response (bytes): The HMAC-SHA1 response presented to the hmacsha1 factor.
+
+    Methods:
+        matrix(): Returns the ordered mapping of scenario names to (setup, derive) coroutine functions.
+        setup_password() / derive_password(): Password factor workloads.
+        setup_hotp() / derive_hotp(): HOTP factor workloads.
+        setup_totp() / derive_totp(): TOTP factor workloads.
+        setup_hmacsha1() / derive_hmacsha1(): HMAC-SHA1 factor workloads.
+        setup_stack() / derive_stack(): Stack factor workloads.
+        setup_sfkdf(k, n) / derive_sfkdf(k, n): k-of-n key workloads over password, HOTP and TOTP.
+        setup_baseline() / derive_baseline(): The final KDF alone, and a derive with no factor work.
+
+    Example usage:
+        scenarios = Scenarios()
+        for name, (setup, derive) in scenarios.matrix().items():
+            await setup()
+            await derive()
+    """
+    def __init__(self, size=DEFAULT_KEY['size'], password='Tr0ub4dour&3', response=None):
+        self.size = size
+        self.password = password
+        self.response = response if response is not None else os.urandom(20)
+        self.time = int(time.time() * 1000)
+
+    def matrix(self):
+        """
+        Returns the benchmark matrix, in report order.
+
+        Returns:
+            dict: A dictionary mapping a scenario name to a (setup, derive) tuple of coroutine functions.
+        """
+        return {
+            '3-of-3 SFKDF': (lambda: self.setup_sfkdf(3, 3), self.derive_sfkdf(3, 3)),
+            '2-of-3 SFKDF': (lambda: self.setup_sfkdf(2, 3), self.derive_sfkdf(2, 3)),
+            'Password Factor': (self.setup_password, self.derive_password()),
+            'HOTP Factor': (self.setup_hotp, self.derive_hotp()),
+            'TOTP Factor': (self.setup_totp, self.derive_totp()),
+            'Stack Factor': (self.setup_stack, self.derive_stack()),
+            'HMAC-SHA1 Factor': (self.setup_hmacsha1, self.derive_hmacsha1()),
+            'KDF Baseline': (self.setup_baseline, self.derive_baseline()),
+        }
+
+    @staticmethod
+    def hotp_offset(pad, counter, target, params):
+        """
+        Computes the offset that maps the HOTP code for a counter onto a target value.
+
+        Parameters:
+            pad (bytes): The HOTP secret.
+            counter (int): The HOTP counter.
+            target (int): The target value.
+            params (dict): A dictionary containing 'hash' and 'digits'.
+
+        Returns:
+            int: The offset.
+        """
+        return HOTP.mod(target - OTP(pad, params['hash'], params['digits']).code(counter), 10 ** params['digits'])
+
+    def policy(self, threshold, factors, kdf=DEFAULT_KDF):
+        """
+        Wraps factor entries into a key policy with random pads.
+
+        Parameters:
+            threshold (int): The number of factors required to derive the key.
+            factors (list): A list of (type, id, params) tuples.
+            kdf (dict): The KDF defaults of the policy; DEFAULT_STACK for the nested policy of a stack.
+
+        Returns:
+            dict: The key policy.
+        """
+        return {
+            'threshold': threshold,
+            'size': self.size,
+            'salt': base64.b64encode(os.urandom(self.size)).decode('utf-8'),
+            'kdf': KeyDerivationFunction.options_from_defaults(kdf),
+            'factors': [
+                {'id': factor_id, 'type': factor_type, 'params': params, 'pad': base64.b64encode(os.urandom(self.size)).decode('utf-8')}
+                for factor_type, factor_id, params in factors
+            ]
+        }
+
+    def password_params(self):
+        return {}
+
+    def hotp_params(self):
+        params = {
+            'hash': DEFAULT_HOTP['hash'],
+            'digits': DEFAULT_HOTP['digits'],
+            'pad': base64.b64encode(os.urandom(20)).decode('utf-8'),
+            'counter': 0
+        }
+        params['offset'] = self.hotp_offset(base64.b64decode(params['pad']), 1, 0, params)
+        return params
+
+    def totp_params(self, window=DEFAULT_TOTP['window']):
+        pad = os.urandom(20)
+        params = {
+            'start': self.time,
+            'hash': DEFAULT_TOTP['hash'],
+            'digits': DEFAULT_TOTP['digits'],
+            'step': DEFAULT_TOTP['step'],
+            'window': window,
+            'pad': base64.b64encode(pad).decode('utf-8'),
+            'key': b''
+        }
+        start_counter = int(self.time / (params['step'] * 1000))
+        codes = OTP(pad, params['hash'], params['digits']).codes(start_counter, start_counter + window)
+        offsets = bytearray(4 * window)
+        for index, code in enumerate(codes):
+            struct.pack_into('>I', offsets, 4 * index, HOTP.mod(-code, 10 ** params['digits']))
+        params['offsets'] = base64.b64encode(bytes(offsets)).decode('utf-8')
+        return params
+
+    def hmacsha1_params(self):
+        return {'challenge': os.urandom(64).hex(), 'pad': os.urandom(20).hex(), 'key': b''}
+
+    def stack_params(self):
+        return self.policy(1, [('password', DEFAULT_PASSWORD['id'], self.password_params())], DEFAULT_STACK)
+
+    def factor(self, factor_type):
+        """
+        Returns the factor callable that Key.generate_key expects for a factor type.
+
+        Parameters:
+            factor_type (str): One of password, hotp, totp, hmacsha1, or stack.
+
+        Returns:
+            function: A coroutine function taking the factor params and returning its material.
+        """
+        async def password(params):
+            return await Password(self.password).generate_factor(params)
+
+        async def hotp(params):
+            return HOTP(0).generate_factor(params)
+
+        async def totp(params):
+            return TOTP(0, {'time': self.time}).generate_factor(params)
+
+        async def hmacsha1(params):
+            return HMACSHA1(self.response).generate_factor(params)
+
+        async def stack(params):
+            return await Stack({DEFAULT_PASSWORD['id']: password}).generate_factor(params)
+
+        return {'password': password, 'hotp': hotp, 'totp': totp, 'hmacsha1': hmacsha1, 'stack': stack}[factor_type]
+
+    async def derive(self, policy, present):
+        factors = {factor['id']: self.factor(factor['type']) for factor in policy['factors'][:present]}
+        return await Key(policy, factors).generate_key()
+
+    def deriver(self, policy, present=None):
+        """
+        Returns a coroutine function deriving the key for a prepared policy.
+
+        Parameters:
+            policy (dict): The key policy.
+            present (int, optional): The number of leading factors presented; all of them by default.
+
+        Returns:
+            function: A coroutine function returning the derived key.
+        """
+        return lambda: self.derive(policy, present)
+
+    async def setup_password(self):
+        material = await Password(self.password, estimate='eager').generate_factor(self.password_params())
+        return material['output']()
+
+    def derive_password(self):
+        return self.deriver(self.policy(1, [('password', DEFAULT_PASSWORD['id'], self.password_params())]))
+
+    async def setup_hotp(self):
+        return await self.factor('hotp')(self.hotp_params())
+
+    def derive_hotp(self):
+        return self.deriver(self.policy(1, [('hotp', DEFAULT_HOTP['id'], self.hotp_params())]))
+
+    async def setup_totp(self):
+        return await self.factor('totp')(self.totp_params())
+
+    def derive_totp(self):
+        return self.deriver(self.policy(1, [('totp', DEFAULT_TOTP['id'], self.totp_params())]))
+
+    async def setup_hmacsha1(self):
+        return await self.factor('hmacsha1')(self.hmacsha1_params())
+
+    def derive_hmacsha1(self):
+        return self.deriver(self.policy(1, [('hmacsha1', DEFAULT_HMACSHA1['id'], self.hmacsha1_params())]))
+
+    async def setup_stack(self):
+        return await self.factor('stack')(self.stack_params())
+
+    def derive_stack(self):
+        return self.deriver(self.policy(1, [('stack', DEFAULT_STACK['id'], self.stack_params())]))
+
+    def sfkdf_factors(self, n):
+        factors = [
+            ('password', DEFAULT_PASSWORD['id'], self.password_params()),
+            ('hotp', DEFAULT_HOTP['id'], self.hotp_params()),
+            ('totp', DEFAULT_TOTP['id'], self.totp_params())
+        ]
+        return factors[:n]
+
+    async def setup_sfkdf(self, k, n):
+        """
+        Enrolls every factor and derives the key with DEFAULT_KDF.
+
+        This tree has no share-splitting step, so the pads are drawn at random; the timed work is the
+        factor enrollment, the per-factor HKDF and the final KeyDerivationFunction call.
+        """
+        policy = self.policy(k, self.sfkdf_factors(n))
+        for factor in policy['factors']:
+            await self.factor(factor['type'])(factor['params'])
+        secret = os.urandom(self.size)
+        return KeyDerivationFunction(secret, base64.b64decode(policy['salt']), self.size, policy['kdf']).derive_key()
+
+    def derive_sfkdf(self, k, n):
+        return self.deriver(self.policy(k, self.sfkdf_factors(n)), present=k)
+
+    async def setup_baseline(self):
+        policy = self.policy(1, [])
+        return KeyDerivationFunction(os.urandom(self.size), base64.b64decode(policy['salt']), self.size, policy['kdf']).derive_key()
+
+    def derive_baseline(self):
+        """
+        Returns a derive whose only factor hands Key a persisted share, so no factor or HKDF work is done.
+
+        Everything else a single-factor derive does (combine, the final KDF, recover and the new policy) is
+        timed, so FactorPlanner.from_benchmark subtracts it from the factor scenarios to get factor-only costs.
+
+        Returns:
+            function: A coroutine function returning the derived key.
+        """
+        share = ShamirContext.shared(ShamirContext.bits_for(1)).split(os.urandom(self.size), 1, 1)[0]
+        policy = self.policy(1, [('persisted', 'persisted', {})])
+
+        async def persisted(params):
+            return {'type': 'persisted', 'data': share, 'params': params}
+
+        return lambda: Key(policy, {'persisted': persisted}).generate_key()
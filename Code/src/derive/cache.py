@@ -0,0 +1,233 @@
+import os
+import hmac
+import time
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class DerivedKeyCache:
+    """
+    DerivedKeyCache class keeps recently derived keys so a returning user skips the combine and final KDF.
+
+    Entries are keyed by an HMAC-SHA256, under a random per-process key, of the caller's user or policy id,
+    the policy's key-determining fields (threshold, size, salt, kdf) and the shares of the presented
+    factors. Those shares fix the combined secret and so the key; the digest reveals nothing about them
+    without the process key. Entries expire after a TTL and the least recently used entry is evicted once
+    the cache is full. Keys, secrets and shares are held in bytearrays that are overwritten with zeros on
+    expiry, eviction, invalidation and clear(); the bytes copies handed to callers are theirs to manage.
+
+    The cache is used only when passed to Key or KeyDerivation. A policy can shorten the TTL or opt out
+    with a 'cache': {'ttl': seconds} entry; a TTL of 0 disables caching for that policy.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+        ttl (float): The default and maximum entry lifetime in seconds.
+        hits (int): The number of lookups that found a live entry.
+        misses (int): The number of lookups that did not.
+        expired (int): The number of entries dropped because their TTL passed.
+        evictions (int): The number of entries dropped to make room.
+
+    Methods:
+        ttl_for(policy): Returns the TTL to use for a policy.
+        digest(cache_id, policy, shares): Returns the cache key for a derivation.
+        get(digest): Returns the cached key, secret and shares, or None.
+        put(digest, cache_id, key, secret, shares, ttl): Caches a derivation.
+        invalidate(cache_id): Drops every entry of a user or policy id.
+        clear(): Drops every entry.
+        metrics(): Returns the cache counters.
+
+    Example usage:
+        cache = DerivedKeyCache(maxsize=10000, ttl=300)
+        key_derivation_obj = KeyDerivation(policy_value, factors_value, cache=cache, cache_id='alice')
+        result = await key_derivation_obj.derive_key()
+        print(cache.metrics())
+    """
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        """
+        The constructor for DerivedKeyCache class.
+
+        Parameters:
+            maxsize (int): The maximum number of entries kept.
+            ttl (float): The default and maximum entry lifetime in seconds.
+            clock (function): Returns the current time in seconds.
+
+        Raises:
+            ValueError: If maxsize is not a positive integer or ttl is negative.
+        """
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError('maxsize must be a positive integer')
+        if ttl < 0:
+            raise ValueError('ttl must not be negative')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.secret = os.urandom(32)
+        self.entries = OrderedDict()
+        self.ids = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def ttl_for(self, policy):
+        """
+        Returns the TTL to use for a policy: the cache TTL, shortened by the policy's own 'cache' entry.
+
+        Parameters:
+            policy (dict): The policy.
+
+        Returns:
+            float: The TTL in seconds; 0 means the policy is not cached.
+        """
+        settings = policy.get('cache')
+        if isinstance(settings, dict) and 'ttl' in settings:
+            return max(min(settings['ttl'], self.ttl), 0)
+        return self.ttl
+
+    def digest(self, cache_id, policy, shares):
+        """
+        Returns the cache key for a derivation.
+
+        Parameters:
+            cache_id (str): The user or policy id.
+            policy (dict): The policy.
+            shares (list): The share of each policy factor, None for factors not presented.
+
+        Returns:
+            bytes: The cache key.
+        """
+        mac = hmac.new(self.secret, digestmod=hashlib.sha256)
+        for field in (cache_id, policy['threshold'], policy['size'], policy['salt'], policy.get('kdf')):
+            encoded = repr(field).encode('utf-8')
+            mac.update(struct.pack('>I', len(encoded)))
+            mac.update(encoded)
+        for index, share in enumerate(shares):
+            if share is not None:
+                mac.update(struct.pack('>II', index, len(share)))
+                mac.update(share)
+        return mac.digest()
+
+    @staticmethod
+    def zeroize(entry):
+        _, _, key, secret, shares = entry
+        for buffer in [key, secret] + shares:
+            if buffer is not None:
+                buffer[:] = bytes(len(buffer))
+
+    def drop(self, digest):
+        entry = self.entries.pop(digest)
+        digests = self.ids.get(entry[1])
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self.ids[entry[1]]
+        self.zeroize(entry)
+
+    def get(self, digest):
+        """
+        Returns the cached key, secret and shares for a cache key.
+
+        Parameters:
+            digest (bytes): The cache key from digest().
+
+        Returns:
+            tuple: The key, secret and original shares as fresh bytes objects, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is not None and entry[0] <= self.clock():
+                self.drop(digest)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(digest)
+            self.hits += 1
+            _, _, key, secret, shares = entry
+            return bytes(key), bytes(secret), [None if share is None else bytes(share) for share in shares]
+
+    def put(self, digest, cache_id, key, secret, shares, ttl=None):
+        """
+        Caches a derivation.
+
+        Parameters:
+            digest (bytes): The cache key from digest().
+            cache_id (str): The user or policy id, for invalidate().
+            key (bytes): The derived key.
+            secret (bytes): The combined secret.
+            shares (list): The original shares.
+            ttl (float, optional): The entry lifetime in seconds; the cache TTL if omitted.
+
+        Raises:
+            TypeError: If the key, secret or a share is not bytes-like, e.g. an encoded hash string.
+        """
+        for name, value in [('key', key), ('secret', secret)] + [('share', share) for share in shares if share is not None]:
+            if not isinstance(value, (bytes, bytearray, memoryview)):
+                raise TypeError(f'{name} must be bytes-like, not {type(value).__name__}')
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        entry = (
+            self.clock() + ttl,
+            cache_id,
+            bytearray(key),
+            bytearray(secret),
+            [None if share is None else bytearray(share) for share in shares]
+        )
+        with self.lock:
+            if digest in self.entries:
+                self.drop(digest)
+            self.entries[digest] = entry
+            self.ids.setdefault(cache_id, set()).add(digest)
+            while len(self.entries) > self.maxsize:
+                self.drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, cache_id):
+        """
+        Drops every entry of a user or policy id, e.g. after its factors were changed.
+
+        Parameters:
+            cache_id (str): The user or policy id.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        with self.lock:
+            digests = list(self.ids.get(cache_id, ()))
+            for digest in digests:
+                self.drop(digest)
+            return len(digests)
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self.lock:
+            for digest in list(self.entries):
+                self.drop(digest)
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.evictions = 0
+
+    def metrics(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: A dictionary containing 'hits', 'misses', 'expired', 'evictions', 'size' and 'maxsize'.
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'size': len(self.entries),
+                'maxsize': self.maxsize
+            }
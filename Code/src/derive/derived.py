@@ -0,0 +1,32 @@
+class SKDFDerivedKey:
+    """
+    SKDFDerivedKey class holds the result of a key derivation.
+
+    Attributes:
+        policy (dict): The regenerated policy to persist for the next derivation.
+        key (bytes): The derived key.
+        secret (bytes): The combined secret the key was derived from.
+        shares (list): The original shares, one per policy factor.
+        outputs (dict): The factor outputs by factor id, e.g. password strength.
+
+    Example usage:
+        result = await Key(policy_value, factors_value).generate_key()
+        save_policy(result.policy)
+        print(result.key.hex())
+    """
+    def __init__(self, policy, key, secret, shares, outputs):
+        """
+        The constructor for SKDFDerivedKey class.
+
+        Parameters:
+            policy (dict): The regenerated policy.
+            key (bytes): The derived key.
+            secret (bytes): The combined secret.
+            shares (list): The original shares.
+            outputs (dict): The factor outputs by factor id.
+        """
+        self.policy = policy
+        self.key = key
+        self.secret = secret
+        self.shares = shares
+        self.outputs = outputs
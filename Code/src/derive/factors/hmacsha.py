@@ -2,6 +2,10 @@ import os
 import hmac
 import hashlib
 
+from ...secrets.xor import xor
+from ...policy.binary import field_bytes
+from ...tracing.spans import Tracer
+
 class HMACSHA1:
     """
         This class is used to generate HMAC-SHA1 based factors.
@@ -42,13 +46,14 @@ class HMACSHA1:
         Returns the result of XOR operation on two byte strings.
 
         Parameters:
-            b1, b2 (bytes): The byte strings to perform XOR operation on.
+            b1, b2 (bytes, bytearray or memoryview): The byte strings to perform XOR operation on.
 
         Returns:
             bytes: The result of XOR operation.
         """
-        return bytes(x ^ y for x, y in zip(b1, b2))
+        return xor(b1, b2)
 
+    @Tracer.traced('factor.generate', type='hmacsha1')
     def generate_factor(self, params):
         """
         Generates HMAC-SHA1 based factor.
@@ -59,7 +64,7 @@ class HMACSHA1:
         Returns:
             dict: A dictionary containing 'type', 'data', 'params', and 'output'.
         """
-        self.secret = self.xor_bytes(self.response[:20], bytes.fromhex(params['pad']))
+        self.secret = self.xor_bytes(self.response[:20], field_bytes(params['pad'], 'hex'))
         return {
             'type': 'hmacsha1',
             'data': self.secret,
@@ -1,6 +1,8 @@
 import struct
-import base64
-from speakeasy import speakeasy
+
+from .otp import OTP
+from ...policy.binary import field_bytes
+from ...tracing.spans import Tracer
 
 class HOTP:
     """
@@ -49,6 +51,7 @@ class HOTP:
         """
         return ((n % m) + m) % m
 
+    @Tracer.traced('factor.generate', type='hotp')
     def generate_factor(self, params):
         """
         Generates the HOTP based on the given parameters.
@@ -85,13 +88,11 @@ class HOTP:
             'digits': params['digits'],
             'pad': params['pad'],
             'counter': params['counter'] + 1,
-            'offset': self.mod(target - int(speakeasy.hotp(
-                secret=base64.b64decode(params['pad']),
-                encoding='hex',
-                counter=params['counter'] + 1,
-                algorithm=params['hash'],
-                digits=params['digits']
-            )), 10 ** params['digits'])
+            'offset': self.mod(target - OTP(
+                field_bytes(params['pad']),
+                params['hash'],
+                params['digits']
+            ).code(params['counter'] + 1), 10 ** params['digits'])
         }
 
     def get_output(self):
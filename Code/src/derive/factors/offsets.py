@@ -0,0 +1,137 @@
+import mmap
+import base64
+import struct
+
+
+class TOTPOffsets:
+    """
+    TOTPOffsets class gives O(1) access to the 4-byte big-endian offsets of a TOTP window.
+
+    The offsets can stay in the base64 text stored in the policy (only the few characters covering the
+    requested offset are decoded), in raw bytes or a memoryview, or in a binary sidecar file mapped with mmap.
+    None of these decode or copy the whole window, so per-derive cost and memory stay flat in window size.
+
+    Attributes:
+        source (str, bytes, memoryview or mmap): The stored offsets.
+        encoded (bool): True if source is base64 text.
+
+    Methods:
+        wrap(offsets): Returns a TOTPOffsets for a policy value (base64 text, bytes or TOTPOffsets).
+        from_file(path): Maps a binary sidecar file of offsets.
+        get(index): Returns the offset at an index.
+        read(first, last): Returns the raw bytes of a range of offsets.
+        to_base64(): Returns the offsets as base64 text for the policy.
+
+    Example usage:
+        offsets = TOTPOffsets.wrap(params['offsets'])
+        print(offsets.get(42), len(offsets))
+    """
+    def __init__(self, source):
+        """
+        The constructor for TOTPOffsets class.
+
+        Parameters:
+            source (str, bytes, bytearray, memoryview or mmap): The stored offsets; str is base64 text.
+
+        Raises:
+            TypeError: If source is of an unsupported type.
+        """
+        if not isinstance(source, (str, bytes, bytearray, memoryview, mmap.mmap)):
+            raise TypeError('offsets must be base64 text or a bytes-like object')
+        self.source = source
+        self.encoded = isinstance(source, str)
+
+    @classmethod
+    def wrap(cls, offsets):
+        """
+        Returns a TOTPOffsets for a policy value.
+
+        Parameters:
+            offsets (str, bytes-like or TOTPOffsets): The policy's offsets.
+
+        Returns:
+            TOTPOffsets: The offsets store.
+        """
+        if isinstance(offsets, cls):
+            return offsets
+        return cls(offsets)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Maps a binary sidecar file of offsets read-only.
+
+        Parameters:
+            path (str): The path of a file holding the raw 4-byte offsets.
+
+        Returns:
+            TOTPOffsets: The offsets store.
+        """
+        with open(path, 'rb') as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        """
+        Returns the number of offsets stored.
+        """
+        if self.encoded:
+            text = self.source.rstrip('=')
+            return (len(text) * 3 // 4) // 4
+        return len(self.source) // 4
+
+    def get(self, index):
+        """
+        Returns the offset at an index.
+
+        Parameters:
+            index (int): The index of the time step within the window.
+
+        Returns:
+            int: The offset.
+
+        Raises:
+            IndexError: If the index is outside of the stored offsets.
+        """
+        if index < 0 or index >= len(self):
+            raise IndexError('offset index out of range')
+        start = 4 * index
+        if not self.encoded:
+            return struct.unpack_from('>I', self.source, start)[0]
+
+        # 3 decoded bytes per 4 base64 characters: decode only the groups spanning bytes [start, start + 4).
+        first = start // 3
+        last = (start + 4 + 2) // 3
+        chunk = base64.b64decode(self.source[4 * first:4 * last])
+        return struct.unpack_from('>I', chunk, start - 3 * first)[0]
+
+    def read(self, first, last):
+        """
+        Returns the raw bytes of the offsets with indices in [first, last).
+
+        Parameters:
+            first (int): The index of the first offset.
+            last (int): The index after the last offset.
+
+        Returns:
+            bytes: 4 * (last - first) bytes.
+        """
+        first = min(max(first, 0), len(self))
+        last = min(max(last, first), len(self))
+        start = 4 * first
+        stop = 4 * last
+        if not self.encoded:
+            return bytes(self.source[start:stop])
+        group = start // 3
+        chunk = base64.b64decode(self.source[4 * group:4 * ((stop + 2) // 3)])
+        return chunk[start - 3 * group:stop - 3 * group]
+
+    def to_base64(self):
+        """
+        Returns the offsets as base64 text for the policy; base64 sources are returned unchanged.
+
+        Returns:
+            str: The base64 text.
+        """
+        if self.encoded:
+            return self.source
+        return base64.b64encode(self.source).decode('utf-8')
@@ -0,0 +1,85 @@
+import hmac
+import struct
+
+
+class OTP:
+    """
+    OTP class computes RFC 4226 HOTP codes (and so RFC 6238 TOTP codes, whose counter is the time step).
+
+    The HMAC is keyed once per instance; every code copies the keyed state instead of re-running the key
+    schedule, which makes computing thousands of consecutive codes cheap.
+
+    Attributes:
+        secret (bytes): The shared secret.
+        algorithm (str): The hash algorithm, e.g. 'sha1', 'sha256' or 'sha512'.
+        digits (int): The number of digits per code.
+
+    Methods:
+        code(counter): Returns the code for a counter.
+        codes(first, last): Returns the codes for the counters first to last - 1.
+
+    Example usage:
+        otp = OTP(b'12345678901234567890', 'sha1', 6)
+        print(otp.code(1), otp.codes(0, 10))
+    """
+    def __init__(self, secret, algorithm='sha1', digits=6):
+        """
+        The constructor for OTP class.
+
+        Parameters:
+            secret (bytes): The shared secret.
+            algorithm (str): The hash algorithm.
+            digits (int): The number of digits per code.
+
+        Raises:
+            TypeError: If the secret is not bytes-like.
+            ValueError: If digits is not between 1 and 10.
+        """
+        if not isinstance(secret, (bytes, bytearray, memoryview)):
+            raise TypeError('secret must be bytes')
+        if not isinstance(digits, int) or not 1 <= digits <= 10:
+            raise ValueError('digits must be between 1 and 10')
+        self.secret = bytes(secret)
+        self.algorithm = algorithm
+        self.digits = digits
+        self.modulus = 10 ** digits
+        self.mac = hmac.new(self.secret, digestmod=algorithm)
+
+    def code(self, counter):
+        """
+        Returns the code for a counter.
+
+        Parameters:
+            counter (int): The HOTP counter, or the TOTP time step.
+
+        Returns:
+            int: The code, without leading zeros.
+        """
+        mac = self.mac.copy()
+        mac.update(struct.pack('>Q', counter))
+        digest = mac.digest()
+        offset = digest[-1] & 0x0f
+        return (struct.unpack_from('>I', digest, offset)[0] & 0x7fffffff) % self.modulus
+
+    def codes(self, first, last):
+        """
+        Returns the codes for the counters first to last - 1.
+
+        Parameters:
+            first (int): The first counter.
+            last (int): The counter after the last one.
+
+        Returns:
+            list: The codes, in counter order.
+        """
+        base = self.mac
+        pack = struct.Struct('>Q').pack
+        unpack_from = struct.Struct('>I').unpack_from
+        modulus = self.modulus
+        result = []
+        for counter in range(first, last):
+            mac = base.copy()
+            mac.update(pack(counter))
+            digest = mac.digest()
+            result.append((unpack_from(digest, digest[-1] & 0x0f)[0] & 0x7fffffff) % modulus)
+        return result
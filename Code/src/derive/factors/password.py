@@ -1,12 +1,14 @@
-from zxcvbn import zxcvbn
+from .strength import StrengthEstimate
+from ...tracing.spans import Tracer
 
-class Password:
+class Password(StrengthEstimate):
     """
     Password class is used to handle password related operations.
 
     Attributes:
         password (str): The password string.
-        strength (dict): The strength of the password as calculated by zxcvbn.
+        strength (dict): The strength of the password as calculated by zxcvbn, computed lazily.
+        estimate (str): When zxcvbn runs: eager, lazy, or skip.
 
     Methods:
         generate_factor(params): Returns a dictionary containing the type, data, params, and output of the password.
@@ -19,24 +21,29 @@ class Password:
         result = await password_obj.generate_factor({})
         print(result)
     """
-    def __init__(self, password):
+    STRENGTH_OF = 'password'
+
+    def __init__(self, password, estimate='lazy'):
         """
         The constructor for Password class.
 
         Parameters:
             password (str): The password string.
+            estimate (str): When to run zxcvbn: 'eager' (now, e.g. at setup), 'lazy' (default; on first read
+                            of the strength or output), or 'skip' (never; for logins that discard the output).
 
         Raises:
             TypeError: If the password is not a string.
-            ValueError: If the password is empty.
+            ValueError: If the password is empty or estimate is unknown.
         """
         if not isinstance(password, str):
             raise TypeError('password must be a string')
         if len(password) == 0:
             raise ValueError('password cannot be empty')
         self.password = password
-        self.strength = zxcvbn(self.password)
+        self.init_strength(estimate)
 
+    @Tracer.traced('factor.generate', type='password')
     async def generate_factor(self, params):
         """
         Returns a dictionary containing the type, data, params, and output of the password.
@@ -51,7 +58,7 @@ class Password:
             'type': 'password',
             'data': self.password.encode('utf-8'),
             'params': self.get_params(params),
-            'output': self.get_output()
+            'output': self.get_output
         }
 
     @staticmethod
@@ -66,12 +73,3 @@ class Password:
             dict: An empty dictionary.
         """
         return {}
-
-    def get_output(self):
-        """
-        Returns a dictionary containing the strength of the password.
-
-        Returns:
-            dict: A dictionary containing the strength of the password.
-        """
-        return {'strength': self.strength}
\ No newline at end of file
@@ -1,12 +1,14 @@
-from zxcvbn import zxcvbn
+from .strength import StrengthEstimate
+from ...tracing.spans import Tracer
 
-class Question:
+class Question(StrengthEstimate):
     """
     Question class is used to handle question related operations.
 
     Attributes:
         answer (str): The answer string.
-        strength (dict): The strength of the answer as calculated by zxcvbn.
+        strength (dict): The strength of the answer as calculated by zxcvbn, computed lazily.
+        estimate (str): When zxcvbn runs: eager, lazy, or skip.
 
     Methods:
         generate_factor(params): Returns a dictionary containing the type, data, params, and output of the answer.
@@ -19,24 +21,29 @@ class Question:
         result = question_obj.generate_factor({})
         print(result)
     """
-    def __init__(self, answer):
+    STRENGTH_OF = 'answer'
+
+    def __init__(self, answer, estimate='lazy'):
         """
         The constructor for Question class.
 
         Parameters:
             answer (str): The answer string.
+            estimate (str): When to run zxcvbn: 'eager' (now, e.g. at setup), 'lazy' (default; on first read
+                            of the strength or output), or 'skip' (never; for logins that discard the output).
 
         Raises:
             TypeError: If the answer is not a string.
-            ValueError: If the answer is empty.
+            ValueError: If the answer is empty or estimate is unknown.
         """
         if not isinstance(answer, str):
             raise TypeError('answer must be a string')
         if len(answer) == 0:
             raise ValueError('answer cannot be empty')
         self.answer = answer.lower().replace(r'[^0-9a-z ]', '').strip()
-        self.strength = zxcvbn(self.answer)
+        self.init_strength(estimate)
 
+    @Tracer.traced('factor.generate', type='question')
     def generate_factor(self, params):
         """
         Returns a dictionary containing the type, data, params, and output of the answer.
@@ -51,7 +58,7 @@ class Question:
             'type': 'question',
             'data': self.answer.encode('utf-8'),
             'params': self.generate_params(params),
-            'output': self.get_output()
+            'output': self.get_output
         }
 
     @staticmethod
@@ -66,12 +73,3 @@ class Question:
             dict: The input params as is.
         """
         return params
-
-    def get_output(self):
-        """
-        Returns a dictionary containing the strength of the answer.
-
-        Returns:
-            dict: A dictionary containing the strength of the answer.
-        """
-        return {'strength': self.strength}
\ No newline at end of file
@@ -0,0 +1,102 @@
+from functools import partial
+
+from ..key import Key
+from ...tracing.spans import Tracer
+
+
+class Stack:
+    """
+    Stack class derives a stacked factor: a nested policy whose own derived key is the factor material.
+
+    The factors are the already expanded factor callables of the nested policy (see
+    StackEngine.expand), so the nested key is derived directly without evaluating the policy again.
+
+    Attributes:
+        factors (dict): The expanded factor callables of the nested policy.
+        executor (KDFExecutor): The executor the nested KDF runs on; inline if None.
+        trusted (bool): True if the nested policy was already validated, so its schema check is skipped.
+        result (SKDFDerivedKey): The nested derived key, once generate_factor has run.
+
+    Methods:
+        generate_factor(params): Derives the nested key from the nested policy.
+        generate_params(result): Returns the callable producing the nested policy for the next derive.
+        get_output(): Returns the outputs of the nested factors.
+
+    Example usage:
+        stack = Stack({'password': your_password_factor})
+        result = await stack.generate_factor(your_nested_policy)
+        print(result)
+    """
+    def __init__(self, factors, executor=None, trusted=False):
+        """
+        The constructor for Stack class.
+
+        Parameters:
+            factors (dict): The expanded factor callables of the nested policy.
+            executor (KDFExecutor, optional): The executor the nested KDF runs on; inline if omitted.
+            trusted (bool): Skip schema validation of the nested policy.
+
+        Raises:
+            TypeError: If factors is not a dictionary.
+        """
+        if not isinstance(factors, dict):
+            raise TypeError('factors must be a dictionary')
+        self.factors = factors
+        self.executor = executor
+        self.trusted = trusted
+        self.result = None
+
+    @Tracer.traced('factor.generate', type='stack')
+    async def generate_factor(self, params):
+        """
+        Derives the nested key from the nested policy.
+
+        Parameters:
+            params (dict): The nested policy.
+
+        Returns:
+            dict: A dictionary containing 'type', 'data', 'params', and 'output'.
+        """
+        self.result = await Key(params, self.factors, self.executor, self.trusted).generate_key()
+
+        return {
+            'type': 'stack',
+            'data': self.result.key,
+            'params': self.generate_params(self.result),
+            'output': self.get_output
+        }
+
+    def generate_params(self, result):
+        """
+        Returns the callable producing the nested policy for the next derive.
+
+        Parameters:
+            result (SKDFDerivedKey): The nested derived key.
+
+        Returns:
+            function: A function taking the outer key and returning the nested policy.
+        """
+        return partial(self.next_params, result)
+
+    @staticmethod
+    def next_params(result, key=None):
+        """
+        Returns the nested policy regenerated by the nested derive.
+
+        Parameters:
+            result (SKDFDerivedKey): The nested derived key.
+            key (dict, optional): The outer key; unused, the nested policy is keyed by the nested key.
+
+        Returns:
+            dict: The nested policy.
+        """
+        return result.policy
+
+    def get_output(self):
+        """
+        Returns the outputs of the nested factors.
+
+        Returns:
+            dict: The outputs by factor id, or an empty dictionary before generate_factor has run.
+        """
+        return self.result.outputs if self.result is not None else {}
@@ -0,0 +1,149 @@
+class StrengthEstimate:
+    """
+    StrengthEstimate class is a mixin for factors whose output is the zxcvbn strength of a text.
+
+    The factor names the attribute holding the text in STRENGTH_OF and calls init_strength from its
+    constructor; the strength property, the estimate modes and get_output are shared.
+
+    Attributes:
+        STRENGTH_OF (str): The name of the attribute holding the text to estimate.
+        ESTIMATES (tuple): The estimate modes: eager, lazy, or skip.
+        estimate (str): When zxcvbn runs: eager, lazy, or skip.
+        strength (dict): The zxcvbn strength of the text, computed lazily.
+
+    Methods:
+        init_strength(estimate): Validates the estimate mode and runs zxcvbn now if it is eager.
+        get_output(): Returns a dictionary containing the strength of the text.
+
+    Example usage:
+        class Password(StrengthEstimate):
+            STRENGTH_OF = 'password'
+
+            def __init__(self, password, estimate='lazy'):
+                self.password = password
+                self.init_strength(estimate)
+    """
+    STRENGTH_OF = None
+    ESTIMATES = ('eager', 'lazy', 'skip')
+
+    def init_strength(self, estimate):
+        """
+        Validates the estimate mode and runs zxcvbn now if it is eager.
+
+        Parameters:
+            estimate (str): When to run zxcvbn: 'eager' (now, e.g. at setup), 'lazy' (on first read of the
+                            strength or output), or 'skip' (never; for logins that discard the output).
+
+        Raises:
+            ValueError: If estimate is unknown.
+        """
+        if estimate not in self.ESTIMATES:
+            raise ValueError('estimate must be one of eager, lazy, or skip')
+        self.estimate = estimate
+        self._strength = None
+        if estimate == 'eager':
+            self._strength = self.strength
+
+    @property
+    def strength(self):
+        """
+        The zxcvbn strength of the text, computed on first access; None if estimation is skipped.
+        """
+        if self._strength is None and self.estimate != 'skip':
+            from zxcvbn import zxcvbn  # imported on first use: loading its dictionaries is slow
+            self._strength = zxcvbn(getattr(self, self.STRENGTH_OF))
+        return self._strength
+
+    def get_output(self):
+        """
+        Returns a dictionary containing the strength of the text.
+
+        Returns:
+            dict: A LazyStrength containing the strength of the text, estimated when first read, or an empty
+                  dictionary if estimation is skipped.
+        """
+        if self.estimate == 'skip':
+            return {}
+        return LazyStrength(self)
+
+
+class LazyStrength(dict):
+    """
+    LazyStrength class is a {'strength': ...} dictionary that runs zxcvbn only when the strength is read.
+
+    StrengthEstimate.get_output returns it, so a derive that collects factor outputs without looking at them
+    never pays for the strength estimate. Every read materializes it, including iteration, keys() and `in`:
+    overriding __iter__ also makes dict(), {**output} and update() copy through keys() and __getitem__
+    instead of copying the stored placeholder.
+
+    Attributes:
+        factor (StrengthEstimate): The factor whose strength property is read on access.
+
+    Methods:
+        materialize(): Runs the estimate if it has not run yet and returns the dictionary.
+
+    Example usage:
+        output = LazyStrength(password_obj)
+        print(json.dumps(output))
+    """
+    def __init__(self, factor):
+        """
+        The constructor for LazyStrength class.
+
+        Parameters:
+            factor (StrengthEstimate): The factor whose strength property is read on access.
+        """
+        # The key is stored up front so the dictionary is never seen as empty, e.g. by the C JSON encoder.
+        super().__init__(strength=None)
+        self.factor = factor
+        self.estimated = False
+
+    def materialize(self):
+        """
+        Runs the estimate if it has not run yet.
+
+        Returns:
+            LazyStrength: This dictionary, holding the estimate.
+        """
+        if not self.estimated:
+            dict.__setitem__(self, 'strength', self.factor.strength)
+            self.estimated = True
+        return self
+
+    def __getitem__(self, key):
+        return dict.__getitem__(self.materialize(), key)
+
+    def __iter__(self):
+        return dict.__iter__(self.materialize())
+
+    def __contains__(self, key):
+        return dict.__contains__(self.materialize(), key)
+
+    def keys(self):
+        return dict.keys(self.materialize())
+
+    def get(self, key, default=None):
+        return dict.get(self.materialize(), key, default)
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def values(self):
+        return dict.values(self.materialize())
+
+    def copy(self):
+        return dict(self.materialize().items())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.materialize(), other)
+
+    def __ne__(self, other):
+        return dict.__ne__(self.materialize(), other)
+
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+    def __repr__(self):
+        if not self.estimated:
+            return f'LazyStrength({self.factor.__class__.__name__})'
+        return dict.__repr__(self)
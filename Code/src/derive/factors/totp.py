@@ -3,6 +3,11 @@ import base64
 import time
 from functools import partial
 
+from .otp import OTP
+from .offsets import TOTPOffsets
+from ...policy.binary import field_bytes
+from ...tracing.spans import Tracer
+
 class TOTP:
     """
     TOTP class is used to generate Time-Based One-Time Passwords (TOTP).
@@ -14,7 +19,9 @@ class TOTP:
     Methods:
         mod(n, m): Returns the modulus of n by m.
         generate_factor(params): Generates the TOTP based on the given parameters.
-        generate_params(params): Generates the parameters for the next TOTP.
+        generate_params(params, target, index): Generates the parameters for the next TOTP.
+        next_params(params, target, index, key): Builds the parameters for the next TOTP.
+        slide_offsets(params, target, index): Slides the offsets window forward to the current time step.
         get_output(): Returns an empty dictionary.
 
     Example usage:
@@ -63,17 +70,21 @@ class TOTP:
         """
         return ((n % m) + m) % m
 
+    @Tracer.traced('factor.generate', type='totp')
     def generate_factor(self, params):
         """
         Generates the TOTP based on the given parameters.
 
+        Only the offset for the current time step is decoded from params['offsets'] (base64 text,
+        bytes-like, or a TOTPOffsets), so the cost does not grow with the window size.
+
         Parameters:
             params (dict): A dictionary containing 'offsets', 'start', 'digits', 'step', 'window', 'pad', and 'key'.
 
         Returns:
             dict: A dictionary containing 'type', 'data', 'params', and 'output'.
         """
-        offsets = base64.b64decode(params['offsets'])
+        offsets = TOTPOffsets.wrap(params['offsets'])
         start_counter = int(params['start'] / (params['step'] * 1000))
         now_counter = int(self.options['time'] / (params['step'] * 1000))
 
@@ -82,7 +93,7 @@ class TOTP:
         if index >= params['window']:
             raise ValueError('TOTP window exceeded')
 
-        offset = struct.unpack('>I', offsets[4 * index:4 * (index + 1)])[0]
+        offset = offsets.get(index)
 
         target = self.mod(offset + self.code, 10 ** params['digits'])
         buffer = struct.pack('>I', target)
@@ -90,32 +101,83 @@ class TOTP:
         return {
             'type': 'totp',
             'data': buffer,
-            'params': self.generate_params(params),
+            'params': self.generate_params(params, target, index),
             'output': self.get_output
         }
 
-    def generate_params(self, params):
+    def generate_params(self, params, target, index):
         """
         Generates the parameters for the next TOTP.
 
         Parameters:
             params (dict): A dictionary containing 'offsets', 'start', 'digits', 'step', 'window', 'pad', and 'key'.
+            target (int): The target value the offsets map TOTP codes onto.
+            index (int): The number of time steps elapsed since params['start'].
 
         Returns:
             function: A function that when called, returns a dictionary containing 'start', 'hash', 'digits', 'step', 'window', 'pad', and 'offsets'.
         """
-        return partial(
-            lambda key, **params: {
-                'start': self.options['time'],
-                'hash': params['hash'],
-                'digits': params['digits'],
-                'step': params['step'],
-                'window': params['window'],
-                'pad': params['pad'],
-                'offsets': base64.b64encode(params['offsets']).decode('utf-8')
-            },
-            key=params['key']
-        )
+        return partial(self.next_params, params, target, index)
+
+    def next_params(self, params, target, index, key=None):
+        """
+        Builds the parameters for the next TOTP, with the window starting at the current time step.
+
+        Parameters:
+            params (dict): A dictionary containing 'offsets', 'start', 'hash', 'digits', 'step', 'window', and 'pad'.
+            target (int): The target value the offsets map TOTP codes onto.
+            index (int): The number of time steps elapsed since params['start'].
+            key (optional): The derived key; not used by TOTP.
+
+        Returns:
+            dict: A dictionary containing 'start', 'hash', 'digits', 'step', 'window', 'pad', and 'offsets'.
+        """
+        return {
+            'start': self.options['time'],
+            'hash': params['hash'],
+            'digits': params['digits'],
+            'step': params['step'],
+            'window': params['window'],
+            'pad': params['pad'],
+            'offsets': self.slide_offsets(params, target, index)
+        }
+
+    def slide_offsets(self, params, target, index):
+        """
+        Slides the offsets window forward so that it starts at the current time step.
+
+        The offset for a counter depends only on the target and that counter's code, so the offsets for
+        counters still inside the window are reused; only the index counters that entered the window since
+        params['start'] are computed. The cost scales with elapsed time rather than with the window size.
+
+        Parameters:
+            params (dict): A dictionary containing 'offsets', 'start', 'digits', 'step', 'window', 'pad', and 'hash'.
+            target (int): The target value the offsets map TOTP codes onto.
+            index (int): The number of time steps elapsed since params['start'].
+
+        Returns:
+            str or bytes: The offsets for the window starting at the current time step, as base64 text, or as
+            raw bytes if params['offsets'] was raw (a policy loaded with BinaryPolicy.loads(..., raw=True)).
+        """
+        offsets = TOTPOffsets.wrap(params['offsets'])
+        if index == 0:
+            return offsets.source if isinstance(offsets.source, (str, bytes, memoryview)) else bytes(offsets.source)
+
+        window = params['window']
+        start_counter = int(params['start'] / (params['step'] * 1000))
+        otp = OTP(field_bytes(params['pad']), params['hash'], params['digits'])
+        modulus = 10 ** params['digits']
+
+        buffer = bytearray(4 * window)
+        kept = offsets.read(index, window)
+        buffer[:len(kept)] = kept
+        first = len(kept) // 4
+        codes = otp.codes(start_counter + index + first, start_counter + index + window)
+        for position, code in enumerate(codes, first):
+            struct.pack_into('>I', buffer, 4 * position, self.mod(target - code, modulus))
+        if not offsets.encoded:
+            return bytes(buffer)
+        return base64.b64encode(buffer).decode('utf-8')
 
     @staticmethod
     def get_output():
@@ -1,11 +1,13 @@
-import json
-from ajv import AJV
-from hkdf import hkdf
-from buffer_xor import xor
-from secrets_combine import combine
-from secrets_recover import recover
-from kdf import kdf
-from SKDFDerivedKey import SKDFDerivedKey
+import asyncio
+import inspect
+from .derived import SKDFDerivedKey
+from ..secrets.xor import xor
+from ..secrets.combine import SecretCombiner
+from ..secrets.recover import SecretRecoverer
+from ..setup.kdf import KeyDerivationFunction
+from ..policy.schema import PolicySchema
+from ..policy.binary import field_bytes
+from ..tracing.spans import Tracer
 
 class Key:
     """
@@ -14,12 +16,18 @@ class Key:
     Attributes:
         policy (dict): The policy for key generation.
         factors (dict): The factors for key generation.
-        ajv (AJV): An instance of the AJV class for JSON schema validation.
+        executor (KDFExecutor): The executor the final KDF runs on; inline if None.
+        trusted (bool): True if the policy was already validated, e.g. when it comes from our own policy store.
+        cache (DerivedKeyCache): Caches the derived key by the presented factors' shares; disabled if None.
+        cache_id (str): The user or policy id the cache entries are filed under.
 
     Methods:
-        validate_policy(policy_schema): Validates the policy against a JSON schema.
+        validate_policy(policy_schema): Validates the policy against the shared compiled JSON schema.
         generate_key(): Generates a key based on the policy and factors.
+        resolve(value): Awaits a value if it is awaitable.
+        call_factor(factor, params): Calls a factor function without blocking the event loop.
         get_material(factor): Gets the material for a factor.
+        get_key_result(secret): Derives the final key from the combined secret.
         get_secret(shares): Combines shares to get a secret.
         get_new_policy(new_factors, key_result): Gets a new policy based on new factors and a key result.
         get_original_shares(shares): Recovers the original shares from the shares.
@@ -45,34 +53,43 @@ class Key:
         result = key_obj.generate_key()
         print(result)
     """
-    def __init__(self, policy, factors):
+    def __init__(self, policy, factors, executor=None, trusted=False, cache=None, cache_id=None):
         """
         The constructor for Key class.
 
         Parameters:
             policy (dict): The policy for key generation.
             factors (dict): The factors for key generation.
+            executor (KDFExecutor, optional): The executor the final KDF runs on; inline if omitted.
+            trusted (bool): Skip schema validation for a policy that was already validated, such as one read
+                back from our own policy store.
+            cache (DerivedKeyCache, optional): Caches the derived key, so a repeat derive with the same factors
+                skips the combine, final KDF and recover; disabled if omitted.
+            cache_id (str, optional): The user or policy id the cache entries are filed under; required to use the cache.
 
         Raises:
             TypeError: If the policy is not a dictionary or if the factors are not a dictionary.
         """
         self.policy = policy
         self.factors = factors
-        self.ajv = AJV()
+        self.executor = executor
+        self.trusted = trusted
+        self.cache = cache
+        self.cache_id = cache_id
 
-    def validate_policy(self, policy_schema):
+    def validate_policy(self, policy_schema=None):
         """
         Validates the policy against a JSON schema.
 
+        The schema is compiled once per process and shared by every Key (see PolicySchema.shared).
+
         Parameters:
-            policy_schema (str): The JSON schema to validate the policy against.
+            policy_schema (str, optional): The JSON schema to validate the policy against; POLICY_SCHEMA if omitted.
 
         Raises:
             TypeError: If the policy is not valid according to the JSON schema.
         """
-        valid = self.ajv.validate(json.loads(policy_schema), self.policy)
-        if not valid:
-            raise TypeError('Invalid key policy', self.ajv.errors)
+        PolicySchema.shared(policy_schema).validate(self.policy)
 
     async def generate_key(self):
         """
@@ -84,36 +101,95 @@ class Key:
         Raises:
             ValueError: If there are insufficient factors provided to derive the key.
         """
-        self.validate_policy(policy_schema)
+        with Tracer.span('key.generate', k=self.policy['threshold'], n=len(self.policy['factors']), bytes=self.policy['size']) as span:
+            if not self.trusted:
+                with Tracer.span('key.validate'):
+                    self.validate_policy()
+
+            if len(self.factors) < self.policy['threshold']:
+                raise ValueError('Insufficient factors provided to derive key')
+
+            shares = []
+            new_factors = []
+            outputs = {}
+
+            materials = await asyncio.gather(*(self.get_material(factor) for factor in self.policy['factors']))
+
+            for factor, (share, output, new_factor) in zip(self.policy['factors'], materials):
+                shares.append(share)
+                if output is not None:
+                    outputs[factor['id']] = output
+                new_factors.append(new_factor)
+
+            if len([x for x in shares if x is not None]) < self.policy['threshold']:
+                raise ValueError('Insufficient factors provided to derive key')
+
+            digest = None
+            cached = None
+            if self.cache is not None and self.cache_id is not None:
+                ttl = self.cache.ttl_for(self.policy)
+                if ttl > 0:
+                    digest = self.cache.digest(self.cache_id, self.policy, shares)
+                    cached = self.cache.get(digest)
+            span.set('cached', cached is not None)
+
+            if cached is not None:
+                key_result, secret, original_shares = cached
+            else:
+                with Tracer.span('key.combine', k=self.policy['threshold'], n=len(self.policy['factors'])):
+                    secret = self.get_secret(shares)
+                key_result = await self.get_key_result(secret)
+                with Tracer.span('key.recover', k=self.policy['threshold'], n=len(self.policy['factors'])):
+                    original_shares = self.get_original_shares(shares)
+                if digest is not None:
+                    self.cache.put(digest, self.cache_id, key_result, secret, original_shares, ttl)
+
+            with Tracer.span('key.new_policy'):
+                new_policy = await self.get_new_policy(new_factors, key_result)
+
+            return SKDFDerivedKey(new_policy, key_result, secret, original_shares, outputs)
+
+    @staticmethod
+    async def resolve(value):
+        """
+        Awaits a value if it is awaitable.
 
-        if len(self.factors) < self.policy['threshold']:
-            raise ValueError('Insufficient factors provided to derive key')
+        Parameters:
+            value: A value or an awaitable.
 
-        shares = []
-        new_factors = []
-        outputs = {}
+        Returns:
+            The value, or the result of awaiting it.
+        """
+        if inspect.isawaitable(value):
+            return await value
+        return value
 
-        for factor in self.policy['factors']:
-            share, output, new_factor = await self.get_material(factor)
-            shares.append(share)
-            if output is not None:
-                outputs[factor['id']] = output
-            new_factors.append(new_factor)
+    @classmethod
+    async def call_factor(cls, factor, params):
+        """
+        Calls a factor function without blocking the event loop.
 
-        if len([x for x in shares if x is not None]) < self.policy['threshold']:
-            raise ValueError('Insufficient factors provided to derive key')
+        Coroutine functions are awaited directly. Plain callables run in a worker thread, so a factor
+        doing CPU-heavy work synchronously (such as a stack with its own KDF) does not hold up the others.
 
-        secret = self.get_secret(shares)
-        key_result = await self.get_key_result(secret, factor)
-        new_policy = self.get_new_policy(new_factors, key_result)
-        original_shares = self.get_original_shares(shares)
+        Parameters:
+            factor (function): The factor function.
+            params (dict): The factor params from the policy.
 
-        return SKDFDerivedKey(new_policy, key_result, secret, original_shares, outputs)
+        Returns:
+            dict: The factor material.
+        """
+        if inspect.iscoroutinefunction(factor):
+            return await factor(params)
+        return await cls.resolve(await asyncio.to_thread(factor, params))
 
     async def get_material(self, factor):
         """
         Gets the material for a factor.
 
+        generate_key runs this concurrently for every factor of the policy; the HKDF step runs in a
+        worker thread so it does not hold up the other factors.
+
         Parameters:
             factor (dict): A dictionary representing a factor.
 
@@ -121,55 +197,83 @@ class Key:
             tuple: A tuple containing the share, output, and new factor.
         """
         if factor['id'] in self.factors and callable(self.factors[factor['id']]):
-            material = await self.factors[factor['id']](factor['params'])
-            share = material['data'] if material['type'] == 'persisted' else xor(factor['pad'].encode('base64'), await hkdf('sha512', material['data'], '', '', self.policy['size']))
-            output = await material['output']() if 'output' in material and callable(material['output']) else None
-            new_factor = material['params']
+            with Tracer.span('key.material', id=factor['id'], type=factor['type']):
+                material = await self.call_factor(self.factors[factor['id']], factor['params'])
+                if material['type'] == 'persisted':
+                    share = material['data']
+                else:
+                    # Shares of k-of-n policies are longer than the key (see ShamirContext); HKDF output is
+                    # prefix-stable, so stretching to the pad's length gives the same bytes for key-sized pads.
+                    pad = field_bytes(factor['pad'])
+                    with Tracer.span('key.hkdf', type=factor['type'], bytes=len(pad)):
+                        share = xor(pad, await asyncio.to_thread(KeyDerivationFunction.hkdf, 'sha512', material['data'], b'', b'', len(pad)))
+                output = await self.resolve(material['output']()) if 'output' in material and callable(material['output']) else None
+                new_factor = material['params']
         else:
             share = None
             output = None
             new_factor = None
         return share, output, new_factor
 
-    @staticmethod
-    def get_secret(shares):
+    async def get_key_result(self, secret):
+        """
+        Derives the final key from the combined secret with the policy's KDF.
+
+        Parameters:
+            secret (bytes): The combined secret.
+
+        Returns:
+            bytes: The derived key.
+        """
+        kdf = KeyDerivationFunction(secret, self.policy['salt'], self.policy['size'], self.policy['kdf'])
+        return await kdf.derive(self.executor)
+
+    def get_secret(self, shares):
         """
         Combines shares to get a secret.
 
         Parameters:
-            shares (list): A list of shares.
+            shares (list): A list of shares, one per policy factor, with None for missing factors.
 
         Returns:
-            str: The combined secret.
+            bytes: The combined secret.
         """
-        return combine([x for x in shares if x is not None], self.policy['threshold'], len(self.policy['factors']))
+        return SecretCombiner(shares, self.policy['threshold'], len(self.policy['factors'])).combine()
 
     async def get_new_policy(self, new_factors, key_result):
         """
         Gets a new policy based on new factors and a key result.
 
+        The new policy is copied on write: only the top-level dictionary, the factor list and the entries of
+        factors whose params change are new objects. Everything else, including the params of factors that
+        were not presented and large fields such as pads, is shared with the current policy by reference, so
+        policies must be treated as immutable once derived.
+
         Parameters:
-            new_factors (list): A list of new factors.
-            key_result (str): The key result.
+            new_factors (list): A list of new factors: a callable taking {'key': key_result}, the new params
+                themselves, or None to keep the factor unchanged.
+            key_result (bytes): The key result.
 
         Returns:
             dict: The new policy.
         """
-        new_policy = json.loads(json.dumps(self.policy))
+        factors = list(self.policy['factors'])
         for index, factor in enumerate(new_factors):
-            if factor is not None and callable(factor):
-                new_policy['factors'][index]['params'] = await factor({'key': key_result})
-        return new_policy
-
-    @staticmethod
-    def get_original_shares(shares):
+            if factor is None:
+                continue
+            params = await self.resolve(factor({'key': key_result})) if callable(factor) else factor
+            if params is not factors[index]['params']:
+                factors[index] = dict(factors[index], params=params)
+        return dict(self.policy, factors=factors)
+
+    def get_original_shares(self, shares):
         """
         Recovers the original shares from the shares.
 
         Parameters:
-            shares (list): A list of shares.
+            shares (list): A list of shares, one per policy factor, with None for missing factors.
 
         Returns:
             list: The original shares.
         """
-        return recover([x for x in shares if x is not None], self.policy['threshold'], len(self.policy['factors']))
\ No newline at end of file
+        return SecretRecoverer(shares, self.policy['threshold'], len(self.policy['factors'])).recover()
\ No newline at end of file
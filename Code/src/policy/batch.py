@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, Dict, List, Sequence
+
+from .derive import KeyDerivation
+
+
+class BatchKeyDerivation:
+    """
+    BatchKeyDerivation class derives keys for many policy/factor-set pairs in one call.
+
+    Items run as a pipeline over a bounded window: while one item waits on its final KDF in the executor,
+    others are being validated, gathering factor material or combining shares, so the executor's cores
+    stay busy. Every item runs on the batch's executor and planner, so their pools and costs are shared.
+    Shamir contexts are not batch state: items whose policies share a field size use the same module-wide
+    ShamirContext.shared() context, as any other derive does, and compiled policies come from the shared
+    CompiledPolicy cache.
+
+    Attributes:
+        window (int): The maximum number of items in flight at once.
+        executor (KDFExecutor): The executor the final KDF of every item runs on; inline if None.
+        planner (FactorPlanner): Picks the cheapest satisfying subset of each item's factors; all are derived if None.
+
+    Methods:
+        derive_one(policy, factors): Derives the key for one item.
+        derive_many(policies, factor_sets): Derives keys for every item, returning results or errors in order.
+
+    Example usage:
+    policies_value = [{'threshold': 1, 'factors': [{'type': 'password', 'id': 'password', 'params': {}}]}]
+    factor_sets_value = [{'password': your_password_factor}]
+    batch_obj = BatchKeyDerivation(window=32, executor=KDFExecutor('auto'))
+    results = await batch_obj.derive_many(policies_value, factor_sets_value)
+    print(results)
+    """
+
+    def __init__(self, window: int = 64, executor=None, planner=None):
+        """
+        The constructor for BatchKeyDerivation class.
+
+        Parameters:
+            window (int): The maximum number of items in flight at once.
+            executor (KDFExecutor, optional): The executor the final KDF runs on; inline if omitted.
+            planner (FactorPlanner, optional): Derives only the cheapest satisfying subset of each item's factors.
+
+        Raises:
+            ValueError: If window is not a positive integer.
+        """
+        if not isinstance(window, int) or window <= 0:
+            raise ValueError('window must be a positive integer')
+        self.window = window
+        self.executor = executor
+        self.planner = planner
+
+    async def derive_one(self, policy: Dict[str, Any], factors: Dict[str, Any]):
+        """
+        Derives the key for one item.
+
+        Parameters:
+            policy (dict): The policy based on which the key is derived.
+            factors (dict): The factors used to derive the key.
+
+        Returns:
+            The derived key.
+        """
+        return await KeyDerivation(policy, factors, self.executor, self.planner).derive_key()
+
+    async def derive_many(self, policies: Sequence[Dict[str, Any]], factor_sets: Sequence[Dict[str, Any]]) -> List[Any]:
+        """
+        Derives keys for every policy/factor-set pair.
+
+        A failing item does not stop the batch: its exception is returned in its place.
+
+        Parameters:
+            policies (Sequence[dict]): The policies, one per item.
+            factor_sets (Sequence[dict]): The factors, one dictionary per item.
+
+        Returns:
+            list: The derived key or the raised exception for each item, in input order.
+
+        Raises:
+            ValueError: If policies and factor_sets differ in length.
+        """
+        if len(policies) != len(factor_sets):
+            raise ValueError('policies and factor_sets must have the same length')
+
+        results: List[Any] = [None] * len(policies)
+        slots = asyncio.Semaphore(self.window)
+        pending = set()
+
+        async def run(index, policy, factors):
+            try:
+                results[index] = await self.derive_one(policy, factors)
+            except Exception as error:
+                results[index] = error
+            finally:
+                slots.release()
+
+        for index, (policy, factors) in enumerate(zip(policies, factor_sets)):
+            await slots.acquire()
+            task = asyncio.ensure_future(run(index, policy, factors))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+        return results
+
+
+async def derive_many(policies, factor_sets, window=64, executor=None, planner=None):
+    """
+    Derives keys for every policy/factor-set pair; see BatchKeyDerivation.derive_many.
+
+    Parameters:
+        policies (Sequence[dict]): The policies, one per item.
+        factor_sets (Sequence[dict]): The factors, one dictionary per item.
+        window (int): The maximum number of items in flight at once.
+        executor (KDFExecutor, optional): The executor the final KDF runs on; inline if omitted.
+        planner (FactorPlanner, optional): Derives only the cheapest satisfying subset of each item's factors.
+
+    Returns:
+        list: The derived key or the raised exception for each item, in input order.
+    """
+    return await BatchKeyDerivation(window, executor, planner).derive_many(policies, factor_sets)
@@ -0,0 +1,334 @@
+import os
+import mmap
+import base64
+import struct
+import binascii
+from typing import Any, Dict, Union
+
+MAGIC = b'SKDP'
+VERSION = 1
+
+NULL, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT, BYTES, BASE64, HEX = range(11)
+
+BASE64_FIELDS = ('pad', 'offsets')  # base64 text in factors and factor params
+HEX_FIELDS = {'hmacsha1': ('pad', 'challenge')}  # hex text in the params of these factor types
+
+# Lists and dictionaries nested deeper than this are rejected while decoding, well before Python's recursion
+# limit; a policy nests four levels per stack, so this allows stacks over 50 deep.
+MAX_DEPTH = 200
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def field_bytes(value: Union[str, Buffer], encoding: str = 'base64') -> Buffer:
+    """
+    Returns the raw bytes of a policy byte field, which is base64 or hex text in a JSON policy and a
+    bytes-like object in a policy loaded with BinaryPolicy.loads(..., raw=True).
+
+    Args:
+        value (str or Buffer): The field value.
+        encoding (str): The text encoding of the field, 'base64' or 'hex'.
+
+    Returns:
+        Buffer: The raw bytes; bytes-like values are returned as they are, without copying.
+    """
+    if not isinstance(value, str):
+        return value
+    if encoding == 'hex':
+        return bytes.fromhex(value)
+    return base64.b64decode(value)
+
+
+class BinaryPolicy:
+    """
+    A compact, versioned binary encoding of key policies.
+
+    A policy is stored as the MAGIC and VERSION bytes followed by one tagged value: null, booleans,
+    zigzag-varint integers, doubles, and varint-length-prefixed strings, lists and dictionaries, as in
+    JSON. Byte fields (factor pads, TOTP offsets, HMAC-SHA1 pads and challenges) are stored as raw bytes
+    with a tag recording whether the JSON policy held them as base64 or hex, which removes the 33% base64
+    overhead. Text that does not round-trip exactly through its encoding is kept as a string, so
+    converting a JSON policy to binary and back always gives the same policy.
+
+    Decoding works on a memoryview of the input. With raw=True byte fields are returned as memoryview
+    slices of it, so a large field such as the TOTP offsets is neither copied nor re-encoded; the factors
+    and Key accept such fields wherever they accept the base64 or hex text (see field_bytes). The JSON schema
+    only describes text fields, so a raw policy is meant to be derived with trusted=True once it was
+    validated in its JSON form.
+
+    Example usage:
+    data = BinaryPolicy.dumps(policy_value)
+    policy = BinaryPolicy.loads(data)
+    assert policy == policy_value
+    """
+
+    @staticmethod
+    def write_varint(out: bytearray, value: int):
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    @classmethod
+    def write_bytes(cls, out: bytearray, tag: int, data: Buffer):
+        out.append(tag)
+        cls.write_varint(out, len(data))
+        out += data
+
+    @classmethod
+    def encode_value(cls, out: bytearray, value: Any):
+        if value is None:
+            out.append(NULL)
+        elif value is False:
+            out.append(FALSE)
+        elif value is True:
+            out.append(TRUE)
+        elif isinstance(value, int):
+            out.append(INT)
+            cls.write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(FLOAT)
+            out += struct.pack('>d', value)
+        elif isinstance(value, str):
+            cls.write_bytes(out, STR, value.encode('utf-8'))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            cls.write_bytes(out, BYTES, value)
+        elif isinstance(value, (list, tuple)):
+            out.append(LIST)
+            cls.write_varint(out, len(value))
+            for item in value:
+                cls.encode_value(out, item)
+        elif isinstance(value, dict):
+            cls.encode_dict(out, value, lambda key, item: cls.encode_value(out, item))
+        else:
+            raise TypeError('cannot encode %s in a policy' % type(value).__name__)
+
+    @classmethod
+    def encode_dict(cls, out: bytearray, value: Dict[str, Any], encode_item):
+        out.append(DICT)
+        cls.write_varint(out, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError('policy keys must be strings')
+            encoded = key.encode('utf-8')
+            cls.write_varint(out, len(encoded))
+            out += encoded
+            encode_item(key, item)
+
+    @classmethod
+    def encode_field(cls, out: bytearray, value: Any, encoding: str):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            cls.write_bytes(out, HEX if encoding == 'hex' else BASE64, value)
+            return
+        if isinstance(value, str):
+            try:
+                if encoding == 'hex':
+                    raw = bytes.fromhex(value)
+                    canonical = raw.hex() == value
+                else:
+                    raw = base64.b64decode(value, validate=True)
+                    canonical = base64.b64encode(raw).decode('ascii') == value
+            except (ValueError, binascii.Error):
+                canonical = False
+            if canonical:
+                cls.write_bytes(out, HEX if encoding == 'hex' else BASE64, raw)
+                return
+        cls.encode_value(out, value)
+
+    @classmethod
+    def encode_policy(cls, out: bytearray, policy: Dict[str, Any]):
+        def item(key, value):
+            if key == 'factors' and isinstance(value, list):
+                out.append(LIST)
+                cls.write_varint(out, len(value))
+                for factor in value:
+                    cls.encode_factor(out, factor)
+            else:
+                cls.encode_value(out, value)
+        cls.encode_dict(out, policy, item)
+
+    @classmethod
+    def encode_factor(cls, out: bytearray, factor: Any):
+        if not isinstance(factor, dict):
+            cls.encode_value(out, factor)
+            return
+        factor_type = factor.get('type')
+
+        def item(key, value):
+            if key == 'pad':
+                cls.encode_field(out, value, 'base64')
+            elif key == 'params' and isinstance(value, dict):
+                if factor_type == 'stack':
+                    cls.encode_policy(out, value)
+                else:
+                    cls.encode_params(out, value, HEX_FIELDS.get(factor_type, ()))
+            else:
+                cls.encode_value(out, value)
+        cls.encode_dict(out, factor, item)
+
+    @classmethod
+    def encode_params(cls, out: bytearray, params: Dict[str, Any], hex_fields):
+        def item(key, value):
+            if key in hex_fields:
+                cls.encode_field(out, value, 'hex')
+            elif key in BASE64_FIELDS:
+                cls.encode_field(out, value, 'base64')
+            else:
+                cls.encode_value(out, value)
+        cls.encode_dict(out, params, item)
+
+    @classmethod
+    def dumps(cls, policy: Dict[str, Any]) -> bytes:
+        """
+        Encodes a policy.
+
+        Args:
+            policy (Dict[str, any]): The policy, as JSON-compatible values; byte fields may also be bytes-like.
+
+        Returns:
+            bytes: The binary policy.
+
+        Raises:
+            TypeError: If the policy holds a value that cannot be encoded.
+        """
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        cls.encode_policy(out, policy)
+        return bytes(out)
+
+    @classmethod
+    def loads(cls, data: Buffer, raw: bool = False) -> Dict[str, Any]:
+        """
+        Decodes a policy.
+
+        Args:
+            data (Buffer): The binary policy, e.g. bytes or an mmap.
+            raw (bool): Return byte fields as memoryview slices of data instead of base64 or hex text.
+
+        Returns:
+            Dict[str, any]: The policy.
+
+        Raises:
+            ValueError: If data is not a binary policy of a supported version, is truncated, or nests lists
+                and dictionaries more than MAX_DEPTH deep.
+        """
+        view = memoryview(data)
+        if bytes(view[:4]) != MAGIC:
+            raise ValueError('not a binary policy')
+        if len(view) < 5 or view[4] != VERSION:
+            raise ValueError('unsupported binary policy version')
+        try:
+            value, position = cls.decode_value(view, 5, raw)
+        except IndexError:
+            raise ValueError('truncated binary policy') from None
+        if position != len(view):
+            raise ValueError('trailing data after binary policy')
+        return value
+
+    @staticmethod
+    def read_varint(view: memoryview, position: int):
+        value = 0
+        shift = 0
+        while True:
+            byte = view[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
+
+    @classmethod
+    def read_bytes(cls, view: memoryview, position: int):
+        size, position = cls.read_varint(view, position)
+        if position + size > len(view):
+            raise IndexError('field past the end of the policy')
+        return view[position:position + size], position + size
+
+    @classmethod
+    def decode_value(cls, view: memoryview, position: int, raw: bool, depth: int = 0):
+        if depth > MAX_DEPTH:
+            raise ValueError('binary policy nested more than %d levels deep' % MAX_DEPTH)
+        tag = view[position]
+        position += 1
+        if tag == NULL:
+            return None, position
+        if tag == FALSE:
+            return False, position
+        if tag == TRUE:
+            return True, position
+        if tag == INT:
+            value, position = cls.read_varint(view, position)
+            return (value >> 1) if not value & 1 else -((value + 1) >> 1), position
+        if tag == FLOAT:
+            if position + 8 > len(view):
+                raise IndexError('field past the end of the policy')
+            return struct.unpack_from('>d', view, position)[0], position + 8
+        if tag == STR:
+            field, position = cls.read_bytes(view, position)
+            return str(field, 'utf-8'), position
+        if tag == BYTES:
+            field, position = cls.read_bytes(view, position)
+            return (field if raw else bytes(field)), position
+        if tag == BASE64:
+            field, position = cls.read_bytes(view, position)
+            return (field if raw else base64.b64encode(field).decode('ascii')), position
+        if tag == HEX:
+            field, position = cls.read_bytes(view, position)
+            return (field if raw else field.hex()), position
+        if tag == LIST:
+            count, position = cls.read_varint(view, position)
+            items = []
+            for _ in range(count):
+                item, position = cls.decode_value(view, position, raw, depth + 1)
+                items.append(item)
+            return items, position
+        if tag == DICT:
+            count, position = cls.read_varint(view, position)
+            items = {}
+            for _ in range(count):
+                key, position = cls.read_bytes(view, position)
+                items[str(key, 'utf-8')], position = cls.decode_value(view, position, raw, depth + 1)
+            return items, position
+        raise ValueError('unknown tag %d in binary policy' % tag)
+
+    @classmethod
+    def load(cls, path: str, raw: bool = False) -> Dict[str, Any]:
+        """
+        Decodes a binary policy file.
+
+        Byte fields decode to text unless raw is set, so only a raw load maps the file; otherwise the file is
+        read into bytes. A mapping cannot be closed while a memoryview of it is alive, and the views made
+        while decoding outlive the call whenever an error traceback holds on to them.
+
+        Args:
+            path (str): The path of the binary policy.
+            raw (bool): Map the file read-only and return byte fields as memoryview slices of the mapping,
+                which stays open while they are referenced.
+
+        Returns:
+            Dict[str, any]: The policy.
+
+        Raises:
+            ValueError: If the file is not a binary policy of a supported version, is truncated, or nests too deep.
+        """
+        with open(path, 'rb') as handle:
+            if not raw:
+                return cls.loads(handle.read())
+            if os.fstat(handle.fileno()).st_size == 0:
+                raise ValueError('not a binary policy')
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.loads(mapping, raw=True)
+
+    @classmethod
+    def dump(cls, policy: Dict[str, Any], path: str):
+        """
+        Writes a binary policy file atomically.
+
+        Args:
+            policy (Dict[str, any]): The policy.
+            path (str): The destination path.
+        """
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as handle:
+            handle.write(cls.dumps(policy))
+        os.replace(temporary, path)
@@ -0,0 +1,187 @@
+from typing import Any, Dict, Iterable, Tuple
+
+from ..secrets.cache import LRUCache
+
+
+class CompiledPolicy:
+    """
+    A flat, indexed form of a (possibly nested) policy, built once and reused across derivations.
+
+    Every non-stack factor id is given a bit, so a set of presented factors is a single integer mask. Each
+    level of the policy (the root and every stack's params) becomes a (threshold, mask, members) entry;
+    levels are stored children first, so evaluating the whole tree is one pass over the list in which a
+    level's satisfied leaves are counted with a popcount of presented & mask and its stacks are looked up
+    in the bitset of levels already found satisfied.
+
+    The compiled form depends only on the policy's structure (ids, types and thresholds), not on the factor
+    params, which change on every derive (HOTP counters, TOTP offsets, HMAC challenges). compile() caches it
+    under that structure, so the cache holds only ids, types and thresholds, never the policies themselves.
+
+    Attributes:
+        structure (tuple): The policy structure, used as the cache key.
+        ids (tuple): Every id in the policy, depth first.
+        unique (bool): True if no id appears twice.
+        bits (dict): The bit of every non-stack factor id.
+        types (dict): The type of every id.
+        paths (dict): The path of every id, as factor indices from the root policy.
+        levels (list): The (threshold, mask, members) entry of every level, children first; the root is last.
+
+    Methods:
+        compile(policy): Returns the CompiledPolicy of a policy, from the cache if possible.
+        cache_info(): Returns the compile cache counters.
+        mask(ids): Returns the bitmask of the presented factor ids.
+        satisfied(ids): Returns the bitset of satisfied levels.
+        evaluate(ids): Returns True if the presented factor ids satisfy the policy.
+        node(policy, id): Returns the factor dict with an id.
+
+    Example usage:
+    policy_value = {'threshold': 1, 'factors': [{'type': 'password', 'id': 'password', 'params': {}}]}
+    compiled = CompiledPolicy.compile(policy_value)
+    print(compiled.unique, compiled.evaluate(['password']))
+    """
+
+    cache = LRUCache(maxsize=1024)
+
+    def __init__(self, structure: Tuple):
+        """
+        Initializes a CompiledPolicy object from a policy structure.
+
+        Args:
+            structure (tuple): The structure returned by CompiledPolicy.structure_of.
+        """
+        self.structure = structure
+        self.ids = []
+        self.bits = {}
+        self.paths = {}
+        self.types = {}
+        self.levels = []
+        self.add_level(structure, ())
+        self.ids = tuple(self.ids)
+        self.unique = len(set(self.ids)) == len(self.ids)
+
+    @staticmethod
+    def structure_of(policy: Dict[str, Any]) -> Tuple:
+        """
+        Returns the structure of a policy: its threshold and the id, type and nested structure of each factor.
+
+        Args:
+            policy (Dict[str, any]): The policy.
+
+        Returns:
+            tuple: A hashable (threshold, ((id, type, structure or None), ...)) tuple.
+        """
+        return (policy['threshold'], tuple(
+            (factor['id'], factor['type'], CompiledPolicy.structure_of(factor['params']) if factor['type'] == 'stack' else None)
+            for factor in policy['factors']
+        ))
+
+    @classmethod
+    def compile(cls, policy: Dict[str, Any]) -> 'CompiledPolicy':
+        """
+        Returns the CompiledPolicy of a policy, from the cache if a policy of the same structure was compiled before.
+
+        Args:
+            policy (Dict[str, any]): The policy.
+
+        Returns:
+            CompiledPolicy: The compiled policy.
+        """
+        structure = cls.structure_of(policy)
+        return cls.cache.get(structure, lambda: cls(structure))
+
+    @classmethod
+    def cache_info(cls) -> Dict[str, int]:
+        """
+        Returns the compile cache counters.
+
+        Returns:
+            Dict[str, int]: A dictionary containing 'hits', 'misses', 'size' and 'maxsize'.
+        """
+        return cls.cache.info()
+
+    def add_level(self, structure: Tuple, path: Tuple[int, ...]) -> int:
+        threshold, factors = structure
+        mask = 0
+        members = []
+        for position, (factor_id, factor_type, child) in enumerate(factors):
+            self.ids.append(factor_id)
+            self.paths.setdefault(factor_id, path + (position,))
+            self.types.setdefault(factor_id, factor_type)
+            if child is not None:
+                members.append((factor_id, None, self.add_level(child, path + (position,))))
+            else:
+                bit = self.bits.setdefault(factor_id, 1 << len(self.bits))
+                mask |= bit
+                members.append((factor_id, bit, None))
+        self.levels.append((threshold, mask, tuple(members)))
+        return len(self.levels) - 1
+
+    def mask(self, ids: Iterable[str]) -> int:
+        """
+        Returns the bitmask of the presented factor ids; ids not in the policy are ignored.
+
+        Args:
+            ids (Iterable[str]): The presented factor ids.
+
+        Returns:
+            int: The bitmask.
+        """
+        bits = self.bits
+        mask = 0
+        for factor_id in ids:
+            mask |= bits.get(factor_id, 0)
+        return mask
+
+    def satisfied(self, ids: Iterable[str]) -> int:
+        """
+        Returns the bitset of levels satisfied by the presented factor ids.
+
+        Args:
+            ids (Iterable[str]): The presented factor ids.
+
+        Returns:
+            int: A bitset with bit i set if self.levels[i] is satisfied.
+        """
+        presented = self.mask(ids)
+        satisfied = 0
+        for index, (threshold, mask, members) in enumerate(self.levels):
+            actual = bin(presented & mask).count('1')
+            for _, bit, child in members:
+                if child is not None and satisfied >> child & 1:
+                    actual += 1
+            if actual >= threshold:
+                satisfied |= 1 << index
+        return satisfied
+
+    def evaluate(self, ids: Iterable[str]) -> bool:
+        """
+        Evaluates the policy based on the presented factor ids.
+
+        Args:
+            ids (Iterable[str]): The presented factor ids.
+
+        Returns:
+            bool: True if the policy is satisfied, False otherwise.
+        """
+        return bool(self.satisfied(ids) >> (len(self.levels) - 1) & 1)
+
+    def node(self, policy: Dict[str, Any], factor_id: str) -> Dict[str, Any]:
+        """
+        Returns the factor dict with an id from a policy of this structure.
+
+        Args:
+            policy (Dict[str, any]): A policy with the structure this object was compiled from.
+            factor_id (str): The factor id.
+
+        Returns:
+            Dict[str, any]: The factor dict.
+
+        Raises:
+            KeyError: If the id is not in the policy.
+        """
+        factor = None
+        level = policy
+        for position in self.paths[factor_id]:
+            factor = level['factors'][position]
+            level = factor['params']
+        return factor
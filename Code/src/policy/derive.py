@@ -1,9 +1,7 @@
-import json
-from typing import Dict, Any, Union
-from .validate import validate
-from .evaluate import evaluate
-from .derive.factors.stack import stack
-from .derive.key import key as derive_key
+from typing import Dict, Any
+from .compiled import CompiledPolicy
+from .stacks import StackEngine
+from ..derive.key import Key
 
 class KeyDerivation:
     """
@@ -12,6 +10,12 @@ class KeyDerivation:
     Attributes:
         policy (dict): The policy based on which the key is derived.
         factors (dict): The factors used to derive the key.
+        compiled (CompiledPolicy): The compiled form of the policy.
+        engine (StackEngine): Evaluates and expands the policy's stacks once for this derive.
+        planner (FactorPlanner): Picks the cheapest satisfying subset of the factors; all are derived if None.
+        trusted (bool): True if the policy was already validated, so Key skips its schema check.
+        cache (DerivedKeyCache): Caches the derived key by the presented factors; disabled if None.
+        cache_id (str): The user or policy id the cache entries are filed under.
 
     Methods:
         validate_and_evaluate(): Validates the policy and evaluates if there are sufficient factors to derive the key.
@@ -26,16 +30,30 @@ class KeyDerivation:
     print(result)
     """
 
-    def __init__(self, policy: Dict[str, Any], factors: Dict[str, Any]):
+    def __init__(self, policy: Dict[str, Any], factors: Dict[str, Any], executor=None, planner=None, trusted=False, cache=None, cache_id=None):
         """
         The constructor for KeyDerivation class.
 
         Parameters:
             policy (dict): The policy based on which the key is derived.
             factors (dict): The factors used to derive the key.
+            executor (KDFExecutor, optional): The executor the final KDF runs on; inline if omitted.
+            planner (FactorPlanner, optional): Derives only the cheapest satisfying subset of the factors;
+                every presented factor is derived if omitted.
+            trusted (bool): Skip schema validation for a policy that was already validated, such as one read
+                back from our own policy store.
+            cache (DerivedKeyCache, optional): Caches the derived key for repeat derives; disabled if omitted.
+            cache_id (str, optional): The user or policy id the cache entries are filed under; required to use the cache.
         """
         self.policy = policy
         self.factors = factors
+        self.executor = executor
+        self.planner = planner
+        self.trusted = trusted
+        self.cache = cache
+        self.cache_id = cache_id
+        self.compiled = CompiledPolicy.compile(policy)
+        self.engine = StackEngine(self.compiled, factors, executor, planner, trusted)
 
     def validate_and_evaluate(self):
         """
@@ -45,31 +63,22 @@ class KeyDerivation:
             TypeError: If the policy contains duplicate ids.
             ValueError: If there are insufficient factors to derive the key.
         """
-        ids = list(self.factors.keys())
-        if not validate(self.policy):
+        if not self.compiled.unique:
             raise TypeError('policy contains duplicate ids')
-        if not evaluate(self.policy, ids):
+        if not self.engine.evaluate():
             raise ValueError('insufficient factors to derive key')
 
     def expand_factors(self):
         """
-        Expands the factors based on the policy.
+        Expands the factors based on the policy, replacing every satisfied stack by its Stack factor.
+
+        With a planner, only the factors and stacks of the cheapest satisfying plan are expanded. The
+        evaluation done by validate_and_evaluate is reused rather than repeated.
 
         Returns:
             dict: The expanded factors.
         """
-        parsed_factors = {}
-        ids = list(self.factors.keys())
-
-        for factor in self.policy['factors']:
-            if factor['type'] == 'stack':
-                if evaluate(factor['params'], ids):
-                    parsed_factors[factor['id']] = stack(self.expand_factors(factor['params'], self.factors))
-            else:
-                if factor['id'] in ids:
-                    parsed_factors[factor['id']] = self.factors[factor['id']]
-
-        return parsed_factors
+        return self.engine.expand()
 
     async def derive_key(self):
         """
@@ -80,4 +89,4 @@ class KeyDerivation:
         """
         self.validate_and_evaluate()
         expanded = self.expand_factors()
-        return await derive_key(self.policy, expanded)
+        return await Key(self.policy, expanded, self.executor, self.trusted, self.cache, self.cache_id).generate_key()
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import argparse
+
+from .binary import BinaryPolicy
+
+JSON_SUFFIX = '.json'
+BINARY_SUFFIX = '.skdfp'
+
+
+class PolicyMigrator:
+    """
+    Converts policy files between the JSON format and the BinaryPolicy format, one file at a time.
+
+    Files are streamed from the sources (files or directories, walked recursively) and converted
+    individually, so memory use is bounded by the largest single policy rather than by the number of files.
+    Each output is written atomically, and with verify set every converted policy is decoded again and
+    compared with the input before it is written.
+
+    Attributes:
+        output (str): The output directory; outputs are written next to their inputs if None.
+        to_json (bool): Convert binary policies back to JSON instead of JSON to binary.
+        verify (bool): Check that every converted policy decodes to its input.
+        converted (int): The number of files converted so far.
+        failed (list): The (path, error) pairs of files that could not be converted.
+
+    Methods:
+        sources(paths): Yields the input files under the given paths.
+        convert(path, root): Converts one file and returns the output path.
+        migrate(paths): Converts every input file under the given paths.
+
+    Example usage:
+        migrator = PolicyMigrator(output='policies-binary', verify=True)
+        migrator.migrate(['policies'])
+        print(migrator.converted, migrator.failed)
+    """
+    def __init__(self, output=None, to_json=False, verify=False):
+        """
+        The constructor for PolicyMigrator class.
+
+        Parameters:
+            output (str, optional): The output directory; outputs are written next to their inputs if omitted.
+            to_json (bool): Convert binary policies back to JSON instead of JSON to binary.
+            verify (bool): Check that every converted policy decodes to its input.
+        """
+        self.output = output
+        self.to_json = to_json
+        self.verify = verify
+        self.converted = 0
+        self.failed = []
+
+    def sources(self, paths):
+        """
+        Yields the input files under the given paths, with the directory their output path is relative to.
+
+        Parameters:
+            paths (list): Files or directories.
+
+        Yields:
+            tuple: The input path and its root directory.
+        """
+        suffix = BINARY_SUFFIX if self.to_json else JSON_SUFFIX
+        for path in paths:
+            if os.path.isdir(path):
+                for directory, _, names in os.walk(path):
+                    for name in sorted(names):
+                        if name.endswith(suffix):
+                            yield os.path.join(directory, name), path
+            else:
+                yield path, os.path.dirname(path)
+
+    def target(self, path, root):
+        stem = os.path.splitext(path)[0] + (JSON_SUFFIX if self.to_json else BINARY_SUFFIX)
+        if self.output is None:
+            return stem
+        return os.path.join(self.output, os.path.relpath(stem, root or '.'))
+
+    def convert(self, path, root):
+        """
+        Converts one policy file.
+
+        Parameters:
+            path (str): The input file.
+            root (str): The directory the output path is relative to.
+
+        Returns:
+            str: The output path.
+
+        Raises:
+            ValueError: If verification is enabled and the converted policy does not decode to the input.
+        """
+        destination = self.target(path, root)
+        os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+
+        if self.to_json:
+            policy = BinaryPolicy.load(path)
+            data = json.dumps(policy)
+            if self.verify and BinaryPolicy.dumps(json.loads(data)) != BinaryPolicy.dumps(policy):
+                raise ValueError('converted policy does not match its input')
+            temporary = destination + '.tmp'
+            with open(temporary, 'w') as handle:
+                handle.write(data)
+            os.replace(temporary, destination)
+        else:
+            with open(path) as handle:
+                policy = json.load(handle)
+            data = BinaryPolicy.dumps(policy)
+            if self.verify and BinaryPolicy.loads(data) != policy:
+                raise ValueError('converted policy does not match its input')
+            temporary = destination + '.tmp'
+            with open(temporary, 'wb') as handle:
+                handle.write(data)
+            os.replace(temporary, destination)
+        return destination
+
+    def migrate(self, paths):
+        """
+        Converts every input file under the given paths; failures are recorded and do not stop the migration.
+
+        Parameters:
+            paths (list): Files or directories.
+
+        Returns:
+            int: The number of files converted.
+        """
+        for path, root in self.sources(paths):
+            try:
+                self.convert(path, root)
+                self.converted += 1
+            except Exception as error:  # any per-file failure, e.g. a corrupt or unsupported policy
+                self.failed.append((path, f'{type(error).__name__}: {error}'))
+        return self.converted
+
+
+def main():
+    """
+    Converts JSON policy files to the binary policy format, or back with --to-json.
+    """
+    parser = argparse.ArgumentParser(description='Convert SKDF policy files between JSON and the binary policy format.')
+    parser.add_argument('paths', nargs='+', help='policy files or directories')
+    parser.add_argument('--output', default=None, help='output directory (default: next to each input)')
+    parser.add_argument('--to-json', action='store_true', help='convert binary policies back to JSON')
+    parser.add_argument('--verify', action='store_true', help='check that every converted policy decodes to its input')
+    args = parser.parse_args()
+
+    migrator = PolicyMigrator(args.output, args.to_json, args.verify)
+    migrator.migrate(args.paths)
+    for path, error in migrator.failed:
+        print('%s: %s' % (path, error), file=sys.stderr)
+    print('converted %d, failed %d' % (migrator.converted, len(migrator.failed)))
+    return 1 if migrator.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .compiled import CompiledPolicy
+from ..setup.default import DEFAULT_FACTOR_COSTS
+
+BENCHMARK_SCENARIOS = {
+    'password': 'Password Factor',
+    'hotp': 'HOTP Factor',
+    'totp': 'TOTP Factor',
+    'hmacsha1': 'HMAC-SHA1 Factor',
+    'stack': 'Stack Factor'
+}
+BASELINE_SCENARIO = 'KDF Baseline'
+
+
+class FactorPlanner:
+    """
+    Picks the cheapest set of presented factors that still satisfies a policy.
+
+    When more factors are presented than the thresholds need, deriving all of them wastes work, most of all
+    for stacks, which run a nested key derivation. The planner walks the levels of a CompiledPolicy children
+    first: the cost of a level is the sum of its threshold cheapest satisfiable members, where a leaf costs
+    its type's entry in the cost model and a stack costs the 'stack' entry plus the cheapest plan of its own
+    level. Factor ids are unique within a valid policy, so choosing the cheapest members of each level
+    independently gives the cheapest plan overall.
+
+    Factors left out of the plan are treated like factors that were not presented: Key recovers their
+    original shares, so the regenerated policy keeps their params unchanged and they remain usable. That is
+    wrong for stateful factors: a presented HOTP code or HMAC response is used up, so leaving it out would
+    keep its counter or challenge and let it be replayed. Presented STATEFUL factors, and the stacks holding
+    them, are therefore always part of the plan, even if that derives more than the threshold needs.
+
+    Attributes:
+        STATEFUL (tuple): The factor types whose params advance on every derive, always derived when presented.
+
+    Args:
+        costs (Dict[str, float]): The relative cost of each factor type, and 'stack' for the nested derivation.
+        default (float): The cost of factor types missing from costs.
+
+    Example usage:
+    planner = FactorPlanner.from_benchmark('Benchmarking/results.json')
+    key_derivation_obj = KeyDerivation(policy_value, factors_value, planner=planner)
+    result = await key_derivation_obj.derive_key()
+    print(result)
+    """
+
+    STATEFUL = ('hotp', 'hmacsha1')
+
+    def __init__(self, costs: Optional[Dict[str, float]] = None, default: float = 1):
+        """
+        Initializes a FactorPlanner object.
+
+        Args:
+            costs (Dict[str, float], optional): The relative cost of each factor type; DEFAULT_FACTOR_COSTS if omitted.
+            default (float): The cost of factor types missing from costs.
+
+        Raises:
+            ValueError: If a cost is negative.
+        """
+        self.costs = dict(DEFAULT_FACTOR_COSTS if costs is None else costs)
+        if any(cost < 0 for cost in self.costs.values()) or default < 0:
+            raise ValueError('factor costs must not be negative')
+        self.default = default
+
+    @classmethod
+    def from_benchmark(cls, path: str, phase: str = 'derive') -> 'FactorPlanner':
+        """
+        Builds a planner from the results file written by Benchmarking/benchmark.py.
+
+        Each factor type costs the median time of its single-factor scenario. Every derive scenario also runs
+        the final KDF, which is the same whichever factors are planned and dwarfs the factors themselves, so
+        for the derive phase the KDF Baseline scenario (a derive whose only factor is a persisted share) is
+        subtracted first. The setup scenarios only enroll the factor, strength estimate included for passwords,
+        and are used as measured. The stack cost is the stack scenario less the password scenario it nests,
+        since the planner adds the nested factors separately. Types without a scenario keep their
+        DEFAULT_FACTOR_COSTS entry, scaled to the measured password cost.
+
+        Medians differ between runs by about the p99 - p50 spread of the scenarios, and after subtracting the
+        KDF the factor costs are often smaller than that. Unless the measured factor types differ by more than
+        the widest spread of the scenarios read, the measurement cannot rank them and DEFAULT_FACTOR_COSTS
+        are kept.
+
+        Args:
+            path (str): The path of the benchmark results JSON.
+            phase (str): The benchmark phase to read, 'derive' or 'setup'.
+
+        Returns:
+            FactorPlanner: The planner.
+
+        Raises:
+            ValueError: If phase is 'derive' and the results have no KDF Baseline derive timing.
+        """
+        with open(path) as handle:
+            results = {entry['name']: entry for entry in json.load(handle)['results']}
+
+        def timing(scenario):
+            entry = results.get(scenario)
+            if entry is not None and entry.get(phase) and entry[phase].get('p50_ns') is not None:
+                return entry[phase]
+            return None
+
+        measured = {}
+        noise = 0
+        for factor_type, scenario in BENCHMARK_SCENARIOS.items():
+            if timing(scenario) is not None:
+                measured[factor_type] = timing(scenario)['p50_ns']
+                noise = max(noise, timing(scenario).get('p99_ns', 0) - measured[factor_type])
+        if phase == 'derive':
+            baseline = timing(BASELINE_SCENARIO)
+            if baseline is None:
+                raise ValueError(f'benchmark results have no {BASELINE_SCENARIO} derive timing to subtract')
+            noise = max(noise, baseline.get('p99_ns', 0) - baseline['p50_ns'])
+            measured = {factor_type: max(cost - baseline['p50_ns'], 0) for factor_type, cost in measured.items()}
+        if 'stack' in measured and 'password' in measured:
+            measured['stack'] = max(measured['stack'] - measured['password'], 0)
+        leaves = [cost for factor_type, cost in measured.items() if factor_type != 'stack']
+        if len(leaves) < 2 or max(leaves) - min(leaves) <= noise:
+            return cls()
+
+        scale = measured['password'] / DEFAULT_FACTOR_COSTS['password'] if measured.get('password') else 1
+        costs = {factor_type: cost * scale for factor_type, cost in DEFAULT_FACTOR_COSTS.items()}
+        costs.update(measured)
+        return cls(costs, default=scale)
+
+    def cost(self, factor_type: str) -> float:
+        """
+        Returns the cost of a factor type.
+
+        Args:
+            factor_type (str): The factor type.
+
+        Returns:
+            float: The relative cost.
+        """
+        return self.costs.get(factor_type, self.default)
+
+    def plan(self, compiled: CompiledPolicy, ids: Iterable[str]) -> Optional[Tuple[float, int, int]]:
+        """
+        Returns the cheapest plan satisfying a compiled policy with the presented factor ids.
+
+        Args:
+            compiled (CompiledPolicy): The compiled policy.
+            ids (Iterable[str]): The presented factor ids.
+
+        Returns:
+            Optional[Tuple[float, int, int]]: The plan's cost, the bitmask of the leaf factors to derive and the
+            bitset of the levels (stacks and the root) to derive, or None if the policy is not satisfied.
+        """
+        presented = compiled.mask(ids)
+        best = []
+        for index, (threshold, _, members) in enumerate(compiled.levels):
+            options = []
+            for factor_id, bit, child in members:
+                if child is None:
+                    if presented & bit:
+                        factor_type = compiled.types[factor_id]
+                        options.append((self.cost(factor_type), bit, 0, factor_type in self.STATEFUL))
+                elif best[child] is not None:
+                    cost, leaves, levels, stateful = best[child]
+                    options.append((cost + self.cost('stack'), leaves, levels, stateful))
+            if len(options) < threshold:
+                best.append(None)
+                continue
+            # Stateful options come first and are all taken; the cheapest others fill up the threshold.
+            options.sort(key=lambda option: (not option[3], option[0]))
+            count = max(threshold, sum(option[3] for option in options))
+            cost, leaves, levels, stateful = 0, 0, 1 << index, False
+            for option in options[:count]:
+                cost += option[0]
+                leaves |= option[1]
+                levels |= option[2]
+                stateful = stateful or option[3]
+            best.append((cost, leaves, levels, stateful))
+        return best[-1][:3] if best[-1] is not None else None
+
+    def select(self, compiled: CompiledPolicy, factors: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Returns the presented factors and satisfied levels of the cheapest plan, in the form StackEngine.expand takes.
+
+        Args:
+            compiled (CompiledPolicy): The compiled policy.
+            factors (Dict[str, any]): The presented factor callables by id.
+
+        Returns:
+            Optional[Tuple[Dict[str, any], int]]: The factors to derive and the bitset of levels to derive, or
+            None if the policy is not satisfied.
+        """
+        planned = self.plan(compiled, factors.keys())
+        if planned is None:
+            return None
+        _, leaves, levels = planned
+        bits = compiled.bits
+        return {factor_id: factor for factor_id, factor in factors.items() if bits.get(factor_id, 0) & leaves}, levels
@@ -0,0 +1,103 @@
+import json
+from typing import Any, Dict, Optional
+
+from ..secrets.cache import LRUCache
+
+POLICY_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "SKDF key policy",
+    "type": "object",
+    "required": ["threshold", "size", "salt", "kdf", "factors"],
+    "properties": {
+        "threshold": {"type": "integer", "minimum": 1},
+        "size": {"type": "integer", "minimum": 1},
+        "salt": {"type": "string"},
+        "kdf": {
+            "type": "object",
+            "required": ["type"],
+            "properties": {
+                "type": {"enum": ["hkdf", "pbkdf2", "bcrypt", "scrypt", "argon2i", "argon2d", "argon2id"]},
+                "params": {"type": "object"}
+            }
+        },
+        "cache": {
+            "type": "object",
+            "properties": {
+                "ttl": {"type": "number", "minimum": 0}
+            }
+        },
+        "factors": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["id", "type", "params"],
+                "properties": {
+                    "id": {"type": "string", "minLength": 1},
+                    "type": {"type": "string", "minLength": 1},
+                    "pad": {"type": "string"},
+                    "params": {"type": "object"}
+                }
+            }
+        }
+    }
+}
+
+
+class PolicySchema:
+    """
+    A compiled JSON schema validator for key policies, shared by every Key in the process.
+
+    The schema is parsed, checked against its draft 7 metaschema and compiled into a jsonschema
+    Draft7Validator once; shared() keeps one PolicySchema per schema text, so validating a policy costs
+    only the compiled check, not a json.loads and a schema walk on every derive.
+
+    Example usage:
+    schema = PolicySchema.shared()
+    schema.validate(policy_value)
+    """
+
+    instances = LRUCache(maxsize=16)
+
+    def __init__(self, schema: Optional[Dict[str, Any]] = None):
+        """
+        Initializes a PolicySchema object, compiling the schema.
+
+        Args:
+            schema (Dict[str, any], optional): The JSON schema; POLICY_SCHEMA if omitted.
+
+        Raises:
+            jsonschema.SchemaError: If the schema itself is not a valid draft 7 schema.
+        """
+        from jsonschema import Draft7Validator  # imported on first use to keep package import cheap
+        self.schema = POLICY_SCHEMA if schema is None else schema
+        Draft7Validator.check_schema(self.schema)
+        self.validator = Draft7Validator(self.schema)
+
+    @classmethod
+    def shared(cls, schema_text: Optional[str] = None) -> 'PolicySchema':
+        """
+        Returns the process-wide PolicySchema for a schema, compiling it on first use.
+
+        Args:
+            schema_text (str, optional): The JSON schema as text; POLICY_SCHEMA if omitted.
+
+        Returns:
+            PolicySchema: The compiled schema.
+        """
+        return cls.instances.get(schema_text, lambda: cls(None if schema_text is None else json.loads(schema_text)))
+
+    def validate(self, policy: Dict[str, Any]):
+        """
+        Validates a policy against the compiled schema.
+
+        Args:
+            policy (Dict[str, any]): The policy.
+
+        Raises:
+            TypeError: If the policy is not valid according to the schema; its second argument lists the
+                error messages.
+        """
+        errors = [error.message for error in self.validator.iter_errors(policy)]
+        if errors:
+            raise TypeError('Invalid key policy', errors)
@@ -0,0 +1,139 @@
+from typing import Any, Dict, Optional
+
+from .compiled import CompiledPolicy
+from ..derive.factors.stack import Stack
+from ..setup.executor import KDFExecutor
+
+
+class StackEngine:
+    """
+    Evaluates and expands the stacks of a policy for one derive, computing each result once.
+
+    The satisfied levels are found in a single pass over the compiled policy and reused by every later
+    check; each level's expanded factors and each stack's Stack factor are built on first use and memoized
+    by level index, so stacks nested several levels deep are never walked or evaluated twice. The nested
+    Key of a stack derives its own factors concurrently, like the root Key, and sibling stacks run
+    concurrently with each other: their nested KDFs go to the derive's executor, or to a shared thread
+    pool when the derive has none, so one stack's KDF does not hold up the event loop for the others.
+
+    Attributes:
+        compiled (CompiledPolicy): The compiled policy.
+        factors (dict): The presented factor callables by id.
+        executor (KDFExecutor): The executor of the derive; inline if None.
+        planner (FactorPlanner): Picks the cheapest satisfying subset of the factors; all are derived if None.
+        trusted (bool): True if the nested policies were already validated.
+
+    Methods:
+        satisfied(): Returns the bitset of levels to derive, or None if the policy is not satisfied.
+        evaluate(): Returns True if the presented factors satisfy the policy.
+        expand(index): Returns the expanded factors of a level, the root by default.
+        stack(index): Returns the Stack factor of a stacked level.
+
+    Example usage:
+    engine = StackEngine(CompiledPolicy.compile(policy_value), factors_value)
+    if engine.evaluate():
+        expanded = engine.expand()
+    """
+
+    threads = None
+
+    def __init__(self, compiled: CompiledPolicy, factors: Dict[str, Any], executor=None, planner=None, trusted: bool = False):
+        """
+        Initializes a StackEngine object.
+
+        Args:
+            compiled (CompiledPolicy): The compiled policy.
+            factors (Dict[str, any]): The presented factor callables by id.
+            executor (KDFExecutor, optional): The executor of the derive; nested KDFs use a shared thread pool if omitted.
+            planner (FactorPlanner, optional): Derives only the cheapest satisfying subset of the factors.
+            trusted (bool): Skip schema validation of the nested policies.
+        """
+        self.compiled = compiled
+        self.factors = factors
+        self.executor = executor
+        self.planner = planner
+        self.trusted = trusted
+        self.selected = None
+        self.levels = None
+        self.expanded = {}
+        self.stacks = {}
+
+    @classmethod
+    def nested_executor(cls) -> KDFExecutor:
+        if cls.threads is None:
+            cls.threads = KDFExecutor('thread')
+        return cls.threads
+
+    def satisfied(self) -> Optional[int]:
+        """
+        Returns the bitset of levels to derive, computed on first call.
+
+        Without a planner these are all satisfied levels; with one, only the levels of the cheapest plan.
+
+        Returns:
+            int: The bitset of levels, or None if the policy is not satisfied.
+        """
+        if self.levels is None:
+            root = 1 << (len(self.compiled.levels) - 1)
+            if self.planner is None:
+                self.selected = self.factors
+                self.levels = self.compiled.satisfied(self.factors)
+            else:
+                selected = self.planner.select(self.compiled, self.factors)
+                self.selected, self.levels = selected if selected is not None else ({}, 0)
+            if not self.levels & root:
+                self.levels = 0
+        return self.levels or None
+
+    def evaluate(self) -> bool:
+        """
+        Returns True if the presented factors satisfy the policy.
+
+        Returns:
+            bool: True if the policy is satisfied, False otherwise.
+        """
+        return self.satisfied() is not None
+
+    def expand(self, index: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the expanded factors of a level: presented factors pass through and every stack to derive
+        is replaced by its Stack factor.
+
+        Args:
+            index (int, optional): The level index; the root if omitted.
+
+        Returns:
+            Dict[str, any]: The expanded factors.
+
+        Raises:
+            ValueError: If the policy is not satisfied.
+        """
+        if self.satisfied() is None:
+            raise ValueError('insufficient factors to derive key')
+        if index is None:
+            index = len(self.compiled.levels) - 1
+        if index not in self.expanded:
+            expanded = {}
+            for factor_id, _, child in self.compiled.levels[index][2]:
+                if child is not None:
+                    if self.levels >> child & 1:
+                        expanded[factor_id] = self.stack(child).generate_factor
+                elif factor_id in self.selected:
+                    expanded[factor_id] = self.selected[factor_id]
+            self.expanded[index] = expanded
+        return self.expanded[index]
+
+    def stack(self, index: int) -> Stack:
+        """
+        Returns the Stack factor of a stacked level, built from the level's expanded factors.
+
+        Args:
+            index (int): The level index of the stack's params.
+
+        Returns:
+            Stack: The stack factor.
+        """
+        if index not in self.stacks:
+            executor = self.executor if self.executor is not None else self.nested_executor()
+            self.stacks[index] = Stack(self.expand(index), executor, self.trusted)
+        return self.stacks[index]
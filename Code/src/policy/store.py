@@ -0,0 +1,547 @@
+import os
+import mmap
+import time
+import zlib
+import struct
+import asyncio
+import hashlib
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple
+
+from .binary import BinaryPolicy
+from .derive import KeyDerivation
+
+LOG_NAME = 'policies.log'
+INDEX_NAME = 'policies.idx'
+
+LOG_HEADER = struct.Struct('>4sBQQ')  # magic, format version, generation, next sequence number
+INDEX_HEADER = struct.Struct('>4sQQQ')  # magic, generation of the log it indexes, log end, entry count
+RECORD_HEADER = struct.Struct('>4sBHIQI')  # magic, flags, key length, value length, sequence, crc32 of sequence, key and value
+SEQUENCE = struct.Struct('>Q')
+INDEX_ENTRY = struct.Struct('>QQ')  # key hash, record offset
+
+LOG_MAGIC = b'SKDL'
+INDEX_MAGIC = b'SKDI'
+RECORD_MAGIC = b'SKDR'
+FORMAT = 1
+
+PUT = 0
+DELETE = 1
+TOMBSTONE = -1
+
+
+def key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
+
+
+def record_crc(sequence: int, body: bytes) -> int:
+    return zlib.crc32(body, zlib.crc32(SEQUENCE.pack(sequence)))
+
+
+class IndexHashes:
+    """
+    A read-only sequence view of the key hashes in a mapped index, for bisect.
+    """
+
+    def __init__(self, mapping, count: int):
+        self.mapping = mapping
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.mapping, INDEX_HEADER.size + INDEX_ENTRY.size * index)[0]
+
+    def offset(self, index: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.mapping, INDEX_HEADER.size + INDEX_ENTRY.size * index)[1]
+
+
+class PolicyStore:
+    """
+    A local, durable store of key policies by user id: an append-only log with a mapped index.
+
+    Every put appends one record (a BinaryPolicy with a CRC) to the log. Each record carries the next
+    number of a store-wide sequence, which is the policy's version: it only grows, survives compaction
+    (records are copied unchanged and the log header keeps the counter) and is never reused for a user, even
+    after a delete. Records written since the last compaction are indexed in memory; older ones through
+    a sorted index file of (key hash, offset) entries that is mapped with mmap and searched with bisect,
+    so opening a store and looking a user up never load the other users' policies or index entries.
+
+    Appends are flushed to the OS at once but fsync-ed in batches: an append fsyncs once sync_every records
+    are pending or sync_interval seconds have passed since the last fsync, and sync() and close() fsync any
+    pending records. There is no background timer, so the records of an idle store stay unsynced until the
+    next append, sync() or close(). Once the log holds more superseded bytes than compact_ratio of its
+    size, or the in-memory index grows past memtable_limit, the live records are copied into a new log and
+    a new index is written; both carry a generation number, so a crash between the two renames is detected
+    on the next open and the index is rebuilt from the log.
+    A torn record at the end of the log is truncated on open.
+
+    Attributes:
+        directory (str): The directory holding the log and index files.
+        sync_every (int): The number of records appended between two fsyncs.
+        sync_interval (float): The time in seconds since the last fsync after which an append fsyncs.
+        compact_ratio (float): The fraction of superseded bytes in the log that triggers a compaction.
+        compact_min (int): The log size in bytes below which the log is never compacted.
+        memtable_limit (int): The number of in-memory index entries that triggers a compaction.
+
+    Methods:
+        get(user_id, raw): Returns a user's policy, or None.
+        get_versioned(user_id, raw): Returns a user's policy and its version.
+        put(user_id, policy, version, sync, trusted): Stores a policy, optionally only if the version still matches.
+        update(user_id, function, sync, trusted): Atomically replaces a user's policy with function(policy).
+        delete(user_id): Removes a user's policy.
+        derive(user_id, factors, executor, planner, cache): Derives a user's key and returns it with the policy version (awaitable).
+        commit(user_id, result, version): Stores the regenerated policy of a verified derive.
+        sync(): Flushes appended records to disk.
+        compact(): Rewrites the log with only the live records.
+        metrics(): Returns size and activity counters.
+        close(): Syncs and closes the store.
+
+    Example usage:
+        with PolicyStore('/var/lib/skdf') as store:
+            store.put('alice', policy_value)
+            result, version = await store.derive('alice', factors_value, executor=KDFExecutor('auto'))
+            if verify(result.key):
+                store.commit('alice', result, version)
+    """
+    def __init__(self, directory, sync_every=64, sync_interval=0.05, compact_ratio=0.5, compact_min=1024 * 1024, memtable_limit=1000000):
+        """
+        The constructor for PolicyStore class; opens or creates the store.
+
+        Parameters:
+            directory (str): The directory holding the log and index files; created if missing.
+            sync_every (int): The number of records appended between two fsyncs.
+            sync_interval (float): The time in seconds since the last fsync after which an append fsyncs;
+                checked on append only, there is no timer.
+            compact_ratio (float): The fraction of superseded bytes in the log that triggers a compaction.
+            compact_min (int): The log size in bytes below which the log is never compacted.
+            memtable_limit (int): The number of in-memory index entries that triggers a compaction.
+
+        Raises:
+            ValueError: If a setting is out of range, or the log is not a policy store log.
+        """
+        if not isinstance(sync_every, int) or sync_every <= 0:
+            raise ValueError('sync_every must be a positive integer')
+        if sync_interval < 0:
+            raise ValueError('sync_interval must not be negative')
+        if not 0 < compact_ratio <= 1:
+            raise ValueError('compact_ratio must be in (0, 1]')
+        self.directory = directory
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.memtable_limit = memtable_limit
+        self.lock = threading.RLock()
+        self.memtable = {}
+        self.index = None
+        self.index_file = None
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.dead = 0
+        self.syncs = 0
+        self.compactions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.open()
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, LOG_NAME)
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def open(self):
+        if not os.path.exists(self.log_path):
+            self.write_empty_log(self.log_path, 1, 1)
+        self.append_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+        self.read_fd = os.open(self.log_path, os.O_RDONLY)
+        magic, version, self.generation, self.sequence = LOG_HEADER.unpack(os.pread(self.read_fd, LOG_HEADER.size, 0))
+        if magic != LOG_MAGIC or version != FORMAT:
+            raise ValueError('not a policy store log')
+        self.size = os.fstat(self.read_fd).st_size
+
+        start = self.map_index()
+        rebuilt = start == LOG_HEADER.size
+        self.replay(start)
+        if rebuilt and self.memtable:
+            self.compact()
+
+    @staticmethod
+    def write_empty_log(path, generation, sequence):
+        with open(path, 'wb') as handle:
+            handle.write(LOG_HEADER.pack(LOG_MAGIC, FORMAT, generation, sequence))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def map_index(self):
+        if not os.path.exists(self.index_path):
+            return LOG_HEADER.size
+        handle = open(self.index_path, 'rb')
+        try:
+            header = handle.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                raise ValueError
+            magic, generation, log_end, count = INDEX_HEADER.unpack(header)
+            expected = INDEX_HEADER.size + INDEX_ENTRY.size * count
+            if magic != INDEX_MAGIC or generation != self.generation or log_end > self.size or os.fstat(handle.fileno()).st_size != expected:
+                raise ValueError
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            handle.close()
+            return LOG_HEADER.size
+        self.index_file = handle
+        self.index = IndexHashes(mapping, count)
+        return log_end
+
+    def replay(self, start):
+        position = start
+        with open(self.log_path, 'rb') as handle:
+            handle.seek(position)
+            while True:
+                header = handle.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                magic, flags, key_length, value_length, sequence, crc = RECORD_HEADER.unpack(header)
+                body = handle.read(key_length + value_length)
+                if magic != RECORD_MAGIC or len(body) < key_length + value_length or record_crc(sequence, body) != crc:
+                    break
+                self.sequence = max(self.sequence, sequence + 1)
+                key = body[:key_length].decode('utf-8')
+                self.supersede(key)
+                self.memtable[key] = TOMBSTONE if flags == DELETE else position
+                position += RECORD_HEADER.size + len(body)
+        if position < self.size:
+            os.truncate(self.log_path, position)
+            self.size = position
+
+    def supersede(self, user_id):
+        previous = self.locate(user_id)
+        if previous is not None:
+            self.dead += self.record_size(previous)
+
+    def record_size(self, offset):
+        _, _, key_length, value_length, _, _ = RECORD_HEADER.unpack(os.pread(self.read_fd, RECORD_HEADER.size, offset))
+        return RECORD_HEADER.size + key_length + value_length
+
+    def read_key(self, offset):
+        _, _, key_length, _, _, _ = RECORD_HEADER.unpack(os.pread(self.read_fd, RECORD_HEADER.size, offset))
+        return os.pread(self.read_fd, key_length, offset + RECORD_HEADER.size)
+
+    def read_sequence(self, offset):
+        return RECORD_HEADER.unpack(os.pread(self.read_fd, RECORD_HEADER.size, offset))[4]
+
+    def read_record(self, offset):
+        _, flags, key_length, value_length, sequence, _ = RECORD_HEADER.unpack(os.pread(self.read_fd, RECORD_HEADER.size, offset))
+        body = os.pread(self.read_fd, key_length + value_length, offset + RECORD_HEADER.size)
+        return flags, sequence, body[:key_length], memoryview(body)[key_length:]
+
+    def version(self, user_id):
+        """
+        Returns the sequence number of a user's live record, or 0.
+        """
+        offset = self.locate(user_id)
+        return 0 if offset is None else self.read_sequence(offset)
+
+    def locate(self, user_id):
+        """
+        Returns the offset of a user's live record, or None.
+        """
+        offset = self.memtable.get(user_id)
+        if offset is not None:
+            return None if offset == TOMBSTONE else offset
+        if self.index is None:
+            return None
+        key = user_id.encode('utf-8')
+        wanted = key_hash(key)
+        index = bisect_left(self.index, wanted)
+        while index < len(self.index) and self.index[index] == wanted:
+            offset = self.index.offset(index)
+            if self.read_key(offset) == key:
+                return offset
+            index += 1
+        return None
+
+    def get_versioned(self, user_id, raw=False) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Returns a user's policy and its version.
+
+        Parameters:
+            user_id (str): The user id.
+            raw (bool): Return byte fields as memoryviews instead of base64 or hex text (see BinaryPolicy.loads).
+
+        Returns:
+            tuple: The policy, or None if the user has none, and its version: the sequence number of its record,
+                   0 if the user has none.
+        """
+        with self.lock:
+            offset = self.locate(user_id)
+            if offset is None:
+                return None, 0
+            _, sequence, _, value = self.read_record(offset)
+        return BinaryPolicy.loads(value, raw), sequence
+
+    def get(self, user_id, raw=False) -> Optional[Dict[str, Any]]:
+        """
+        Returns a user's policy.
+
+        Parameters:
+            user_id (str): The user id.
+            raw (bool): Return byte fields as memoryviews instead of base64 or hex text (see BinaryPolicy.loads).
+
+        Returns:
+            dict: The policy, or None if the user has none.
+        """
+        return self.get_versioned(user_id, raw)[0]
+
+    def append(self, user_id, flags, value, sync):
+        key = user_id.encode('utf-8')
+        if len(key) > 0xffff:
+            raise ValueError('user id is too long')
+        body = key + value
+        sequence = self.sequence
+        record = RECORD_HEADER.pack(RECORD_MAGIC, flags, len(key), len(value), sequence, record_crc(sequence, body)) + body
+        offset = self.size
+        os.write(self.append_fd, record)
+        self.sequence += 1
+        self.size += len(record)
+        self.supersede(user_id)
+        self.memtable[user_id] = TOMBSTONE if flags == DELETE else offset
+        self.pending += 1
+        if sync or self.pending >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+        if self.size >= self.compact_min and self.dead > self.compact_ratio * self.size or len(self.memtable) > self.memtable_limit:
+            self.compact()
+        return sequence
+
+    def put(self, user_id, policy, version=None, sync=False, trusted=False) -> bool:
+        """
+        Stores a user's policy.
+
+        Parameters:
+            user_id (str): The user id.
+            policy (dict): The policy.
+            version (int, optional): Store only if the user's current version is this one (0 for no policy);
+                unconditional if omitted.
+            sync (bool): fsync before returning instead of waiting for the next batch.
+            trusted (bool): Skip schema validation for a policy that was already validated, such as one
+                regenerated by a derive.
+
+        Returns:
+            bool: True if the policy was stored, False if the version did not match.
+
+        Raises:
+            TypeError: If the policy is not valid according to the policy schema.
+        """
+        if not trusted:
+            from .schema import PolicySchema  # the validator is only needed for new, untrusted policies
+            PolicySchema.shared().validate(policy)
+        value = BinaryPolicy.dumps(policy)
+        with self.lock:
+            if version is not None and self.version(user_id) != version:
+                return False
+            self.append(user_id, PUT, value, sync)
+        return True
+
+    def update(self, user_id, function, sync=False, trusted=False):
+        """
+        Atomically replaces a user's policy with function(policy).
+
+        Parameters:
+            user_id (str): The user id.
+            function (function): Takes the current policy, or None, and returns the new policy, or None to delete it.
+            sync (bool): fsync before returning instead of waiting for the next batch.
+            trusted (bool): Skip schema validation of the new policy, as in put().
+
+        Returns:
+            dict: The new policy.
+
+        Raises:
+            TypeError: If the new policy is not valid according to the policy schema.
+        """
+        with self.lock:
+            policy = function(self.get(user_id))
+            if policy is None:
+                self.delete(user_id, sync)
+            else:
+                if not trusted:
+                    from .schema import PolicySchema
+                    PolicySchema.shared().validate(policy)
+                self.append(user_id, PUT, BinaryPolicy.dumps(policy), sync)
+            return policy
+
+    def delete(self, user_id, sync=False) -> bool:
+        """
+        Removes a user's policy.
+
+        Parameters:
+            user_id (str): The user id.
+            sync (bool): fsync before returning instead of waiting for the next batch.
+
+        Returns:
+            bool: True if the user had a policy.
+        """
+        with self.lock:
+            if self.locate(user_id) is None:
+                return False
+            self.append(user_id, DELETE, b'', sync)
+            return True
+
+    async def derive(self, user_id, factors, executor=None, planner=None, cache=None):
+        """
+        Derives a user's key from the stored policy, without storing the regenerated policy.
+
+        The stored policy was validated when it was first put, so it is derived as trusted. The regenerated
+        policy advances one-time factors such as HOTP counters and HMAC challenges, so it must only be stored
+        once the caller has verified the key, and never by deriving again from inputs that were already used:
+        pass the result and the returned version to commit().
+
+        Parameters:
+            user_id (str): The user id.
+            factors (dict): The factors used to derive the key.
+            executor (KDFExecutor, optional): The executor the final KDF runs on; inline if omitted.
+            planner (FactorPlanner, optional): Derives only the cheapest satisfying subset of the factors.
+            cache (DerivedKeyCache, optional): Caches the derived key under the user id; disabled if omitted.
+
+        Returns:
+            tuple: The derived key and the version of the policy it was derived from.
+
+        Raises:
+            KeyError: If the user has no policy.
+        """
+        policy, version = await asyncio.to_thread(self.get_versioned, user_id, True)
+        if policy is None:
+            raise KeyError(user_id)
+        result = await KeyDerivation(policy, factors, executor, planner, True, cache, user_id).derive_key()
+        return result, version
+
+    def commit(self, user_id, result, version, sync=False):
+        """
+        Stores the policy regenerated by a derive, once the caller has verified its key.
+
+        Parameters:
+            user_id (str): The user id.
+            result: The derived key returned by derive().
+            version (int): The version returned by derive().
+            sync (bool): fsync before returning instead of waiting for the next batch.
+
+        Raises:
+            RuntimeError: If the user's policy changed since the derive; the result must then be discarded and
+                the user asked for fresh factors.
+        """
+        if not self.put(user_id, result.policy, version, sync, True):
+            raise RuntimeError('policy of user %r changed since it was derived' % user_id)
+
+    def sync(self):
+        """
+        Flushes appended records to disk.
+        """
+        with self.lock:
+            if self.pending:
+                os.fsync(self.append_fd)
+                self.syncs += 1
+            self.pending = 0
+            self.last_sync = time.monotonic()
+
+    def live(self):
+        if self.index is not None:
+            for index in range(len(self.index)):
+                offset = self.index.offset(index)
+                if self.read_key(offset).decode('utf-8') not in self.memtable:
+                    yield offset
+        for offset in self.memtable.values():
+            if offset != TOMBSTONE:
+                yield offset
+
+    def compact(self):
+        """
+        Rewrites the log with only the live records and writes a new index for it.
+        """
+        with self.lock:
+            self.sync()
+            generation = self.generation + 1
+            log_temporary = self.log_path + '.compact'
+            index_temporary = self.index_path + '.tmp'
+
+            entries = []
+            with open(log_temporary, 'wb') as handle:
+                handle.write(LOG_HEADER.pack(LOG_MAGIC, FORMAT, generation, self.sequence))
+                position = LOG_HEADER.size
+                for offset in self.live():
+                    size = self.record_size(offset)
+                    record = os.pread(self.read_fd, size, offset)
+                    _, _, key_length, _, _, _ = RECORD_HEADER.unpack_from(record)
+                    entries.append((key_hash(record[RECORD_HEADER.size:RECORD_HEADER.size + key_length]), position))
+                    handle.write(record)
+                    position += size
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            entries.sort()
+            with open(index_temporary, 'wb') as handle:
+                handle.write(INDEX_HEADER.pack(INDEX_MAGIC, generation, position, len(entries)))
+                for entry in entries:
+                    handle.write(INDEX_ENTRY.pack(*entry))
+                handle.flush()
+                os.fsync(handle.fileno())
+            del entries
+
+            self.close_files()
+            os.replace(log_temporary, self.log_path)
+            os.replace(index_temporary, self.index_path)
+            directory = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+            self.memtable = {}
+            self.dead = 0
+            self.compactions += 1
+            self.open()
+
+    def metrics(self):
+        """
+        Returns size and activity counters.
+
+        Returns:
+            dict: A dictionary containing 'log_bytes', 'dead_bytes', 'indexed', 'memtable', 'pending',
+                  'syncs', 'compactions' and 'generation'.
+        """
+        with self.lock:
+            return {
+                'log_bytes': self.size,
+                'dead_bytes': self.dead,
+                'indexed': len(self.index) if self.index is not None else 0,
+                'memtable': len(self.memtable),
+                'pending': self.pending,
+                'syncs': self.syncs,
+                'compactions': self.compactions,
+                'generation': self.generation
+            }
+
+    def close_files(self):
+        if self.index is not None:
+            self.index.mapping.close()
+            self.index_file.close()
+            self.index = None
+            self.index_file = None
+        os.close(self.append_fd)
+        os.close(self.read_fd)
+
+    def close(self):
+        """
+        Syncs and closes the store.
+        """
+        with self.lock:
+            self.sync()
+            self.close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded least-recently-used cache with hit and miss counters.
+
+    Example usage:
+    cache = LRUCache(maxsize=2)
+    value = cache.get(('your', 'key'), lambda: 'your_value')
+    print(value, cache.info())
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initializes an LRUCache object.
+
+        Args:
+            maxsize (int): The maximum number of entries kept.
+
+        Raises:
+            ValueError: If maxsize is not a positive integer.
+        """
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError('maxsize must be a positive integer')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, computing and storing it on a miss.
+
+        The value is computed outside of the lock, so two threads missing on the same key at once may
+        both compute it; the values must therefore be deterministic.
+
+        Args:
+            key (Hashable): The cache key.
+            compute (Callable[[], Any]): Called to produce the value on a miss.
+
+        Returns:
+            Any: The cached or freshly computed value.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def info(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dict[str, int]: A dictionary containing 'hits', 'misses', 'size' and 'maxsize'.
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
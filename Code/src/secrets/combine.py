@@ -1,7 +1,9 @@
-import secrets
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from typing import List, Optional
+from .xor import xor
+
+if TYPE_CHECKING:
+    from .shamir import ShamirContext
 
 class SecretCombiner:
     """
@@ -16,7 +18,7 @@ class SecretCombiner:
     print(result)
     """
 
-    def __init__(self, shares: List[Optional[bytes]], k: int, n: int):
+    def __init__(self, shares: List[Optional[bytes]], k: int, n: int, context: Optional['ShamirContext'] = None):
         """
         Initializes a SecretCombiner object.
 
@@ -24,6 +26,8 @@ class SecretCombiner:
             shares (List[Optional[bytes]]): A list of secret shares.
             k (int): The minimum number of shares required to retrieve the secret.
             n (int): The total number of shares.
+            context (ShamirContext, optional): The Shamir context to use; the shared context of the field
+                secrets.js uses for n shares if omitted.
 
         Raises:
             TypeError: If shares is not a list.
@@ -33,6 +37,7 @@ class SecretCombiner:
         self.shares = shares
         self.k = k
         self.n = n
+        self.context = context
         self.validate_inputs()
 
     def validate_inputs(self):
@@ -54,6 +59,8 @@ class SecretCombiner:
             raise ValueError('k must be a positive integer')
         if self.k > self.n:
             raise ValueError('k must be less than or equal to n')
+        if self.n > 1048574:  # bits_for(n) must not exceed the 20-bit field of secrets.js
+            raise ValueError('n must be at most 1048574')
         if len(self.shares) < self.k:
             raise ValueError('not enough shares provided to retrieve secret')
 
@@ -71,26 +78,28 @@ class SecretCombiner:
         if self.k == 1:  # 1-of-n
             return next(x for x in self.shares if x is not None)
         elif self.k == self.n:  # n-of-n
-            secret = self.shares[0]
+            secret = bytearray(self.shares[0])
             for share in self.shares[1:]:
                 if share is not None:
-                    secret = bytes(x ^ y for x, y in zip(secret, share))
-            return secret
+                    xor(secret, share, inplace=True)
+            return bytes(secret)
         else:  # k-of-n
             if len(self.shares) != self.n:
                 raise ValueError('provide a shares list of size n; use None for unknown shares')
 
-            bits = max(int((self.n + 1).bit_length()), 3)
-            secrets.init(bits)
-
-            formatted = []
+            xs = []
+            ys = []
 
             for index, share in enumerate(self.shares):
                 if share is not None:
-                    value = f'{bits} {index + 1:0{bits}x}{share.hex()}'
-                    formatted.append(value)
+                    xs.append(index + 1)
+                    ys.append(share)
 
-            if len(formatted) < self.k:
+            if len(xs) < self.k:
                 raise ValueError('not enough shares provided to retrieve secret')
 
-            return bytes.fromhex(secrets.combine(formatted))
+            if self.context is None:
+                from .shamir import ShamirContext  # NumPy is only needed for k-of-n policies
+                self.context = ShamirContext.shared(ShamirContext.bits_for(self.n))
+
+            return self.context.combine(xs[:self.k], ys[:self.k], self.k, self.n)
@@ -1,5 +1,7 @@
-import secrets
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from .shamir import ShamirContext
 
 class SecretRecoverer:
     """
@@ -12,7 +14,7 @@ class SecretRecoverer:
     print(result)
     """
 
-    def __init__(self, shares: List[Optional[bytes]], k: int, n: int):
+    def __init__(self, shares: List[Optional[bytes]], k: int, n: int, context: Optional['ShamirContext'] = None):
         """
         Initializes a Recover object.
 
@@ -20,6 +22,8 @@ class SecretRecoverer:
             shares (List[Optional[bytes]]): A list of shares, where each share is an optional byte string.
             k (int): The minimum number of shares required to recover the secret.
             n (int): The total number of shares available.
+            context (ShamirContext, optional): The Shamir context to use; the shared context of the field
+                secrets.js uses for n shares if omitted.
 
         Returns:
             None
@@ -27,6 +31,7 @@ class SecretRecoverer:
         self.shares = shares
         self.k = k
         self.n = n
+        self.context = context
         self.validate_inputs()
 
     def validate_inputs(self):
@@ -48,6 +53,8 @@ class SecretRecoverer:
             raise ValueError('k must be a positive integer')
         if self.k > self.n:
             raise ValueError('k must be less than or equal to n')
+        if self.n > 1048574:  # bits_for(n) must not exceed the 20-bit field of secrets.js
+            raise ValueError('n must be at most 1048574')
         if len(self.shares) < self.k:
             raise ValueError('not enough shares provided to retrieve secret')
 
@@ -70,27 +77,24 @@ class SecretRecoverer:
             if len(self.shares) != self.n:
                 raise ValueError('provide a shares list of size n; use None for unknown shares')
 
-            bits = max(int((self.n + 1).bit_length()), 3)
-            secrets.init(bits)
-
-            formatted = []
+            xs = []
+            ys = []
 
             for index, share in enumerate(self.shares):
                 if share is not None:
-                    value = f'{bits} {index + 1:0{bits}x}{share.hex()}'
-                    formatted.append(value)
+                    xs.append(index + 1)
+                    ys.append(share)
 
-            if len(formatted) < self.k:
+            if len(xs) < self.k:
                 raise ValueError('not enough shares provided to retrieve secret')
 
-            new_shares = []
-
-            for i in range(self.n):
-                new_share = secrets.newShare(i + 1, formatted)
-                components = secrets.extractShareComponents(new_share)
-                if len(components.data) % 2 == 1:
-                    components.data = '0' + components.data
+            if self.context is None:
+                from .shamir import ShamirContext  # NumPy is only needed for k-of-n policies
+                self.context = ShamirContext.shared(ShamirContext.bits_for(self.n))
 
-                new_shares.append(bytes.fromhex(components.data))
+            missing = [i + 1 for i, share in enumerate(self.shares) if share is None]
+            regenerated = iter(self.context.evaluate(xs[:self.k], ys[:self.k], missing, self.k, self.n))
+            size = self.context.share_size(len(ys[0]))
 
-            return new_shares
\ No newline at end of file
+            # Present shares are returned at the length of regenerated ones, as secrets.newShare did.
+            return [bytes(size - len(share)) + bytes(share) if share is not None else next(regenerated) for share in self.shares]
@@ -0,0 +1,403 @@
+import os
+import threading
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .cache import LRUCache
+
+ShareData = Union[bytes, bytearray, memoryview]
+
+MIN_BITS = 3
+MAX_BITS = 20
+
+# The primitive polynomials of secrets.js, including the x^bits term, by field size in bits.
+PRIMITIVES = {
+    3: 0x0000b, 4: 0x00013, 5: 0x00025, 6: 0x00043, 7: 0x00083, 8: 0x0011d, 9: 0x00211, 10: 0x00409,
+    11: 0x00805, 12: 0x01053, 13: 0x0201b, 14: 0x0402b, 15: 0x08003, 16: 0x1002d, 17: 0x20009,
+    18: 0x40027, 19: 0x80027, 20: 0x100009
+}
+
+
+def build_tables(bits: int, primitive: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the exponent and logarithm tables of GF(2^bits) for a primitive polynomial.
+
+    The exponent table is doubled in length so that the sum of two logarithms can be looked up
+    without reducing it modulo the multiplicative order first.
+
+    Args:
+        bits (int): The field size in bits.
+        primitive (int): The primitive polynomial, including the x^bits term.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The exponent table (2 * (2^bits - 1) entries) and the logarithm table (2^bits entries).
+
+    Raises:
+        ValueError: If the polynomial is not a primitive polynomial of degree bits.
+    """
+    size = 1 << bits
+    order = size - 1
+    if not isinstance(primitive, int) or not size <= primitive < 2 * size:
+        raise ValueError(f'primitive must be a polynomial of degree {bits}')
+    exp = np.zeros(2 * order, dtype=np.int32)
+    log = np.zeros(size, dtype=np.int32)
+    x = 1
+    for i in range(order):
+        if i > 0 and x == 1:
+            raise ValueError('primitive must be a primitive polynomial')
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & size:
+            x ^= primitive
+    exp[order:] = exp[:order]
+    exp.flags.writeable = False
+    log.flags.writeable = False
+    return exp, log
+
+
+class ShamirContext:
+    """
+    A class that performs Shamir secret sharing arithmetic over GF(2^bits) in the share layout of secrets.js.
+
+    Each context owns its field parameters (field size, primitive polynomial and log/exp tables) and its
+    coefficient cache; nothing is process-global, so contexts can be used from many threads at once and
+    contexts over different fields can coexist. ShamirContext.shared(bits) returns one context per field
+    size for the whole process.
+
+    A share is the big-endian bit string of its field elements, `bits` bits each, left-padded with zero
+    bits to whole bytes. A secret is split as the bit string '1' followed by its bytes, cut into field
+    elements from the least significant end; combining finds that leading 1 again and returns the bits
+    after it. This is the layout secrets.js produces and the string-based combine/recover consumed, with
+    the field picked by bits_for(n), so shares made for the old code combine to the same secret.
+
+    Lagrange coefficients depend only on which shares are present, so they are kept in a bounded LRU
+    cache keyed by (present share indices, k, n, evaluation points); a repeated combination of factors
+    then costs a single weighted sum per field element. context.cache_info() reports the cache hit and
+    miss counts.
+
+    Example usage:
+    context = ShamirContext.shared(ShamirContext.bits_for(3))
+    shares = context.split(b'your_secret', 2, 3)
+    secret = context.combine([1, 3], [shares[0], shares[2]], 2, 3)
+    print(secret)
+    """
+
+    contexts = {}
+    lock = threading.Lock()
+
+    def __init__(self, bits: int = 8, primitive: int = None, cache_size: int = 256):
+        """
+        Initializes a ShamirContext object.
+
+        Args:
+            bits (int): The field size in bits, from MIN_BITS to MAX_BITS.
+            primitive (int, optional): The primitive polynomial defining the field; the secrets.js polynomial
+                for the field size if omitted.
+            cache_size (int): The maximum number of coefficient matrices kept in the cache.
+
+        Raises:
+            ValueError: If bits is out of range, primitive is not a primitive polynomial of degree bits,
+                        or cache_size is not positive.
+        """
+        if not isinstance(bits, int) or not MIN_BITS <= bits <= MAX_BITS:
+            raise ValueError(f'bits must be an integer from {MIN_BITS} to {MAX_BITS}')
+        self.bits = bits
+        self.size = 1 << bits
+        self.order = self.size - 1
+        self.primitive = PRIMITIVES[bits] if primitive is None else primitive
+        self.exp, self.log = build_tables(bits, self.primitive)
+        self.shifts = np.arange(bits - 1, -1, -1, dtype=np.int32)
+        self.cache = LRUCache(maxsize=cache_size)
+
+    @staticmethod
+    def bits_for(n: int) -> int:
+        """
+        Returns the field size secrets.js-compatible shares use for n shares.
+
+        Args:
+            n (int): The total number of shares.
+
+        Returns:
+            int: The field size in bits.
+        """
+        return max((n + 1).bit_length(), MIN_BITS)
+
+    @classmethod
+    def shared(cls, bits: int) -> 'ShamirContext':
+        """
+        Returns the process-wide context for a field size, building it on first use.
+
+        Args:
+            bits (int): The field size in bits.
+
+        Returns:
+            ShamirContext: The shared context.
+        """
+        context = cls.contexts.get(bits)
+        if context is None:
+            with cls.lock:
+                context = cls.contexts.get(bits)
+                if context is None:
+                    context = cls.contexts[bits] = cls(bits)
+        return context
+
+    def mul(self, a: int, b: int) -> int:
+        """
+        Multiplies two field elements.
+
+        Args:
+            a (int): The first field element.
+            b (int): The second field element.
+
+        Returns:
+            int: The product a * b.
+        """
+        if a == 0 or b == 0:
+            return 0
+        return int(self.exp[self.log[a] + self.log[b]])
+
+    def div(self, a: int, b: int) -> int:
+        """
+        Divides two field elements.
+
+        Args:
+            a (int): The dividend.
+            b (int): The divisor.
+
+        Returns:
+            int: The quotient a / b.
+
+        Raises:
+            ZeroDivisionError: If b is zero.
+        """
+        if b == 0:
+            raise ZeroDivisionError(f'division by zero in GF(2^{self.bits})')
+        if a == 0:
+            return 0
+        return int(self.exp[self.log[a] + self.order - self.log[b]])
+
+    def pow(self, a: int, e: int) -> int:
+        """
+        Raises a field element to a non-negative integer power.
+
+        Args:
+            a (int): The field element.
+            e (int): The exponent.
+
+        Returns:
+            int: a ** e in the field.
+        """
+        if e == 0:
+            return 1
+        if a == 0:
+            return 0
+        return int(self.exp[(self.log[a] * e) % self.order])
+
+    def lagrange(self, xs: Sequence[int], at: int) -> List[int]:
+        """
+        Computes the Lagrange basis coefficients for evaluating the interpolating polynomial at a point.
+
+        Args:
+            xs (Sequence[int]): The distinct, non-zero x coordinates of the known shares.
+            at (int): The x coordinate to evaluate at; 0 yields the secret.
+
+        Returns:
+            List[int]: One coefficient per x coordinate.
+        """
+        coefficients = []
+        for i, xi in enumerate(xs):
+            numerator = 1
+            denominator = 1
+            for j, xj in enumerate(xs):
+                if i != j:
+                    numerator = self.mul(numerator, at ^ xj)
+                    denominator = self.mul(denominator, xi ^ xj)
+            coefficients.append(self.div(numerator, denominator))
+        return coefficients
+
+    def coefficients(self, xs: Sequence[int], k: int, n: int, points: Sequence[int]) -> np.ndarray:
+        """
+        Returns the (cached) Lagrange coefficients for evaluating the polynomial through xs at each point.
+
+        Args:
+            xs (Sequence[int]): The distinct, non-zero x coordinates of the known shares.
+            k (int): The minimum number of shares required to retrieve the secret.
+            n (int): The total number of shares.
+            points (Sequence[int]): The x coordinates to evaluate at; 0 yields the secret.
+
+        Returns:
+            np.ndarray: An int32 (points x shares) coefficient matrix. It is shared with the cache and
+                        must not be modified.
+        """
+        xs = tuple(xs)
+        points = tuple(points)
+        return self.cache.get(
+            (xs, k, n, points),
+            lambda: np.array([self.lagrange(xs, at) for at in points], dtype=np.int32)
+        )
+
+    def cache_info(self) -> dict:
+        """
+        Returns the coefficient cache counters.
+
+        Returns:
+            dict: A dictionary containing 'hits', 'misses', 'size' and 'maxsize'.
+        """
+        return self.cache.info()
+
+    def matrix(self, ys: Sequence[ShareData]) -> np.ndarray:
+        """
+        Unpacks shares into a (shares x elements) matrix of field elements without going through hex or str.
+
+        Elements are read from the least significant end of each share, so zero bits padding a share on
+        the left only add leading zero elements.
+
+        Args:
+            ys (Sequence[ShareData]): The share values.
+
+        Returns:
+            np.ndarray: An int32 matrix with one row per share, most significant element first.
+
+        Raises:
+            ValueError: If the shares are not all of the same length.
+        """
+        rows = [np.frombuffer(y, dtype=np.uint8) for y in ys]
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError('shares must all have the same length')
+        width = 8 * len(rows[0])
+        elements = -(-width // self.bits)
+        bits = np.zeros((len(rows), elements * self.bits), dtype=np.int32)
+        bits[:, bits.shape[1] - width:] = np.unpackbits(np.stack(rows), axis=1)
+        return bits.reshape(len(rows), elements, self.bits) @ (1 << self.shifts)
+
+    def pack(self, values: np.ndarray) -> List[bytes]:
+        """
+        Packs rows of field elements into shares, the inverse of matrix().
+
+        Args:
+            values (np.ndarray): A (rows x elements) matrix of field elements, most significant first.
+
+        Returns:
+            List[bytes]: One share per row, left-padded with zero bits to whole bytes.
+        """
+        width = values.shape[1] * self.bits
+        bits = np.zeros((len(values), width + -width % 8), dtype=np.uint8)
+        bits[:, bits.shape[1] - width:] = ((values[:, :, None] >> self.shifts) & 1).reshape(len(values), width)
+        return [row.tobytes() for row in np.packbits(bits, axis=1)]
+
+    def share_size(self, length: int) -> int:
+        """
+        Returns the length of the shares evaluated from shares of a given length.
+
+        Args:
+            length (int): The length of the known shares in bytes.
+
+        Returns:
+            int: The length in bytes of every share evaluate() returns for them.
+        """
+        elements = -(-8 * length // self.bits)
+        return -(-elements * self.bits // 8)
+
+    def weighted_sum(self, coefficients: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Computes, for every row of coefficients, the field sum of the share rows multiplied by their coefficients.
+
+        Args:
+            coefficients (np.ndarray): An int32 (points x shares) coefficient matrix.
+            ys (np.ndarray): The (shares x elements) matrix of field elements.
+
+        Returns:
+            np.ndarray: An int32 (points x elements) matrix.
+        """
+        c = coefficients[:, :, None]
+        products = self.exp[self.log[c] + self.log[ys][None, :, :]]
+        products[(c == 0) | (ys == 0)[None, :, :]] = 0
+        return np.bitwise_xor.reduce(products, axis=1)
+
+    def split(self, secret: ShareData, k: int, n: int, pad_length: int = 0) -> List[bytes]:
+        """
+        Splits a secret into n shares, any k of which retrieve it.
+
+        Args:
+            secret (ShareData): The secret.
+            k (int): The minimum number of shares required to retrieve the secret.
+            n (int): The total number of shares.
+            pad_length (int): Left-pads the marked secret to a multiple of this many bits, like the
+                padLength of secrets.js; no padding if 0.
+
+        Returns:
+            List[bytes]: The shares for x = 1 to n.
+
+        Raises:
+            ValueError: If n does not fit the field.
+        """
+        if n > self.order:
+            raise ValueError(f'n must be at most {self.order} in GF(2^{self.bits})')
+        length = 8 * len(secret) + 1
+        if pad_length:
+            length = -(-length // pad_length) * pad_length
+        elements = -(-length // self.bits)
+        marked = (1 << 8 * len(secret) | int.from_bytes(secret, 'big')).to_bytes(-(-elements * self.bits // 8), 'big')
+        constant = self.matrix([marked])[:, -elements:]
+        terms = np.frombuffer(os.urandom(4 * (k - 1) * elements), dtype=np.uint32).reshape(k - 1, elements)
+        polynomial = np.vstack([constant, (terms & self.order).astype(np.int32)])
+        powers = np.array([[self.pow(x, e) for e in range(k)] for x in range(1, n + 1)], dtype=np.int32)
+        return self.pack(self.weighted_sum(powers, polynomial))
+
+    def interpolate(self, xs: Sequence[int], ys: Sequence[ShareData], at: int, k: int = 0, n: int = 0) -> bytes:
+        """
+        Evaluates the polynomial through the given shares at a point.
+
+        Args:
+            xs (Sequence[int]): The distinct, non-zero x coordinates of the shares.
+            ys (Sequence[ShareData]): The share values, in the same order as xs.
+            at (int): The x coordinate to evaluate at; 0 yields the marked secret.
+            k (int): The threshold of the policy, used as part of the coefficient cache key.
+            n (int): The total number of shares, used as part of the coefficient cache key.
+
+        Returns:
+            bytes: The value of the polynomial at the point, in share layout.
+        """
+        return self.evaluate(xs, ys, (at,), k, n)[0]
+
+    def combine(self, xs: Sequence[int], ys: Sequence[ShareData], k: int = 0, n: int = 0) -> bytes:
+        """
+        Retrieves the secret from shares: the polynomial at 0, after the leading 1 bit marking its start.
+
+        Args:
+            xs (Sequence[int]): The distinct, non-zero x coordinates of the shares.
+            ys (Sequence[ShareData]): The share values, in the same order as xs.
+            k (int): The threshold of the policy, used as part of the coefficient cache key.
+            n (int): The total number of shares, used as part of the coefficient cache key.
+
+        Returns:
+            bytes: The secret.
+
+        Raises:
+            ValueError: If the shares interpolate to zero, which no split secret does.
+        """
+        value = int.from_bytes(self.interpolate(xs, ys, 0, k, n), 'big')
+        if value == 0:
+            raise ValueError('shares do not encode a secret')
+        marker = value.bit_length() - 1
+        return (value ^ 1 << marker).to_bytes((marker + 7) // 8, 'big')
+
+    def evaluate(self, xs: Sequence[int], ys: Sequence[ShareData], points: Sequence[int], k: int = 0, n: int = 0) -> List[bytes]:
+        """
+        Evaluates the polynomial through the given shares at many points in a single vectorized pass.
+
+        Args:
+            xs (Sequence[int]): The distinct, non-zero x coordinates of the shares.
+            ys (Sequence[ShareData]): The share values, in the same order as xs.
+            points (Sequence[int]): The x coordinates to evaluate at.
+            k (int): The threshold of the policy, used as part of the coefficient cache key.
+            n (int): The total number of shares, used as part of the coefficient cache key.
+
+        Returns:
+            List[bytes]: The value of the polynomial at each point in share layout, in the order of points.
+        """
+        if not points:
+            return []
+        return self.pack(self.weighted_sum(self.coefficients(xs, k, n, points), self.matrix(ys)))
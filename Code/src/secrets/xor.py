@@ -0,0 +1,42 @@
+from typing import Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+NUMPY_THRESHOLD = 4096  # below this, int.from_bytes beats the cost of building NumPy views
+
+
+def xor(a: Buffer, b: Buffer, inplace: bool = False) -> Buffer:
+    """
+    XORs two byte buffers without a per-byte Python loop.
+
+    Like zip(), only the common prefix of the two buffers is used. Small inputs go through a single
+    big-integer XOR; large inputs through NumPy views over the original buffers, which are never copied.
+
+    Args:
+        a (Buffer): The first buffer (bytes, bytearray or memoryview).
+        b (Buffer): The second buffer (bytes, bytearray or memoryview).
+        inplace (bool): If True, write the result into a, which must be writable, and return a.
+
+    Returns:
+        Buffer: The XOR of the two buffers as bytes, or a itself if inplace is True.
+
+    Raises:
+        TypeError: If inplace is True and a is not writable.
+    """
+    size = min(len(a), len(b))
+
+    if inplace:
+        if isinstance(a, bytes) or (isinstance(a, memoryview) and a.readonly):
+            raise TypeError('a must be writable to xor in place')
+        if size >= NUMPY_THRESHOLD:
+            import numpy as np
+            target = np.frombuffer(a, dtype=np.uint8, count=size)
+            np.bitwise_xor(target, np.frombuffer(b, dtype=np.uint8, count=size), out=target)
+        else:
+            a[:size] = (int.from_bytes(memoryview(a)[:size], 'little') ^ int.from_bytes(memoryview(b)[:size], 'little')).to_bytes(size, 'little')
+        return a
+
+    if size >= NUMPY_THRESHOLD:
+        import numpy as np
+        return np.bitwise_xor(np.frombuffer(a, dtype=np.uint8, count=size), np.frombuffer(b, dtype=np.uint8, count=size)).tobytes()
+    return (int.from_bytes(memoryview(a)[:size], 'little') ^ int.from_bytes(memoryview(b)[:size], 'little')).to_bytes(size, 'little')
@@ -0,0 +1,234 @@
+import os
+import json
+import math
+import time
+import hashlib
+import platform
+import statistics
+import importlib.util
+
+from .kdf import BACKENDS, KeyDerivationFunction
+from .default import DEFAULT_KDF
+from .scheduler import KDFScheduler
+
+CACHE_PATH = os.environ.get(
+    'SKDF_CALIBRATION_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'skdf', 'kdf-calibration.json')
+)
+
+
+class KDFCalibrator:
+    """
+        KDFCalibrator class picks KeyDerivationFunction parameters that take a target time on the current host.
+
+        Each backend is timed at a small probe cost and the cost is scaled to the target latency: linearly for
+        pbkdf2 rounds, in powers of two for bcrypt rounds and scrypt cost, and through memory first, then
+        passes, for argon2. No parameter is calibrated below its floor, which defaults to DEFAULT_KDF, so a
+        slow host keeps the shipped strength rather than gaining a weaker configuration. The memory budget,
+        measured with the same estimate KDFScheduler uses for admission, wins over the floor: argon2 memory
+        and scrypt cost are halved until they fit it, and argon2 makes up the time with more passes.
+
+        A backend that is not installed or fails to derive keeps its DEFAULT_KDF parameters and is reported
+        in unavailable instead of failing the calibration.
+
+        The result is cached on disk, together with unavailable, keyed by a host fingerprint and the
+        calibration targets, so later startups on the same host read both back instead of re-measuring.
+
+        Attributes:
+            target (float): The target latency of one derivation in seconds.
+            memory (int): The memory budget of one derivation in bytes.
+            floor (dict): The minimum parameters, DEFAULT_KDF-shaped; None disables the floor.
+            cache_path (str): The path of the on-disk cache; None disables caching.
+            samples (int): The number of timed runs per probe.
+            unavailable (dict): The reason each skipped backend could not be calibrated, by KDF type.
+
+        Methods:
+            fingerprint(): Returns the cache key for this host and these targets.
+            measure(config): Returns the median time of a derivation with a DEFAULT_KDF-shaped config.
+            calibrate(): Returns a DEFAULT_KDF-shaped dictionary, from the cache if possible.
+
+        Example usage:
+            calibrator = KDFCalibrator(target=0.25, memory=64 * 1024 * 1024)
+            kdf_defaults = calibrator.calibrate()
+            options = KeyDerivationFunction.options_from_defaults(kdf_defaults)
+    """
+    def __init__(self, target=0.25, memory=64 * 1024 * 1024, floor=DEFAULT_KDF, cache_path=CACHE_PATH, samples=3):
+        """
+        The constructor for KDFCalibrator class.
+
+        Parameters:
+            target (float): The target latency of one derivation in seconds.
+            memory (int): The memory budget of one derivation in bytes.
+            floor (dict, optional): The minimum parameters, DEFAULT_KDF-shaped; DEFAULT_KDF by default.
+            cache_path (str, optional): The path of the on-disk cache; None disables caching.
+            samples (int): The number of timed runs per probe.
+
+        Raises:
+            ValueError: If target, memory or samples is not positive.
+        """
+        if target <= 0:
+            raise ValueError('target must be positive')
+        if memory <= 0:
+            raise ValueError('memory must be positive')
+        if samples <= 0:
+            raise ValueError('samples must be positive')
+        self.target = target
+        self.memory = memory
+        self.floor = floor
+        self.cache_path = cache_path
+        self.samples = samples
+        self.unavailable = {}
+
+    def fingerprint(self):
+        """
+        Returns the cache key for this host and these targets.
+
+        Returns:
+            str: A hex digest identifying the host, interpreter and calibration targets.
+        """
+        host = {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'target': self.target,
+            'memory': self.memory,
+            'floor': self.floor,
+            'backends': sorted({name for names in BACKENDS.values() for name in names if importlib.util.find_spec(name)})
+        }
+        return hashlib.sha256(json.dumps(host, sort_keys=True).encode()).hexdigest()
+
+    def measure(self, config):
+        """
+        Returns the median time of a derivation with a DEFAULT_KDF-shaped config.
+
+        Parameters:
+            config (dict): A DEFAULT_KDF-shaped dictionary; its 'kdf' selects the backend.
+
+        Returns:
+            float: The median time in seconds.
+
+        Raises:
+            RuntimeError: If the backend is not installed or fails to derive a key.
+        """
+        options = KeyDerivationFunction.options_from_defaults(config)
+        timings = []
+        for _ in range(self.samples):
+            start = time.perf_counter()
+            try:
+                KeyDerivationFunction(b'calibration input', b'calibration salt', 32, options).derive_key()
+            except Exception as error:  # any backend failure, so one broken backend does not stop the others
+                raise RuntimeError(f'{config["kdf"]} backend unavailable: {type(error).__name__}: {error}') from error
+            timings.append(time.perf_counter() - start)
+        return max(statistics.median(timings), 1e-9)
+
+    def at_least(self, name, value):
+        if self.floor is None:
+            return value
+        return max(value, self.floor[name])
+
+    def fits(self, config):
+        options = KeyDerivationFunction.options_from_defaults(config)
+        return KDFScheduler.estimate(options, 32) <= self.memory
+
+    def within_budget(self, config, name, value, minimum):
+        while not self.fits(dict(config, **{name: value})):
+            if value // 2 < minimum:
+                raise ValueError(f'memory budget is too small for {config["kdf"]}')
+            value //= 2
+        return value
+
+    def calibrate_pbkdf2(self, config):
+        probe = dict(config, kdf='pbkdf2', pbkdf2rounds=10000)
+        per_round = self.measure(probe) / probe['pbkdf2rounds']
+        return {'pbkdf2rounds': self.at_least('pbkdf2rounds', int(self.target / per_round))}
+
+    def calibrate_bcrypt(self, config):
+        probe = dict(config, kdf='bcrypt', bcryptrounds=6)
+        doublings = math.floor(math.log2(self.target / self.measure(probe)))
+        return {'bcryptrounds': self.at_least('bcryptrounds', min(max(6 + doublings, 4), 31))}
+
+    def calibrate_scrypt(self, config):
+        probe = dict(config, kdf='scrypt', scryptcost=2 ** 12)
+        per_cost = self.measure(probe) / probe['scryptcost']
+        cost = 2 ** max(int(math.log2(max(self.target / per_cost, 2))), 1)
+        return {'scryptcost': self.within_budget(probe, 'scryptcost', self.at_least('scryptcost', cost), 2)}
+
+    def calibrate_argon2(self, config):
+        probe = dict(config, kdf='argon2id', argon2time=1, argon2mem=8192)
+        per_kib_pass = self.measure(probe) / probe['argon2mem']
+        memory = 8192
+        while memory * 2 * per_kib_pass * 2 <= self.target and self.fits(dict(probe, argon2mem=memory * 2)):
+            memory *= 2
+        memory = self.within_budget(probe, 'argon2mem', self.at_least('argon2mem', memory), 8 * probe['argon2parallelism'])
+        passes = max(int(self.target / (per_kib_pass * memory)), 1)
+        if self.floor is not None and memory < self.floor['argon2mem']:
+            # Keep at least the floor's memory-time product when the budget cuts memory below the floor.
+            passes = max(passes, -(-self.floor['argon2mem'] * self.floor['argon2time'] // memory))
+        return {
+            'argon2mem': memory,
+            'argon2time': self.at_least('argon2time', passes)
+        }
+
+    def load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as handle:
+                cached = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return cached.get(self.fingerprint())
+
+    def store(self, entry):
+        if self.cache_path is None:
+            return
+        cached = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path) as handle:
+                    cached = json.load(handle)
+            except (OSError, ValueError):
+                cached = {}
+        cached[self.fingerprint()] = entry
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        temporary = self.cache_path + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(cached, handle, indent=2)
+        os.replace(temporary, self.cache_path)
+
+    def calibrate(self, refresh=False):
+        """
+        Returns a DEFAULT_KDF-shaped dictionary tuned for this host, from the cache if possible.
+
+        Parameters:
+            refresh (bool): Re-measure even if a cached result exists.
+
+        Returns:
+            dict: A dictionary with the same keys as DEFAULT_KDF.
+
+        Raises:
+            ValueError: If the memory budget cannot fit the smallest argon2 or scrypt parameters.
+        """
+        if not refresh:
+            cached = self.load()
+            # Entries written before unavailable was cached hold only the result; they are measured again.
+            if isinstance(cached, dict) and 'result' in cached:
+                self.unavailable = dict(cached.get('unavailable', {}))
+                return dict(DEFAULT_KDF, **cached['result'])
+
+        result = dict(DEFAULT_KDF)
+        self.unavailable = {}
+        for kdf_type, calibrate in (
+            ('pbkdf2', self.calibrate_pbkdf2),
+            ('bcrypt', self.calibrate_bcrypt),
+            ('scrypt', self.calibrate_scrypt),
+            ('argon2id', self.calibrate_argon2)
+        ):
+            try:
+                result.update(calibrate(result))
+            except RuntimeError as error:
+                self.unavailable[kdf_type] = str(error)
+        self.store({'result': result, 'unavailable': self.unavailable})
+        return result
@@ -47,3 +47,13 @@ DEFAULT_STACK = {
 DEFAULT_HMACSHA1 = {
     "id": "hmacsha1"
 }
+
+DEFAULT_FACTOR_COSTS = {
+    "password": 1,  # relative derive cost per factor type; see FactorPlanner.from_benchmark to measure them
+    "question": 1,
+    "uuid": 1,
+    "hotp": 1,
+    "hmacsha1": 1,
+    "totp": 2,  # offset lookup and window slide on top of a code computation
+    "stack": 25  # nested key derivation, on top of the nested factors' own costs
+}
@@ -0,0 +1,171 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .kdf import KeyDerivationFunction
+
+MODES = ('inline', 'thread', 'process', 'auto')
+
+# Backends implemented in C that release the GIL while hashing (pbkdf2 runs hashlib.pbkdf2_hmac); threads scale for these.
+GIL_RELEASING = ('pbkdf2', 'bcrypt', 'scrypt', 'argon2i', 'argon2d', 'argon2id')
+
+# Backends cheap enough that handing them to another thread or process costs more than running them.
+INLINE = ('hkdf',)
+
+
+def run_kdf(input, salt, size, options):
+    """
+    Runs one key derivation; the entry point for thread and process workers.
+
+    Parameters:
+        input (str or bytes): The input string or bytes to derive the key from.
+        salt (str or bytes): The salt string or bytes to use in the key derivation.
+        size (int): The size of the derived key.
+        options (dict): The options to use in the key derivation.
+
+    Returns:
+        The derived key.
+    """
+    return KeyDerivationFunction(input, salt, size, options).derive_key()
+
+
+def warm_worker():
+    """
+    Process pool initializer: imports every installed KDF backend so the first real derivation in a fresh
+    worker pays no import cost.
+    """
+    KeyDerivationFunction.preload()
+
+
+def noop():
+    return None
+
+
+class KDFExecutor:
+    """
+        KDFExecutor class runs KeyDerivationFunction derivations inline, on a thread pool, or on a warm process pool.
+
+        'thread' suits backends that release the GIL, which is every built-in one but hkdf (pbkdf2 through
+        hashlib.pbkdf2_hmac, bcrypt, scrypt, argon2); 'process' runs each derivation in a separate worker
+        process, for backends that hold the GIL; 'auto' picks per derivation: inline for hkdf, threads for
+        GIL-releasing backends and processes for the rest. The process pool, and multiprocessing with it, is
+        only imported once a derivation is routed to it or warm() starts it.
+
+        Attributes:
+            mode (str): One of inline, thread, process, or auto.
+            workers (int): The number of worker threads and/or processes.
+
+        Methods:
+            warm(): Starts the worker threads, and in process mode the worker processes, ahead of the first derivation.
+            route(options): Returns the pool kind a derivation with these options runs on.
+            derive(kdf): Derives the key of a KeyDerivationFunction through the executor (awaitable).
+            close(): Shuts the pools down.
+
+        Example usage:
+            executor = KDFExecutor('process', workers=4)
+            executor.warm()
+            kdf_obj = KeyDerivationFunction(input_value, salt_value, size_value, options_value)
+            result = await kdf_obj.derive(executor)
+            executor.close()
+    """
+    def __init__(self, mode='auto', workers=None):
+        """
+        The constructor for KDFExecutor class.
+
+        Parameters:
+            mode (str): One of inline, thread, process, or auto (default).
+            workers (int, optional): The number of workers per pool; the CPU count by default.
+
+        Raises:
+            ValueError: If the mode is unknown or workers is not a positive integer.
+        """
+        if mode not in MODES:
+            raise ValueError('mode should be one of inline, thread, process, or auto (default)')
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError('workers must be a positive integer')
+        self.mode = mode
+        self.workers = workers
+        self.threads = None
+        self.processes = None
+
+    def thread_pool(self):
+        if self.threads is None:
+            self.threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='kdf')
+        return self.threads
+
+    def process_pool(self):
+        if self.processes is None:
+            from concurrent.futures import ProcessPoolExecutor  # loads multiprocessing, so only when a process pool is used
+            self.processes = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        return self.processes
+
+    def warm(self):
+        """
+        Starts every worker process (and thread) ahead of the first derivation, so logins never pay for spawning.
+        In auto mode every built-in backend runs inline or on threads, so no processes are started.
+        """
+        if self.mode == 'process':
+            pool = self.process_pool()
+            for future in [pool.submit(noop) for _ in range(self.workers)]:
+                future.result()
+        if self.mode in ('thread', 'auto'):
+            pool = self.thread_pool()
+            for future in [pool.submit(noop) for _ in range(self.workers)]:
+                future.result()
+
+    def route(self, options):
+        """
+        Returns the pool kind a derivation with these options runs on.
+
+        Parameters:
+            options (dict): The KeyDerivationFunction options.
+
+        Returns:
+            str: One of inline, thread, or process.
+        """
+        if self.mode != 'auto':
+            return self.mode
+        if options['type'] in INLINE:
+            return 'inline'
+        if options['type'] in GIL_RELEASING:
+            return 'thread'
+        return 'process'
+
+    async def derive(self, kdf):
+        """
+        Derives the key of a KeyDerivationFunction through the executor.
+
+        Parameters:
+            kdf (KeyDerivationFunction): The derivation to run.
+
+        Returns:
+            The derived key.
+        """
+        route = self.route(kdf.options)
+        if route == 'inline':
+            return kdf.derive_key()
+        pool = self.thread_pool() if route == 'thread' else self.process_pool()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, run_kdf, kdf.input, kdf.salt, kdf.size, kdf.options)
+
+    def close(self, wait=True):
+        """
+        Shuts the pools down.
+
+        Parameters:
+            wait (bool): Whether to wait for running derivations to finish.
+        """
+        if self.threads is not None:
+            self.threads.shutdown(wait=wait)
+            self.threads = None
+        if self.processes is not None:
+            self.processes.shutdown(wait=wait)
+            self.processes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
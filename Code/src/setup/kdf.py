@@ -1,9 +1,22 @@
+import base64
 import hashlib
-import pbkdf2
-import bcrypt
-import scrypt
-from argon2 import PasswordHasher
-from hkdf import hkdf
+import importlib
+
+from ..tracing.spans import Tracer
+
+# Backend modules are imported on first use of their KDF type, so importing this module stays cheap.
+# pbkdf2 uses hashlib.pbkdf2_hmac, which needs no backend module.
+BACKENDS = {
+    'pbkdf2': (),
+    'bcrypt': ('bcrypt',),
+    'scrypt': ('scrypt',),
+    'argon2i': ('argon2',),
+    'argon2d': ('argon2',),
+    'argon2id': ('argon2',),
+    'hkdf': ('hkdf',),
+}
+
+BCRYPT_ALPHABET = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
 
 class KeyDerivationFunction:
     """
@@ -18,6 +31,10 @@ class KeyDerivationFunction:
         Methods:
             validate_inputs(): Validates and converts the input and salt to bytes if they are strings.
             derive_key(): Derives a key based on the given input, salt, size, and options.
+            derive(executor): Awaitable derive_key, run through a KDFExecutor if one is given.
+            hkdf(digest, input, salt, info, size): Derives a key with HKDF (RFC 5869).
+            options_from_defaults(config): Builds options from a DEFAULT_KDF-shaped dictionary.
+            preload(types): Imports backend modules ahead of their first use.
 
         Example usage:
             input_value = 'your_input'
@@ -44,6 +61,80 @@ class KeyDerivationFunction:
         self.options = options
         self.validate_inputs()
 
+    @staticmethod
+    def options_from_defaults(config):
+        """
+        Builds KeyDerivationFunction options from a DEFAULT_KDF-shaped dictionary.
+
+        Parameters:
+            config (dict): A dictionary shaped like DEFAULT_KDF (or DEFAULT_STACK).
+
+        Returns:
+            dict: A dictionary containing 'type' and 'params'.
+        """
+        kdf_type = config['kdf']
+        if kdf_type == 'hkdf':
+            params = {'digest': config['hkdfdigest']}
+        elif kdf_type == 'pbkdf2':
+            params = {'rounds': config['pbkdf2rounds'], 'digest': config.get('pbkdf2digest', 'sha256')}
+        elif kdf_type == 'bcrypt':
+            params = {'rounds': config['bcryptrounds']}
+        elif kdf_type == 'scrypt':
+            params = {
+                'rounds': config['scryptcost'],
+                'blocksize': config['scryptblocksize'],
+                'parallelism': config['scryptparallelism']
+            }
+        else:
+            params = {
+                'rounds': config['argon2time'],
+                'memory': config['argon2mem'],
+                'parallelism': config['argon2parallelism']
+            }
+        return {'type': kdf_type, 'params': params}
+
+    @staticmethod
+    def preload(types=None):
+        """
+        Imports the backend modules of the given KDF types ahead of their first use.
+
+        Parameters:
+            types (list, optional): The KDF types to preload; all of them if omitted.
+
+        Returns:
+            list: The names of the backend modules that are not installed.
+        """
+        missing = []
+        for kdf_type in (BACKENDS if types is None else types):
+            for name in BACKENDS[kdf_type]:
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    if name not in missing:
+                        missing.append(name)
+        return missing
+
+    @staticmethod
+    def hkdf(digest, input, salt, info, size):
+        """
+        Derives a key with HKDF (RFC 5869).
+
+        Parameters:
+            digest (str): The hashlib digest name, e.g. sha256 or sha512.
+            input (str or bytes): The input key material.
+            salt (str or bytes): The salt; a zero-filled salt is used if empty.
+            info (str or bytes): The context information.
+            size (int): The size of the derived key.
+
+        Returns:
+            bytes: The derived key.
+        """
+        from hkdf import Hkdf
+        input = input.encode() if isinstance(input, str) else input
+        salt = salt.encode() if isinstance(salt, str) else salt
+        info = info.encode() if isinstance(info, str) else info
+        return Hkdf(salt, input, getattr(hashlib, digest)).expand(info, size)
+
     def validate_inputs(self):
         """
         Validates and converts the input and salt to bytes if they are strings.
@@ -53,35 +144,62 @@ class KeyDerivationFunction:
         if isinstance(self.salt, str):
             self.salt = self.salt.encode()
 
+    async def derive(self, executor=None):
+        """
+        Derives the key without blocking the event loop when an executor is given.
+
+        The kdf.derive span records the executor's class (inline if omitted) and, for a KDFExecutor, the pool
+        the derivation is routed to. A KDFScheduler passes the derivation on to its own executor, which
+        records a nested kdf.derive span.
+
+        Parameters:
+            executor (KDFExecutor or KDFScheduler, optional): The executor to run the derivation on; inline if omitted.
+
+        Returns:
+            The derived key.
+        """
+        with Tracer.span('kdf.derive', kdf=self.options['type'], bytes=self.size, executor='inline' if executor is None else type(executor).__name__) as span:
+            if executor is None:
+                return self.derive_key()
+            if hasattr(executor, 'route'):
+                span.set('route', executor.route(self.options))
+            return await executor.derive(self)
+
     def derive_key(self):
         """
         Derives a key based on the given input, salt, size, and options.
 
         Returns:
-            The derived key.
+            bytes: The derived key, size bytes long.
 
         Raises:
             ValueError: If the type of key derivation function is not one of pbkdf2, bcrypt, scrypt, argon2i, argon2d, or argon2id.
         """
         if self.options['type'] == 'pbkdf2':
-            return pbkdf2.pbkdf2_bin(self.input, self.salt, self.options['params']['rounds'], self.size, hashlib.new(self.options['params']['digest']).digest())
+            return hashlib.pbkdf2_hmac(self.options['params']['digest'], self.input, self.salt, self.options['params']['rounds'], self.size)
         elif self.options['type'] == 'bcrypt':
-            input_hash = hashlib.sha256(self.input).digest().decode('base64')
-            salt_hash = hashlib.sha256(self.salt).digest().decode('base64').replace('+', '.')
-            hashed = bcrypt.hashpw(input_hash, '$2a$' + str(self.options['params']['rounds']) + '$' + salt_hash)
-            derived_key = pbkdf2.pbkdf2_bin(hashed, salt_hash, 1, self.size, hashlib.sha256().digest())
-            return derived_key
+            import bcrypt
+            input_hash = base64.b64encode(hashlib.sha256(self.input).digest())
+            salt_hash = base64.b64encode(hashlib.sha256(self.salt).digest()).decode().replace('+', '.')
+            # bcrypt reads 16 salt bytes from 22 characters; the last one's 4 spare bits must be zero.
+            salt = salt_hash[:21] + BCRYPT_ALPHABET[BCRYPT_ALPHABET.index(salt_hash[21]) & 0x30]
+            hashed = bcrypt.hashpw(input_hash, ('$2a$%02d$' % self.options['params']['rounds'] + salt).encode())
+            return hashlib.pbkdf2_hmac('sha256', hashed, salt_hash.encode(), 1, self.size)
         elif self.options['type'] == 'scrypt':
+            import scrypt
             return scrypt.hash(self.input, self.salt, self.options['params']['rounds'], self.options['params']['blocksize'], self.options['params']['parallelism'], self.size)
         elif self.options['type'] in ['argon2i', 'argon2d', 'argon2id']:
-            ph = PasswordHasher(
+            from argon2.low_level import Type, hash_secret_raw
+            return hash_secret_raw(
+                self.input,
+                self.salt,
                 time_cost=self.options['params']['rounds'],
                 memory_cost=self.options['params']['memory'],
                 parallelism=self.options['params']['parallelism'],
-                hash_len=self.size
+                hash_len=self.size,
+                type={'argon2i': Type.I, 'argon2d': Type.D, 'argon2id': Type.ID}[self.options['type']]
             )
-            return ph.hash(self.input)
         elif self.options['type'] == 'hkdf':
-            return hkdf(self.options['params']['digest'], self.input, self.salt, '', self.size)
+            return self.hkdf(self.options['params']['digest'], self.input, self.salt, b'', self.size)
         else:
             raise ValueError('kdf should be one of pbkdf2, bcrypt, scrypt, argon2i, argon2d, or argon2id (default)')
\ No newline at end of file
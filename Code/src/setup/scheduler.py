@@ -0,0 +1,169 @@
+import asyncio
+from collections import deque
+
+BASELINE = 64 * 1024  # bytes; interpreter and buffer overhead charged to every derivation
+BCRYPT_STATE = 4 * 1024 + 72  # Blowfish S-boxes and P-array
+
+
+class KDFScheduler:
+    """
+        KDFScheduler class admits KeyDerivationFunction derivations only while they fit in a memory budget.
+
+        Each derivation's footprint is estimated from its options (argon2 memory cost, scrypt N * r * p) and
+        charged against the budget while it runs. Derivations that do not fit wait in a strict first-in,
+        first-out queue, so a large argon2 request cannot be starved by a stream of small ones. The scheduler
+        has the same derive(kdf) interface as KDFExecutor and can be passed wherever an executor is accepted.
+
+        Attributes:
+            budget (int): The memory budget in bytes.
+            executor (KDFExecutor): The executor admitted derivations run on; inline if None.
+            timeout (float): The default maximum wait for admission in seconds; None waits forever.
+            in_use (int): The bytes currently charged to running derivations.
+
+        Methods:
+            estimate(options, size): Estimates the peak memory of a derivation in bytes.
+            derive(kdf, timeout): Waits for admission, then derives the key (awaitable).
+            metrics(): Returns queue depth and budget usage counters.
+
+        Example usage:
+            scheduler = KDFScheduler(budget=512 * 1024 * 1024, executor=KDFExecutor('thread'), timeout=5)
+            kdf_obj = KeyDerivationFunction(input_value, salt_value, size_value, options_value)
+            result = await kdf_obj.derive(scheduler)
+            print(scheduler.metrics())
+    """
+    def __init__(self, budget, executor=None, timeout=None):
+        """
+        The constructor for KDFScheduler class.
+
+        Parameters:
+            budget (int): The memory budget in bytes.
+            executor (KDFExecutor, optional): The executor admitted derivations run on; inline if omitted.
+            timeout (float, optional): The default maximum wait for admission in seconds.
+
+        Raises:
+            ValueError: If budget is not a positive integer.
+        """
+        if not isinstance(budget, int) or budget <= 0:
+            raise ValueError('budget must be a positive integer')
+        self.budget = budget
+        self.executor = executor
+        self.timeout = timeout
+        self.in_use = 0
+        self.peak = 0
+        self.running = 0
+        self.admitted = 0
+        self.timeouts = 0
+        self.waiters = deque()
+
+    @staticmethod
+    def estimate(options, size=0):
+        """
+        Estimates the peak memory of a derivation in bytes.
+
+        Parameters:
+            options (dict): The KeyDerivationFunction options.
+            size (int): The size of the derived key.
+
+        Returns:
+            int: The estimated footprint in bytes.
+        """
+        params = options.get('params', {})
+        if options['type'] in ('argon2i', 'argon2d', 'argon2id'):
+            return BASELINE + params['memory'] * 1024 + size
+        if options['type'] == 'scrypt':
+            return BASELINE + 128 * params['blocksize'] * (params['rounds'] + params['parallelism']) + size
+        if options['type'] == 'bcrypt':
+            return BASELINE + BCRYPT_STATE + size
+        return BASELINE + size
+
+    def metrics(self):
+        """
+        Returns queue depth and budget usage counters.
+
+        Returns:
+            dict: A dictionary containing 'queued', 'queued_bytes', 'running', 'in_use', 'peak', 'budget',
+                  'admitted' and 'timeouts'.
+        """
+        return {
+            'queued': len(self.waiters),
+            'queued_bytes': sum(need for need, _ in self.waiters),
+            'running': self.running,
+            'in_use': self.in_use,
+            'peak': self.peak,
+            'budget': self.budget,
+            'admitted': self.admitted,
+            'timeouts': self.timeouts
+        }
+
+    def admit(self, need):
+        self.in_use += need
+        self.peak = max(self.peak, self.in_use)
+        self.running += 1
+        self.admitted += 1
+
+    def release(self, need):
+        self.in_use -= need
+        self.running -= 1
+        self.wake()
+
+    def wake(self):
+        while self.waiters:
+            need, waiter = self.waiters[0]
+            if waiter.done():
+                self.waiters.popleft()
+                continue
+            if self.in_use + need > self.budget:
+                break
+            self.waiters.popleft()
+            self.admit(need)
+            waiter.set_result(None)
+
+    async def acquire(self, need, timeout):
+        if not self.waiters and self.in_use + need <= self.budget:
+            self.admit(need)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (need, waiter)
+        self.waiters.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                self.release(need)
+            else:
+                waiter.cancel()
+                try:
+                    self.waiters.remove(entry)
+                except ValueError:
+                    pass
+                self.wake()
+            if isinstance(error, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise TimeoutError('timed out waiting for KDF memory budget') from None
+            raise
+
+    async def derive(self, kdf, timeout=None):
+        """
+        Waits until the derivation fits in the memory budget, then derives the key.
+
+        Parameters:
+            kdf (KeyDerivationFunction): The derivation to run.
+            timeout (float, optional): The maximum wait for admission in seconds; the scheduler default if omitted.
+
+        Returns:
+            The derived key.
+
+        Raises:
+            ValueError: If the derivation alone exceeds the budget.
+            TimeoutError: If the derivation was not admitted within the timeout.
+        """
+        need = self.estimate(kdf.options, kdf.size)
+        if need > self.budget:
+            raise ValueError('kdf memory estimate exceeds the scheduler budget')
+
+        await self.acquire(need, self.timeout if timeout is None else timeout)
+        try:
+            return await kdf.derive(self.executor)
+        finally:
+            self.release(need)
@@ -1,5 +1,7 @@
 import asyncio
 
+from ..tracing.spans import Tracer
+
 class FactorHandler:
     """
         FactorHandler class is used to handle factors in an asynchronous manner.
@@ -26,25 +28,27 @@ class FactorHandler:
         self.key = key
 
     async def setup(self):
-        result = await self.factor()
+        with Tracer.span('factor.setup', keyed=bool(self.key)):
+            result = await self.factor()
 
-        if self.key:
-            params = await result['params'](key=self.key)
-            result['params'] = lambda: asyncio.ensure_future(params)
+            if self.key:
+                params = await result['params'](key=self.key)
+                result['params'] = lambda: asyncio.ensure_future(params)
 
-            output = await result['output']()
-            result['output'] = lambda: asyncio.ensure_future(output)
+                output = await result['output']()
+                result['output'] = lambda: asyncio.ensure_future(output)
 
-        return result
+            return result
 
     async def derive(self, params):
-        result = await self.factor(params)
+        with Tracer.span('factor.derive', keyed=bool(self.key)):
+            result = await self.factor(params)
 
-        if self.key:
-            params = await result['params'](key=self.key)
-            result['params'] = lambda: asyncio.ensure_future(params)
+            if self.key:
+                params = await result['params'](key=self.key)
+                result['params'] = lambda: asyncio.ensure_future(params)
 
-            output = await result['output']()
-            result['output'] = lambda: asyncio.ensure_future(output)
+                output = await result['output']()
+                result['output'] = lambda: asyncio.ensure_future(output)
 
-        return lambda: asyncio.ensure_future(result)
\ No newline at end of file
+            return lambda: asyncio.ensure_future(result)
\ No newline at end of file
@@ -0,0 +1,54 @@
+from .spans import Span
+
+
+class OpenTelemetrySubscriber:
+    """
+    A Tracer subscriber that mirrors every span as an OpenTelemetry span.
+
+    Parents are taken from the enclosing package span when there is one, and from the current
+    OpenTelemetry context otherwise, so package spans nest under the caller's own request span.
+    Attributes are prefixed ('skdf.' by default) and errors are recorded on the span with an ERROR status.
+    opentelemetry-api is imported when the subscriber is created, so it is only needed by users of this class.
+
+    Example usage:
+    Tracer.subscribe(OpenTelemetrySubscriber())
+    result = await KeyDerivation(policy_value, factors_value).derive_key()
+    """
+
+    def __init__(self, tracer=None, prefix='skdf.'):
+        """
+        Initializes an OpenTelemetrySubscriber object.
+
+        Args:
+            tracer (opentelemetry.trace.Tracer, optional): The tracer spans are created with; the global
+                tracer provider's 'skdf' tracer if omitted.
+            prefix (str): The prefix added to attribute names.
+        """
+        from opentelemetry import trace  # optional dependency, only needed by this subscriber
+        self.trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer('skdf')
+        self.prefix = prefix
+
+    def attributes(self, span: Span):
+        result = {}
+        for key, value in span.attributes.items():
+            if isinstance(value, (bool, int, float, str)):
+                result[self.prefix + key] = value
+            elif value is not None:
+                result[self.prefix + key] = str(value)
+        return result
+
+    def start(self, span: Span):
+        parent = span.parent.data.get(self) if span.parent is not None else None
+        context = self.trace.set_span_in_context(parent) if parent is not None else None
+        span.data[self] = self.tracer.start_span(span.name, context=context, attributes=self.attributes(span))
+
+    def end(self, span: Span):
+        otel_span = span.data.pop(self, None)
+        if otel_span is None:
+            return
+        otel_span.set_attributes(self.attributes(span))
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(self.trace.Status(self.trace.StatusCode.ERROR, str(span.error)))
+        otel_span.end()
@@ -0,0 +1,221 @@
+import time
+import inspect
+import threading
+import functools
+import contextvars
+from typing import Any, Callable, Optional
+
+CURRENT = contextvars.ContextVar('skdf_span', default=None)
+
+
+class Span:
+    """
+    A timed, named phase of a setup or derive, with attributes, reported to the Tracer subscribers.
+
+    Spans nest through a context variable, so a span started inside another one (including across awaits,
+    asyncio.gather tasks and asyncio.to_thread calls) records it as its parent.
+
+    Attributes:
+        name (str): The phase name, e.g. 'key.combine'.
+        attributes (dict): The phase attributes, e.g. {'k': 2, 'n': 3}.
+        parent (Span): The enclosing span, or None.
+        start_ns (int): The start time from time.perf_counter_ns.
+        end_ns (int): The end time, or None while the span is open.
+        error (BaseException): The exception that ended the span, or None.
+        data (dict): Per-subscriber state, e.g. the OpenTelemetry span of an adapter.
+
+    Example usage:
+    with Tracer.span('kdf.derive', kdf='argon2id') as span:
+        span.set('bytes', 32)
+    """
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.start_ns = None
+        self.end_ns = None
+        self.error = None
+        self.data = {}
+        self.token = None
+        self.subscribers = ()
+
+    @property
+    def duration_ns(self) -> Optional[int]:
+        """
+        Returns the duration of a closed span in nanoseconds, or None while it is open.
+        """
+        return None if self.end_ns is None else self.end_ns - self.start_ns
+
+    def set(self, key: str, value: Any):
+        """
+        Sets an attribute, e.g. one only known once the phase ran.
+
+        Args:
+            key (str): The attribute name.
+            value (any): The attribute value.
+        """
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.subscribers = Tracer.subscribers
+        self.parent = CURRENT.get()
+        self.token = CURRENT.set(self)
+        self.start_ns = time.perf_counter_ns()
+        for subscriber in self.subscribers:
+            subscriber.start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end_ns = time.perf_counter_ns()
+        self.error = exc
+        try:
+            CURRENT.reset(self.token)
+        except ValueError:
+            CURRENT.set(self.parent)  # ended in another context than it started in
+        for subscriber in self.subscribers:
+            subscriber.end(self)
+        return False
+
+
+class NullSpan:
+    """
+    The span returned while nobody is subscribed: entering, setting attributes and exiting do nothing.
+    """
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class CallbackSubscriber:
+    """
+    A subscriber calling plain functions on span start and end.
+
+    Example usage:
+    Tracer.subscribe(CallbackSubscriber(end=lambda span: print(span.name, span.duration_ns, span.attributes)))
+    """
+
+    def __init__(self, start: Optional[Callable[[Span], None]] = None, end: Optional[Callable[[Span], None]] = None):
+        self.on_start = start
+        self.on_end = end
+
+    def start(self, span: Span):
+        if self.on_start is not None:
+            self.on_start(span)
+
+    def end(self, span: Span):
+        if self.on_end is not None:
+            self.on_end(span)
+
+
+class Tracer:
+    """
+    The process-wide entry point of the instrumentation API.
+
+    Instrumented code wraps each phase in `with Tracer.span(name, **attributes):` or decorates it with
+    Tracer.traced(name, **attributes). Subscribers, objects with start(span) and end(span) methods,
+    receive every span; while there are none, span() returns a shared no-op object and traced functions
+    call straight through, so the instrumentation costs one attribute check per phase. Subscribers are
+    kept in a tuple that is replaced, never mutated, so spans can be opened from any thread while
+    subscribing.
+
+    Phases emitted by the package:
+        key.generate, key.validate, key.material, key.hkdf, key.combine, key.recover, key.new_policy,
+        kdf.derive, factor.generate, factor.setup, factor.derive
+
+    Example usage:
+    subscriber = Tracer.subscribe(CallbackSubscriber(end=lambda span: print(span.name, span.duration_ns)))
+    result = await KeyDerivation(policy_value, factors_value).derive_key()
+    Tracer.unsubscribe(subscriber)
+    """
+
+    subscribers = ()
+    lock = threading.Lock()
+
+    @classmethod
+    def span(cls, name: str, **attributes):
+        """
+        Returns a context manager timing a phase.
+
+        Args:
+            name (str): The phase name.
+            **attributes: The phase attributes.
+
+        Returns:
+            Span: A new span, or NULL_SPAN if nobody is subscribed.
+        """
+        if not cls.subscribers:
+            return NULL_SPAN
+        return Span(name, attributes)
+
+    @classmethod
+    def traced(cls, name: str, **attributes):
+        """
+        Returns a decorator wrapping every call of a function or coroutine function in a span.
+
+        Args:
+            name (str): The phase name.
+            **attributes: The phase attributes.
+
+        Returns:
+            function: The decorator.
+        """
+        def decorator(function):
+            if inspect.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def wrapper(*args, **kwargs):
+                    if not cls.subscribers:
+                        return await function(*args, **kwargs)
+                    with Span(name, dict(attributes)):
+                        return await function(*args, **kwargs)
+            else:
+                @functools.wraps(function)
+                def wrapper(*args, **kwargs):
+                    if not cls.subscribers:
+                        return function(*args, **kwargs)
+                    with Span(name, dict(attributes)):
+                        return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """
+        Returns True if anybody is subscribed, for callers that compute costly attributes.
+        """
+        return bool(cls.subscribers)
+
+    @classmethod
+    def subscribe(cls, subscriber):
+        """
+        Adds a subscriber.
+
+        Args:
+            subscriber: An object with start(span) and end(span) methods.
+
+        Returns:
+            The subscriber, for unsubscribe().
+        """
+        with cls.lock:
+            cls.subscribers = cls.subscribers + (subscriber,)
+        return subscriber
+
+    @classmethod
+    def unsubscribe(cls, subscriber):
+        """
+        Removes a subscriber; spans already open still report their end to it.
+
+        Args:
+            subscriber: A subscriber passed to subscribe().
+        """
+        with cls.lock:
+            cls.subscribers = tuple(item for item in cls.subscribers if item is not subscriber)
@@ -0,0 +1,96 @@
+import os
+import sys
+import base64
+
+import pytest
+
+SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+if SOURCE_ROOT not in sys.path:
+    sys.path.insert(0, SOURCE_ROOT)
+
+from src.secrets.xor import xor
+from src.secrets.shamir import ShamirContext
+from src.setup.kdf import KeyDerivationFunction
+
+# Cheap argon2id parameters, so tests derive real keys without DEFAULT_KDF's memory cost.
+FAST_KDF = {'type': 'argon2id', 'params': {'rounds': 1, 'memory': 64, 'parallelism': 1}}
+
+
+def make_policy(k, factors, size=32, kdf=FAST_KDF):
+    """
+    Builds a valid key policy over a fresh random secret, sharing it the way SecretCombiner reads it back.
+
+    Parameters:
+        k (int): The threshold.
+        factors (list): (id, type, data, params) tuples; data is the factor material.
+        size (int): The key size (bytes).
+        kdf (dict): The KeyDerivationFunction options of the final KDF.
+
+    Returns:
+        tuple: The policy and the secret it was built from.
+    """
+    secret = os.urandom(size)
+    n = len(factors)
+    if k == 1:  # SecretCombiner reads 1-of-n shares as the secret itself
+        shares = [secret] * n
+    elif k == n:  # and n-of-n shares as XOR parts of it
+        shares = [os.urandom(size) for _ in range(n - 1)]
+        last = bytearray(secret)
+        for share in shares:
+            xor(last, share, inplace=True)
+        shares.append(bytes(last))
+    else:
+        shares = ShamirContext.shared(ShamirContext.bits_for(n)).split(secret, k, n)
+    entries = []
+    for (factor_id, factor_type, data, params), share in zip(factors, shares):
+        pad = xor(share, KeyDerivationFunction.hkdf('sha512', data, b'', b'', len(share)))
+        entries.append({'id': factor_id, 'type': factor_type, 'params': params, 'pad': base64.b64encode(pad).decode()})
+    policy = {
+        'threshold': k,
+        'size': size,
+        'salt': base64.b64encode(os.urandom(size)).decode(),
+        'kdf': kdf,
+        'factors': entries
+    }
+    return policy, secret
+
+
+def constant_factor(factor_type, data):
+    """
+    Returns a factor callable that always presents the same material and keeps its params.
+    """
+    async def factor(params):
+        return {'type': factor_type, 'data': data, 'params': params}
+    return factor
+
+
+def sample_policy():
+    """
+    Returns a policy holding every field kind BinaryPolicy encodes: base64 and hex byte fields, a stack,
+    non-canonical text and every JSON scalar type.
+    """
+    return {
+        'threshold': 2,
+        'size': 32,
+        'salt': 'c2FsdHNhbHRzYWx0c2FsdA==',
+        'kdf': {'type': 'argon2id', 'params': {'rounds': 2, 'memory': 24576, 'parallelism': 1}},
+        'factors': [
+            {'id': 'password', 'type': 'password', 'params': {}, 'pad': 'AAECAwQFBgcICQoLDA0ODw=='},
+            {'id': 'totp', 'type': 'totp', 'pad': 'EBESExQVFhcYGRobHB0eHw==', 'params': {
+                'start': 1650430943604, 'hash': 'sha1', 'digits': 6, 'step': 30, 'window': 3,
+                'pad': 'MTIzNDU2Nzg5MDEyMzQ1Njc4OTA=', 'offsets': 'AAAAAQAAAAIAAAAD'
+            }},
+            {'id': 'hmac', 'type': 'hmacsha1', 'pad': 'ICEiIyQlJicoKSorLC0uLw==', 'params': {
+                'challenge': 'a1b2c3d4', 'pad': '00ff10ef'
+            }},
+            {'id': 'inner', 'type': 'stack', 'pad': 'MDEyMzQ1Njc4OTo7PD0+Pw==', 'params': {
+                'threshold': 1, 'size': 32, 'salt': 'not base64!', 'kdf': {'type': 'pbkdf2', 'params': {'rounds': 1, 'digest': 'sha256'}},
+                'factors': [{'id': 'question', 'type': 'question', 'params': {'question': 'Why?', 'score': -1.5, 'ok': True, 'none': None}, 'pad': 'QUJD'}]
+            }}
+        ]
+    }
+
+
+@pytest.fixture
+def policy_factory():
+    return make_policy
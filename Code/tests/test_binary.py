@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import sample_policy
+from src.policy.binary import DICT, LIST, MAGIC, MAX_DEPTH, NULL, VERSION, BinaryPolicy
+
+
+def nested(tag, depth):
+    prefix = bytes([tag, 1] + ([1, ord('k')] if tag == DICT else []))
+    return MAGIC + bytes([VERSION]) + prefix * depth + bytes([NULL])
+
+
+@pytest.mark.parametrize('tag', [LIST, DICT])
+def test_deeply_nested_input_raises_value_error(tag):
+    with pytest.raises(ValueError):
+        BinaryPolicy.loads(nested(tag, 100000))
+    with pytest.raises(ValueError):
+        BinaryPolicy.loads(nested(tag, MAX_DEPTH + 1))
+    assert BinaryPolicy.loads(nested(tag, MAX_DEPTH)) is not None
+
+
+def test_json_policies_round_trip():
+    policy = sample_policy()
+    data = BinaryPolicy.dumps(policy)
+    assert data.startswith(MAGIC + bytes([VERSION]))
+    assert BinaryPolicy.loads(data) == policy
+    assert BinaryPolicy.loads(bytearray(data)) == policy
+
+
+def test_non_canonical_text_fields_stay_text():
+    policy = sample_policy()
+    policy['factors'][0]['pad'] = 'AAECAwQFBgcICQoLDA0ODw'  # unpadded base64
+    policy['factors'][2]['params']['challenge'] = 'A1B2C3D4'  # upper-case hex
+    assert BinaryPolicy.loads(BinaryPolicy.dumps(policy)) == policy
+
+
+def test_raw_loads_return_views_of_the_input():
+    policy = sample_policy()
+    data = BinaryPolicy.dumps(policy)
+    loaded = BinaryPolicy.loads(data, raw=True)
+    offsets = loaded['factors'][1]['params']['offsets']
+    assert isinstance(offsets, memoryview) and offsets.obj is data
+    assert bytes(offsets) == bytes([0, 0, 0, 1, 0, 0, 0, 2, 0, 0, 0, 3])
+    assert bytes(loaded['factors'][2]['params']['challenge']).hex() == 'a1b2c3d4'
+    assert BinaryPolicy.dumps(loaded) == data
+
+
+def test_file_round_trip(tmp_path):
+    path = str(tmp_path / 'policy.skdfp')
+    BinaryPolicy.dump(sample_policy(), path)
+    assert BinaryPolicy.load(path) == sample_policy()
+    raw = BinaryPolicy.load(path, raw=True)
+    assert BinaryPolicy.dumps(raw) == BinaryPolicy.dumps(sample_policy())
+
+
+@pytest.mark.parametrize('data', [
+    b'', b'JSON{}', MAGIC, MAGIC + bytes([VERSION + 1, NULL]), MAGIC + bytes([VERSION, 99]),
+    MAGIC + bytes([VERSION, DICT, 2, 1]), MAGIC + bytes([VERSION, NULL, NULL])
+], ids=['empty', 'magic', 'no-version', 'version', 'tag', 'truncated', 'trailing'])
+def test_corrupt_input_raises_value_error(data):
+    with pytest.raises(ValueError):
+        BinaryPolicy.loads(data)
+
+
+def test_unencodable_values_raise_type_error():
+    with pytest.raises(TypeError):
+        BinaryPolicy.dumps(dict(sample_policy(), extra={1, 2}))
+    with pytest.raises(TypeError):
+        BinaryPolicy.dumps({1: 'key'})
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from conftest import FAST_KDF, constant_factor, make_policy
+from src.derive.cache import DerivedKeyCache
+from src.derive.key import Key
+
+POLICY = {'threshold': 1, 'size': 32, 'salt': 'c2FsdA==', 'kdf': FAST_KDF, 'factors': []}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def entry(cache, digest):
+    return cache.entries[digest]
+
+
+def test_miss_then_hit_returns_copies():
+    cache = DerivedKeyCache()
+    digest = cache.digest('alice', POLICY, [b'share'])
+    assert cache.get(digest) is None
+    cache.put(digest, 'alice', b'k' * 32, b's' * 32, [b'share', None])
+    key, secret, shares = cache.get(digest)
+    assert (key, secret, shares) == (b'k' * 32, b's' * 32, [b'share', None])
+    assert type(key) is bytes
+    assert cache.metrics()['hits'] == 1 and cache.metrics()['misses'] == 1
+
+
+def test_digest_depends_on_id_policy_and_shares():
+    cache = DerivedKeyCache()
+    digest = cache.digest('alice', POLICY, [b'share', None])
+    assert digest == cache.digest('alice', POLICY, [b'share', None])
+    assert digest != cache.digest('bob', POLICY, [b'share', None])
+    assert digest != cache.digest('alice', dict(POLICY, salt='b3RoZXI='), [b'share', None])
+    assert digest != cache.digest('alice', POLICY, [None, b'share'])
+    assert digest != DerivedKeyCache().digest('alice', POLICY, [b'share', None])
+
+
+def test_ttl_expiry_zeroes_the_entry():
+    clock = Clock()
+    cache = DerivedKeyCache(ttl=10, clock=clock)
+    digest = cache.digest('alice', POLICY, [b'share'])
+    cache.put(digest, 'alice', b'k' * 32, b's' * 32, [b'share'])
+    _, _, key, secret, shares = entry(cache, digest)
+    clock.now += 9.9
+    assert cache.get(digest) is not None
+    clock.now += 0.2
+    assert cache.get(digest) is None
+    assert cache.metrics()['expired'] == 1
+    assert key == bytearray(32) and secret == bytearray(32) and shares[0] == bytearray(5)
+
+
+def test_policy_ttl_shortens_or_disables_caching():
+    cache = DerivedKeyCache(ttl=300)
+    assert cache.ttl_for(POLICY) == 300
+    assert cache.ttl_for(dict(POLICY, cache={'ttl': 5})) == 5
+    assert cache.ttl_for(dict(POLICY, cache={'ttl': 900})) == 300
+    digest = cache.digest('alice', POLICY, [b'share'])
+    cache.put(digest, 'alice', b'k' * 32, b's' * 32, [b'share'], ttl=0)
+    assert cache.get(digest) is None
+
+
+def test_eviction_and_invalidate_zero_entries():
+    cache = DerivedKeyCache(maxsize=2)
+    digests = [cache.digest(user, POLICY, [b'share']) for user in ('a', 'b', 'c')]
+    cache.put(digests[0], 'a', b'1' * 32, b'1' * 32, [b'share'])
+    first_key = entry(cache, digests[0])[2]
+    cache.put(digests[1], 'b', b'2' * 32, b'2' * 32, [b'share'])
+    cache.put(digests[2], 'c', b'3' * 32, b'3' * 32, [b'share'])
+    assert cache.get(digests[0]) is None and first_key == bytearray(32)
+    assert cache.metrics()['evictions'] == 1
+
+    second_key = entry(cache, digests[1])[2]
+    assert cache.invalidate('b') == 1
+    assert cache.get(digests[1]) is None and second_key == bytearray(32)
+
+    third_key = entry(cache, digests[2])[2]
+    cache.clear()
+    assert third_key == bytearray(32) and cache.metrics()['size'] == 0
+
+
+@pytest.mark.parametrize('key, secret, shares', [
+    ('$argon2id$v=19$m=64,t=1,p=1$...', b's', [b'share']),
+    (b'k', 's', [b'share']),
+    (b'k', b's', ['share']),
+])
+def test_put_rejects_non_bytes(key, secret, shares):
+    cache = DerivedKeyCache()
+    with pytest.raises(TypeError):
+        cache.put(cache.digest('alice', POLICY, [b'share']), 'alice', key, secret, shares)
+    assert cache.metrics()['size'] == 0
+
+
+def test_cached_derive_returns_the_same_key():
+    pytest.importorskip('argon2')
+    policy, secret = make_policy(1, [('password', 'password', b'hunter2', {})])
+    factors = {'password': constant_factor('password', b'hunter2')}
+    cache = DerivedKeyCache()
+    first = asyncio.run(Key(policy, factors, cache=cache, cache_id='alice').generate_key())
+    second = asyncio.run(Key(policy, factors, cache=cache, cache_id='alice').generate_key())
+    assert first.key == second.key and first.secret == second.secret == secret
+    assert cache.metrics()['hits'] == 1 and cache.metrics()['misses'] == 1
@@ -0,0 +1,52 @@
+import json
+
+from src.setup.calibrate import KDFCalibrator
+from src.setup.default import DEFAULT_KDF
+
+
+class StubCalibrator(KDFCalibrator):
+    """
+    A calibrator with fixed measurements and no bcrypt backend, counting how often it measures.
+    """
+    runs = 0
+
+    def calibrate_pbkdf2(self, config):
+        StubCalibrator.runs += 1
+        return {'pbkdf2rounds': 600000}
+
+    def calibrate_bcrypt(self, config):
+        raise RuntimeError('bcrypt backend unavailable: ModuleNotFoundError')
+
+    def calibrate_scrypt(self, config):
+        return {}
+
+    def calibrate_argon2(self, config):
+        return {'argon2time': 3}
+
+
+def test_cached_result_restores_unavailable(tmp_path):
+    path = str(tmp_path / 'calibration.json')
+    StubCalibrator.runs = 0
+    first = StubCalibrator(cache_path=path)
+    result = first.calibrate()
+    assert result == dict(DEFAULT_KDF, pbkdf2rounds=600000, argon2time=3)
+    assert set(first.unavailable) == {'bcrypt'}
+
+    second = StubCalibrator(cache_path=path)
+    assert second.calibrate() == result
+    assert second.unavailable == first.unavailable
+    assert StubCalibrator.runs == 1
+
+    third = StubCalibrator(cache_path=path)
+    third.calibrate(refresh=True)
+    assert StubCalibrator.runs == 2 and set(third.unavailable) == {'bcrypt'}
+
+
+def test_result_only_cache_entries_are_measured_again(tmp_path):
+    path = str(tmp_path / 'calibration.json')
+    calibrator = StubCalibrator(cache_path=path)
+    with open(path, 'w') as handle:
+        json.dump({calibrator.fingerprint(): dict(DEFAULT_KDF, pbkdf2rounds=1)}, handle)
+    StubCalibrator.runs = 0
+    assert calibrator.calibrate()['pbkdf2rounds'] == 600000
+    assert StubCalibrator.runs == 1 and set(calibrator.unavailable) == {'bcrypt'}
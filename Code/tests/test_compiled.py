@@ -0,0 +1,40 @@
+import gc
+import weakref
+
+from src.policy.compiled import CompiledPolicy
+
+
+def nested_policy(counter=0):
+    return {'threshold': 2, 'factors': [
+        {'id': 'password', 'type': 'password', 'params': {}},
+        {'id': 'hotp', 'type': 'hotp', 'params': {'counter': counter}},
+        {'id': 'inner', 'type': 'stack', 'params': {'threshold': 1, 'factors': [
+            {'id': 'question', 'type': 'question', 'params': {}}
+        ]}}
+    ]}
+
+
+def test_policies_of_the_same_structure_share_a_compiled_form():
+    assert CompiledPolicy.compile(nested_policy(0)) is CompiledPolicy.compile(nested_policy(7))
+    assert CompiledPolicy.compile(nested_policy()) is not CompiledPolicy.compile(dict(nested_policy(), threshold=1))
+
+
+def test_compile_cache_does_not_keep_policies_alive():
+    class Policy(dict):  # unlike dict, a subclass can be weakly referenced
+        pass
+    policy = Policy(nested_policy())
+    CompiledPolicy.compile(policy)
+    reference = weakref.ref(policy)
+    del policy
+    gc.collect()
+    assert reference() is None
+
+
+def test_evaluate_counts_satisfied_stacks():
+    compiled = CompiledPolicy.compile(nested_policy())
+    assert compiled.unique
+    assert compiled.evaluate(['password', 'hotp'])
+    assert compiled.evaluate(['password', 'question'])
+    assert not compiled.evaluate(['password'])
+    assert not compiled.evaluate(['inner', 'password'])
+    assert compiled.node(nested_policy(), 'question')['type'] == 'question'
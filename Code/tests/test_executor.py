@@ -0,0 +1,44 @@
+import sys
+import asyncio
+import subprocess
+
+import pytest
+
+from conftest import SOURCE_ROOT
+from src.setup.executor import KDFExecutor
+from src.setup.kdf import KeyDerivationFunction
+
+PBKDF2 = {'type': 'pbkdf2', 'params': {'rounds': 1000, 'digest': 'sha256'}}
+
+
+@pytest.mark.parametrize('kdf_type, route', [
+    ('hkdf', 'inline'), ('pbkdf2', 'thread'), ('bcrypt', 'thread'), ('scrypt', 'thread'), ('argon2id', 'thread')
+])
+def test_auto_routes_by_backend(kdf_type, route):
+    assert KDFExecutor('auto').route({'type': kdf_type}) == route
+    assert KDFExecutor('process').route({'type': kdf_type}) == 'process'
+
+
+@pytest.mark.parametrize('mode', ['inline', 'thread', 'auto'])
+def test_executor_derives_the_inline_key(mode):
+    expected = KeyDerivationFunction(b'input', b'salt', 32, PBKDF2).derive_key()
+    executor = KDFExecutor(mode, workers=2)
+    executor.warm()
+    try:
+        assert asyncio.run(KeyDerivationFunction(b'input', b'salt', 32, PBKDF2).derive(executor)) == expected
+    finally:
+        executor.close()
+    assert executor.processes is None
+
+
+def test_importing_policies_does_not_load_multiprocessing():
+    code = 'import sys; import src.policy.derive, src.policy.store, src.policy.batch; print("multiprocessing" in sys.modules)'
+    output = subprocess.run([sys.executable, '-c', code], cwd=SOURCE_ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_rejects_unknown_mode_and_bad_workers():
+    with pytest.raises(ValueError):
+        KDFExecutor('fork')
+    with pytest.raises(ValueError):
+        KDFExecutor('thread', workers=0)
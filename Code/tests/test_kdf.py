@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from conftest import FAST_KDF, constant_factor, make_policy
+from src.derive.key import Key
+from src.setup.kdf import BACKENDS, KeyDerivationFunction
+
+OPTIONS = {
+    'pbkdf2': {'rounds': 10, 'digest': 'sha256'},
+    'bcrypt': {'rounds': 4},
+    'scrypt': {'rounds': 16, 'blocksize': 8, 'parallelism': 1},
+    'argon2i': {'rounds': 1, 'memory': 64, 'parallelism': 1},
+    'argon2d': {'rounds': 1, 'memory': 64, 'parallelism': 1},
+    'argon2id': {'rounds': 1, 'memory': 64, 'parallelism': 1},
+    'hkdf': {'digest': 'sha256'},
+}
+
+
+@pytest.mark.parametrize('kdf_type', sorted(OPTIONS))
+def test_derive_is_deterministic_raw_bytes(kdf_type):
+    for module in BACKENDS[kdf_type]:
+        pytest.importorskip(module)
+    options = {'type': kdf_type, 'params': OPTIONS[kdf_type]}
+    first = KeyDerivationFunction(b'secret', b'policy salt', 32, options).derive_key()
+    second = KeyDerivationFunction(b'secret', b'policy salt', 32, options).derive_key()
+    other_salt = KeyDerivationFunction(b'secret', b'other salt!', 32, options).derive_key()
+    assert isinstance(first, bytes) and len(first) == 32
+    assert first == second
+    assert first != other_salt
+
+
+def test_argon2_types_differ():
+    pytest.importorskip('argon2')
+    keys = {KeyDerivationFunction(b'secret', b'policy salt', 32, {'type': kdf_type, 'params': OPTIONS[kdf_type]}).derive_key()
+            for kdf_type in ('argon2i', 'argon2d', 'argon2id')}
+    assert len(keys) == 3
+
+
+def test_key_rederives_the_same_key():
+    pytest.importorskip('argon2')
+    policy, _ = make_policy(1, [('password', 'password', b'hunter2', {})], kdf=FAST_KDF)
+    factors = {'password': constant_factor('password', b'hunter2')}
+    first = asyncio.run(Key(policy, factors).generate_key())
+    second = asyncio.run(Key(policy, factors).generate_key())
+    again = asyncio.run(Key(first.policy, factors).generate_key())
+    assert isinstance(first.key, bytes) and len(first.key) == policy['size']
+    assert first.key == second.key == again.key
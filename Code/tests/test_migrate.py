@@ -0,0 +1,51 @@
+import os
+import json
+
+from conftest import sample_policy
+from src.policy.binary import BinaryPolicy
+from src.policy.migrate import BINARY_SUFFIX, PolicyMigrator
+
+
+def write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(value, handle)
+
+
+def test_migrates_a_tree_and_back(tmp_path):
+    source = str(tmp_path / 'policies')
+    write_json(os.path.join(source, 'alice.json'), sample_policy())
+    write_json(os.path.join(source, 'team', 'bob.json'), dict(sample_policy(), threshold=1))
+    binary = str(tmp_path / 'binary')
+    migrator = PolicyMigrator(output=binary, verify=True)
+    assert migrator.migrate([source]) == 2 and migrator.failed == []
+    assert BinaryPolicy.load(os.path.join(binary, 'alice' + BINARY_SUFFIX)) == sample_policy()
+    assert BinaryPolicy.load(os.path.join(binary, 'team', 'bob' + BINARY_SUFFIX))['threshold'] == 1
+
+    back = str(tmp_path / 'json')
+    reverse = PolicyMigrator(output=back, to_json=True, verify=True)
+    assert reverse.migrate([binary]) == 2
+    with open(os.path.join(back, 'team', 'bob.json')) as handle:
+        assert json.load(handle) == dict(sample_policy(), threshold=1)
+
+
+def test_failures_are_recorded_and_do_not_stop_the_migration(tmp_path):
+    source = str(tmp_path / 'policies')
+    write_json(os.path.join(source, 'a.json'), sample_policy())
+    with open(os.path.join(source, 'b.json'), 'w') as handle:
+        handle.write('{not json')
+    write_json(os.path.join(source, 'c.json'), sample_policy())
+    migrator = PolicyMigrator()
+    assert migrator.migrate([source]) == 2
+    assert [os.path.basename(path) for path, _ in migrator.failed] == ['b.json']
+    assert migrator.failed[0][1].startswith('JSONDecodeError')
+    assert os.path.exists(os.path.join(source, 'a' + BINARY_SUFFIX))
+    assert os.path.exists(os.path.join(source, 'c' + BINARY_SUFFIX))
+    assert not os.path.exists(os.path.join(source, 'b' + BINARY_SUFFIX))
+
+    corrupt = os.path.join(source, 'a' + BINARY_SUFFIX)
+    with open(corrupt, 'r+b') as handle:
+        handle.truncate(10)
+    reverse = PolicyMigrator(to_json=True)
+    assert reverse.migrate([source]) == 1
+    assert reverse.failed[0][0] == corrupt and reverse.failed[0][1].startswith('ValueError')
@@ -0,0 +1,72 @@
+import os
+import base64
+import struct
+
+import pytest
+
+from src.derive.factors.offsets import TOTPOffsets
+
+# Window sizes whose encoded length leaves every base64 padding remainder.
+WINDOWS = [1, 2, 3, 10, 257]
+
+
+def window(size):
+    raw = os.urandom(4 * size)
+    return raw, [struct.unpack_from('>I', raw, 4 * index)[0] for index in range(size)]
+
+
+def sources(raw):
+    return {
+        'base64': base64.b64encode(raw).decode(),
+        'bytes': raw,
+        'bytearray': bytearray(raw),
+        'memoryview': memoryview(raw)
+    }
+
+
+@pytest.mark.parametrize('size', WINDOWS)
+def test_get_reads_every_offset_from_every_source(size):
+    raw, expected = window(size)
+    for source in sources(raw).values():
+        offsets = TOTPOffsets.wrap(source)
+        assert len(offsets) == size
+        assert [offsets.get(index) for index in range(size)] == expected
+
+
+@pytest.mark.parametrize('size', WINDOWS)
+def test_read_slices_like_the_raw_bytes(size):
+    raw, _ = window(size)
+    for source in sources(raw).values():
+        offsets = TOTPOffsets(source)
+        for first in range(-1, size + 2):
+            for last in (first, first + 1, first + 3, size, size + 5):
+                clamped_first = min(max(first, 0), size)
+                clamped_last = min(max(last, clamped_first), size)
+                assert offsets.read(first, last) == raw[4 * clamped_first:4 * clamped_last]
+
+
+def test_get_rejects_indices_outside_the_window():
+    offsets = TOTPOffsets(base64.b64encode(bytes(12)).decode())
+    for index in (-1, 3):
+        with pytest.raises(IndexError):
+            offsets.get(index)
+
+
+def test_sidecar_file_and_base64_round_trip(tmp_path):
+    raw, expected = window(100)
+    path = tmp_path / 'offsets.bin'
+    path.write_bytes(raw)
+    mapped = TOTPOffsets.from_file(str(path))
+    try:
+        assert [mapped.get(index) for index in range(100)] == expected
+        assert base64.b64decode(mapped.to_base64()) == raw
+    finally:
+        mapped.source.close()
+    text = base64.b64encode(raw).decode()
+    assert TOTPOffsets(text).to_base64() is text
+    assert TOTPOffsets.wrap(mapped) is mapped
+
+
+def test_rejects_unsupported_sources():
+    with pytest.raises(TypeError):
+        TOTPOffsets([1, 2, 3])
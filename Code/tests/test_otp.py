@@ -0,0 +1,66 @@
+import base64
+import struct
+
+import pytest
+
+from src.derive.factors.hotp import HOTP
+from src.derive.factors.otp import OTP
+
+# RFC 4226 appendix D: HOTP-SHA1 codes for counters 0 to 9.
+RFC4226_SECRET = b'12345678901234567890'
+RFC4226_CODES = [755224, 287082, 359152, 969429, 338314, 254676, 287922, 162583, 399871, 520489]
+
+# RFC 6238 appendix B: 8-digit TOTP codes with a 30 second step, by Unix time.
+RFC6238_SECRETS = {
+    'sha1': b'12345678901234567890',
+    'sha256': b'12345678901234567890123456789012',
+    'sha512': b'1234567890123456789012345678901234567890123456789012345678901234'
+}
+RFC6238_CODES = [
+    (59, {'sha1': 94287082, 'sha256': 46119246, 'sha512': 90693936}),
+    (1111111109, {'sha1': 7081804, 'sha256': 68084774, 'sha512': 25091201}),
+    (1111111111, {'sha1': 14050471, 'sha256': 67062674, 'sha512': 99943326}),
+    (1234567890, {'sha1': 89005924, 'sha256': 91819424, 'sha512': 93441116}),
+    (2000000000, {'sha1': 69279037, 'sha256': 90698825, 'sha512': 38618901}),
+    (20000000000, {'sha1': 65353130, 'sha256': 77737706, 'sha512': 47863826}),
+]
+
+
+def test_hotp_matches_rfc4226():
+    otp = OTP(RFC4226_SECRET)
+    assert [otp.code(counter) for counter in range(10)] == RFC4226_CODES
+    assert otp.codes(0, 10) == RFC4226_CODES
+    assert otp.codes(3, 5) == RFC4226_CODES[3:5]
+
+
+@pytest.mark.parametrize('seconds, codes', RFC6238_CODES)
+@pytest.mark.parametrize('algorithm', ['sha1', 'sha256', 'sha512'])
+def test_totp_matches_rfc6238(seconds, codes, algorithm):
+    otp = OTP(RFC6238_SECRETS[algorithm], algorithm, 8)
+    assert otp.code(seconds // 30) == codes[algorithm]
+    assert otp.codes(seconds // 30, seconds // 30 + 1) == [codes[algorithm]]
+
+
+def test_otp_rejects_bad_arguments():
+    with pytest.raises(TypeError):
+        OTP('12345678901234567890')
+    with pytest.raises(ValueError):
+        OTP(RFC4226_SECRET, digits=11)
+
+
+def test_hotp_factor_maps_consecutive_codes_onto_the_same_target():
+    target = 123456
+    params = {
+        'hash': 'sha1',
+        'digits': 6,
+        'pad': base64.b64encode(RFC4226_SECRET).decode(),
+        'counter': 1,
+        'offset': HOTP.mod(target - RFC4226_CODES[1], 10 ** 6)
+    }
+    for counter in range(1, 6):
+        material = HOTP(RFC4226_CODES[counter]).generate_factor(params)
+        assert material['data'] == struct.pack('>I', target)
+        params = material['params']
+        assert params['counter'] == counter + 1
+    # a used code no longer maps onto the target
+    assert HOTP(RFC4226_CODES[5]).generate_factor(params)['data'] != struct.pack('>I', target)
@@ -0,0 +1,68 @@
+import json
+
+from src.policy.compiled import CompiledPolicy
+from src.policy.plan import BASELINE_SCENARIO, BENCHMARK_SCENARIOS, FactorPlanner
+from src.setup.default import DEFAULT_FACTOR_COSTS
+
+
+def leaf(factor_id, factor_type):
+    return {'id': factor_id, 'type': factor_type, 'params': {}}
+
+
+def planned(planner, policy, ids):
+    compiled = CompiledPolicy.compile(policy)
+    factors = {factor_id: object() for factor_id in ids}
+    selected, _ = planner.select(compiled, factors)
+    return set(selected)
+
+
+def test_plan_picks_the_cheapest_factors():
+    policy = {'threshold': 1, 'factors': [leaf('totp', 'totp'), leaf('password', 'password')]}
+    assert planned(FactorPlanner(), policy, ['totp', 'password']) == {'password'}
+    assert FactorPlanner().select(CompiledPolicy.compile(policy), {}) is None
+
+
+def test_presented_stateful_factors_are_always_derived():
+    policy = {'threshold': 1, 'factors': [leaf('password', 'password'), leaf('hotp', 'hotp'), leaf('hmac', 'hmacsha1')]}
+    planner = FactorPlanner({'password': 1, 'hotp': 10, 'hmacsha1': 10})
+    assert planned(planner, policy, ['password', 'hotp']) == {'hotp'}
+    assert planned(planner, policy, ['password', 'hotp', 'hmac']) == {'hotp', 'hmac'}
+    assert planned(planner, policy, ['password']) == {'password'}
+
+
+def test_stacks_holding_presented_stateful_factors_are_derived():
+    inner = {'threshold': 1, 'factors': [leaf('hotp', 'hotp')]}
+    policy = {'threshold': 1, 'factors': [leaf('password', 'password'), {'id': 'inner', 'type': 'stack', 'params': inner}]}
+    compiled = CompiledPolicy.compile(policy)
+    selected, levels = FactorPlanner().select(compiled, {'password': object(), 'hotp': object()})
+    assert set(selected) == {'hotp'}
+    assert levels == (1 << len(compiled.levels)) - 1
+
+
+def write_results(tmp_path, derive):
+    results = [{'name': name, 'derive': {'p50_ns': p50, 'p99_ns': p99}} for name, (p50, p99) in derive.items()]
+    path = tmp_path / 'results.json'
+    path.write_text(json.dumps({'results': results}))
+    return str(path)
+
+
+def test_from_benchmark_keeps_defaults_within_noise(tmp_path):
+    path = write_results(tmp_path, {
+        BASELINE_SCENARIO: (28000000, 33000000),
+        BENCHMARK_SCENARIOS['password']: (28950000, 32000000),
+        BENCHMARK_SCENARIOS['totp']: (28290000, 36000000),
+        BENCHMARK_SCENARIOS['stack']: (55000000, 63000000)
+    })
+    assert FactorPlanner.from_benchmark(path).costs == DEFAULT_FACTOR_COSTS
+
+
+def test_from_benchmark_uses_significant_differences(tmp_path):
+    path = write_results(tmp_path, {
+        BASELINE_SCENARIO: (1000000, 1100000),
+        BENCHMARK_SCENARIOS['password']: (2000000, 2100000),
+        BENCHMARK_SCENARIOS['totp']: (5000000, 5100000),
+        BENCHMARK_SCENARIOS['stack']: (30000000, 31000000)
+    })
+    costs = FactorPlanner.from_benchmark(path).costs
+    assert costs['password'] == 1000000 and costs['totp'] == 4000000
+    assert costs['stack'] == 28000000 and costs['question'] == 1000000
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from src.setup.scheduler import BASELINE, KDFScheduler
+
+MIB = 1024 * 1024
+
+
+class BlockingKDF:
+    """
+    A stand-in KeyDerivationFunction charging an argon2 memory cost and finishing when released.
+    """
+    def __init__(self, name, memory_mib, started):
+        self.name = name
+        self.options = {'type': 'argon2id', 'params': {'memory': memory_mib * 1024}}
+        self.size = 32
+        self.started = started
+        self.done = asyncio.Event()
+
+    async def derive(self, executor):
+        self.started.append(self.name)
+        await self.done.wait()
+        return self.name
+
+
+def need(memory_mib):
+    return KDFScheduler.estimate({'type': 'argon2id', 'params': {'memory': memory_mib * 1024}}, 32)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_estimates_by_backend():
+    assert need(64) == BASELINE + 64 * MIB + 32
+    assert KDFScheduler.estimate({'type': 'scrypt', 'params': {'rounds': 16384, 'blocksize': 8, 'parallelism': 1}}) == BASELINE + 128 * 8 * 16385
+    assert KDFScheduler.estimate({'type': 'pbkdf2', 'params': {}}, 32) == BASELINE + 32
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    async def main():
+        started = []
+        scheduler = KDFScheduler(budget=need(64) + need(8))
+        big = BlockingKDF('big', 64, started)
+        large = BlockingKDF('large', 64, started)
+        small = BlockingKDF('small', 8, started)
+        later = BlockingKDF('later', 8, started)
+        tasks = [asyncio.create_task(scheduler.derive(kdf)) for kdf in (big, large, small)]
+        await settle()
+        # 'small' fits next to 'big' but must not overtake 'large', which queued first
+        assert started == ['big']
+        assert scheduler.metrics()['queued'] == 2
+        tasks.append(asyncio.create_task(scheduler.derive(later)))
+        big.done.set()
+        await settle()
+        assert started == ['big', 'large', 'small']
+        assert scheduler.metrics()['in_use'] == need(64) + need(8)
+        for kdf in (large, small, later):
+            kdf.done.set()
+        assert await asyncio.gather(*tasks) == ['big', 'large', 'small', 'later']
+        assert started == ['big', 'large', 'small', 'later']
+        metrics = scheduler.metrics()
+        assert metrics['in_use'] == 0 and metrics['running'] == 0 and metrics['admitted'] == 4
+        assert metrics['peak'] <= scheduler.budget
+    asyncio.run(main())
+
+
+def test_admission_times_out_and_frees_its_place():
+    async def main():
+        started = []
+        scheduler = KDFScheduler(budget=need(64), timeout=0.01)
+        holder = BlockingKDF('holder', 64, started)
+        waiting = BlockingKDF('waiting', 8, started)
+        task = asyncio.create_task(scheduler.derive(holder))
+        await settle()
+        with pytest.raises(TimeoutError):
+            await scheduler.derive(waiting)
+        assert scheduler.metrics()['timeouts'] == 1 and scheduler.metrics()['queued'] == 0
+        holder.done.set()
+        await task
+        waiting.done.set()
+        assert await scheduler.derive(waiting, timeout=1) == 'waiting'
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_block_the_queue():
+    async def main():
+        started = []
+        scheduler = KDFScheduler(budget=need(64))
+        holder = BlockingKDF('holder', 64, started)
+        cancelled = BlockingKDF('cancelled', 64, started)
+        behind = BlockingKDF('behind', 8, started)
+        first = asyncio.create_task(scheduler.derive(holder))
+        await settle()
+        second = asyncio.create_task(scheduler.derive(cancelled))
+        third = asyncio.create_task(scheduler.derive(behind))
+        await settle()
+        second.cancel()
+        holder.done.set()
+        behind.done.set()
+        assert await third == 'behind'
+        await first
+        assert started == ['holder', 'behind']
+        assert second.cancelled()
+    asyncio.run(main())
+
+
+def test_rejects_derivations_over_the_budget():
+    async def main():
+        scheduler = KDFScheduler(budget=need(8))
+        with pytest.raises(ValueError):
+            await scheduler.derive(BlockingKDF('huge', 64, []))
+    asyncio.run(main())
+    with pytest.raises(ValueError):
+        KDFScheduler(budget=0)
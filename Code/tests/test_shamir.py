@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+if SOURCE_ROOT not in sys.path:
+    sys.path.insert(0, SOURCE_ROOT)
+
+from src.secrets.shamir import ShamirContext, PRIMITIVES, build_tables
+from src.secrets.combine import SecretCombiner
+from src.secrets.recover import SecretRecoverer
+
+# (k, n) policies spanning every field bits_for(n) picks for n <= 255: GF(8) up to GF(512).
+POLICIES = [(2, 3), (3, 5), (4, 7), (3, 10), (5, 16), (8, 40), (2, 100), (3, 200), (2, 255)]
+
+# Shares produced by a string-based transliteration of secrets.js: (k, n, secret, present shares by x,
+# missing x, the share secrets.newShare regenerates for it).
+KNOWN_ANSWERS = [
+    (2, 3, bytes(range(1, 17)), {1: '015fdea56c35407448f845c405e0d0ea44', 3: '01e82be9e4797ccac9a8103f82a9241227'}, 2, '0001b6f74f8c493ab989595ff08b44faf773'),
+    (3, 10, b'skdf-known-answer', {1: '0a5f355c38142a322a56aaf42ac883844722', 6: '01b6ccbcf12e49a2f7ff7e5d760dec0e798b', 7: '0a9a9284af1708feb2deba843dab1cfd5bdb'}, 2, '0037d91f74dcd2a9288799f67159270ba111'),
+    (2, 200, b'\x00\x01\xfe\xff', {97: 'ed55e08266', 149: '2d87a70d91'}, 1, '5c6bc872fb'),
+    (2, 255, b'\xa5\xa5\xa5\xa5\xa5\xa5', {160: '17eb4c857c8637', 245: '39423a48ba2fdb'}, 1, '000a33051e39ac0b'),
+]
+
+
+def trial(contexts, seed, size):
+    """
+    Splits a random secret under a random policy, then combines and recovers it from a random subset of k
+    shares, through the policy's own test context or, for odd seeds, the shared one.
+
+    Parameters:
+        contexts (dict): The test ShamirContext objects by field size.
+        seed (int): The seed for choosing the policy and presented shares.
+        size (int): The secret size (bytes).
+
+    Returns:
+        str: A description of the failure, or None if the trial passed.
+    """
+    rng = random.Random(seed)
+    k, n = rng.choice(POLICIES)
+    context = contexts[ShamirContext.bits_for(n)] if seed % 2 == 0 else None
+    secret = os.urandom(size)
+    shares = (context or ShamirContext.shared(ShamirContext.bits_for(n))).split(secret, k, n)
+    present = set(rng.sample(range(n), k))
+    presented = [share if index in present else None for index, share in enumerate(shares)]
+
+    if SecretCombiner(presented, k, n, context).combine() != secret:
+        return f'combine mismatch: k={k} n={n} seed={seed}'
+    recovered = SecretRecoverer(presented, k, n, context).recover()
+    if [int.from_bytes(share, 'big') for share in recovered] != [int.from_bytes(share, 'big') for share in shares]:
+        return f'recover mismatch: k={k} n={n} seed={seed}'
+    return None
+
+
+@pytest.mark.parametrize('bits', sorted(PRIMITIVES))
+def test_primitive_polynomials(bits):
+    exp, log = build_tables(bits, PRIMITIVES[bits])
+    assert sorted(exp[:(1 << bits) - 1]) == list(range(1, 1 << bits))
+
+
+@pytest.mark.parametrize('k, n, secret, present, missing, regenerated', KNOWN_ANSWERS)
+def test_secrets_js_shares(k, n, secret, present, missing, regenerated):
+    shares = [bytes.fromhex(present[x]) if x in present else None for x in range(1, n + 1)]
+    assert SecretCombiner(shares, k, n).combine() == secret
+    assert SecretRecoverer(shares, k, n).recover()[missing - 1] == bytes.fromhex(regenerated)
+
+
+@pytest.mark.parametrize('k, n', POLICIES)
+def test_round_trip(k, n):
+    for size in (1, 16, 32, 33):
+        assert trial({}, 2 * size + 1, size) is None
+
+
+def test_mixed_fields_across_threads():
+    # Small caches force coefficient evictions while other threads are reading them.
+    contexts = {bits: ShamirContext(bits, cache_size=4) for bits in {ShamirContext.bits_for(n) for _, n in POLICIES}}
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        failures = [failure for failure in pool.map(lambda seed: trial(contexts, seed, 32), range(2000)) if failure]
+    assert failures == []
+
+
+@pytest.mark.parametrize('cls', [SecretCombiner, SecretRecoverer])
+def test_n_is_limited_to_the_largest_secrets_js_field(cls):
+    assert ShamirContext.bits_for(1048574) == 20
+    cls([b'\x01'], 1, 1048574)
+    with pytest.raises(ValueError, match='at most 1048574'):
+        cls([b'\x01'], 1, 1048575)
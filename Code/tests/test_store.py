@@ -0,0 +1,139 @@
+import os
+import asyncio
+
+import pytest
+
+from conftest import constant_factor, make_policy
+from src.policy.store import LOG_NAME, PolicyStore
+
+
+def policy_for(salt='c2FsdA=='):
+    policy, _ = make_policy(1, [('password', 'password', b'hunter2', {})])
+    policy['salt'] = salt
+    return policy
+
+
+def test_put_get_and_reopen_replays_the_log(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy_for('YWxpY2U='))
+        store.put('bob', policy_for('Ym9i'))
+        store.put('alice', policy_for('YWxpY2Uy'))
+        version = store.version('alice')
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.get('alice')['salt'] == 'YWxpY2Uy'
+        assert store.get('bob')['salt'] == 'Ym9i'
+        assert store.get('carol') is None
+        assert store.version('alice') == version
+
+
+def test_versions_only_grow_and_survive_compaction(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy_for())
+        first = store.version('alice')
+        store.put('alice', policy_for())
+        second = store.version('alice')
+        assert second > first
+        store.compact()
+        assert store.version('alice') == second
+        assert store.metrics()['compactions'] == 1 and store.metrics()['dead_bytes'] == 0
+        store.put('bob', policy_for())
+        assert store.version('bob') > second
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.version('alice') == second
+        assert store.metrics()['indexed'] == 1
+
+
+def test_compaction_keeps_only_live_records(tmp_path):
+    with PolicyStore(str(tmp_path), compact_min=0) as store:
+        for salt in ('YQ==', 'Yg==', 'Yw=='):
+            store.put('alice', policy_for(salt))
+        store.put('bob', policy_for())
+        store.delete('bob')
+        store.compact()
+        assert store.get('alice')['salt'] == 'Yw=='
+        assert store.get('bob') is None
+        size = store.metrics()['log_bytes']
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.get('alice')['salt'] == 'Yw=='
+        assert store.get('bob') is None
+        assert store.metrics()['log_bytes'] == size
+
+
+def test_put_with_a_stale_version_is_rejected(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.put('alice', policy_for('YQ=='), version=0)
+        assert not store.put('alice', policy_for('Yg=='), version=0)
+        version = store.version('alice')
+        assert store.put('alice', policy_for('Yw=='), version=version)
+        assert not store.put('alice', policy_for('ZA=='), version=version)
+        assert store.get('alice')['salt'] == 'Yw=='
+
+
+def test_delete_is_replayed_and_never_reuses_a_version(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy_for())
+        version = store.version('alice')
+        assert store.delete('alice')
+        assert not store.delete('alice')
+        assert store.get('alice') is None and store.version('alice') == 0
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.get('alice') is None
+        store.put('alice', policy_for())
+        assert store.version('alice') > version
+
+
+def test_torn_record_is_truncated_on_open(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy_for())
+        size = store.metrics()['log_bytes']
+        store.put('bob', policy_for())
+    path = os.path.join(str(tmp_path), LOG_NAME)
+    os.truncate(path, os.path.getsize(path) - 3)
+    with PolicyStore(str(tmp_path)) as store:
+        assert store.get('alice') is not None
+        assert store.get('bob') is None
+        assert store.metrics()['log_bytes'] == size
+
+
+def test_put_and_update_validate_the_policy(tmp_path):
+    with PolicyStore(str(tmp_path)) as store:
+        with pytest.raises(TypeError):
+            store.put('alice', {'threshold': 1})
+        store.put('alice', policy_for())
+        with pytest.raises(TypeError):
+            store.update('alice', lambda policy: dict(policy, threshold='one'))
+        assert store.get('alice')['threshold'] == 1
+        store.update('alice', lambda policy: dict(policy, salt='Yg=='))
+        assert store.get('alice')['salt'] == 'Yg=='
+        assert store.update('alice', lambda policy: None) is None
+        assert store.get('alice') is None
+
+
+def test_derive_stores_nothing_until_committed(tmp_path):
+    pytest.importorskip('argon2')
+    policy, secret = make_policy(1, [('password', 'password', b'hunter2', {})])
+    factors = {'password': constant_factor('password', b'hunter2')}
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy)
+        before = store.version('alice')
+        result, version = asyncio.run(store.derive('alice', factors))
+        assert result.secret == secret and version == before
+        assert store.version('alice') == before
+        store.commit('alice', result, version)
+        assert store.version('alice') > before
+        with pytest.raises(KeyError):
+            asyncio.run(store.derive('bob', factors))
+
+
+def test_commit_raises_if_the_policy_changed(tmp_path):
+    pytest.importorskip('argon2')
+    policy, _ = make_policy(1, [('password', 'password', b'hunter2', {})])
+    factors = {'password': constant_factor('password', b'hunter2')}
+    with PolicyStore(str(tmp_path)) as store:
+        store.put('alice', policy)
+        result, version = asyncio.run(store.derive('alice', factors))
+        store.put('alice', policy)
+        current = store.version('alice')
+        with pytest.raises(RuntimeError):
+            store.commit('alice', result, version)
+        assert store.version('alice') == current
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.derive.factors.strength import LazyStrength, StrengthEstimate
+
+ESTIMATE = {'score': 3, 'guesses': 1000}
+
+
+class Text(StrengthEstimate):
+    STRENGTH_OF = 'text'
+
+    def __init__(self, estimate='lazy'):
+        self.text = 'correct horse'
+        self.runs = 0
+        self.init_strength(estimate)
+
+    @property
+    def strength(self):
+        if self._strength is None and self.estimate != 'skip':
+            self.runs += 1
+            self._strength = ESTIMATE
+        return self._strength
+
+
+def lazy():
+    factor = Text()
+    return factor, factor.get_output()
+
+
+@pytest.mark.parametrize('read', [
+    lambda output: dict(output),
+    lambda output: {**output},
+    lambda output: dict(**output),
+    lambda output: (lambda target: target.update(output) or target)({}),
+    lambda output: {key: output[key] for key in output},
+    lambda output: {key: output[key] for key in output.keys()},
+    lambda output: dict(output.items()),
+    lambda output: output.copy(),
+    lambda output: json.loads(json.dumps(output)),
+], ids=['dict', 'unpack', 'kwargs', 'update', 'iter', 'keys', 'items', 'copy', 'json'])
+def test_every_copy_sees_the_estimate(read):
+    factor, output = lazy()
+    assert isinstance(output, LazyStrength) and factor.runs == 0
+    assert read(output) == {'strength': ESTIMATE}
+    assert factor.runs == 1
+
+
+def test_reads_estimate_once():
+    factor, output = lazy()
+    assert 'strength' in output
+    assert output['strength'] == ESTIMATE and output.get('strength') == ESTIMATE
+    assert output == {'strength': ESTIMATE}
+    assert factor.runs == 1
+
+
+def test_estimate_modes():
+    assert Text('eager').runs == 1
+    skipped = Text('skip')
+    assert skipped.get_output() == {} and skipped.strength is None and skipped.runs == 0
+    with pytest.raises(ValueError):
+        Text('later')
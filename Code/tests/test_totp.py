@@ -0,0 +1,72 @@
+import base64
+import struct
+
+import pytest
+
+from src.derive.factors.otp import OTP
+from src.derive.factors.totp import TOTP
+
+PAD = b'12345678901234567890'
+STEP = 30
+START = 1111111109 * 1000  # ms, inside RFC 6238's test range
+TARGET = 424242
+
+
+def offsets_for(start_ms, window, target=TARGET, digits=6):
+    counter = start_ms // (STEP * 1000)
+    codes = OTP(PAD, 'sha1', digits).codes(counter, counter + window)
+    return b''.join(struct.pack('>I', TOTP.mod(target - code, 10 ** digits)) for code in codes)
+
+
+def params_for(start_ms, window, raw=False):
+    offsets = offsets_for(start_ms, window)
+    return {
+        'start': start_ms,
+        'hash': 'sha1',
+        'digits': 6,
+        'step': STEP,
+        'window': window,
+        'pad': PAD if raw else base64.b64encode(PAD).decode(),
+        'offsets': offsets if raw else base64.b64encode(offsets).decode()
+    }
+
+
+def derive(params, elapsed_steps):
+    now = params['start'] + elapsed_steps * STEP * 1000
+    code = OTP(PAD, 'sha1', 6).code(now // (STEP * 1000))
+    material = TOTP(code, {'time': now}).generate_factor(params)
+    return material['data'], material['params']()
+
+
+@pytest.mark.parametrize('elapsed', [0, 1, 7, 19])
+@pytest.mark.parametrize('raw', [False, True])
+def test_slid_window_equals_a_full_recompute(elapsed, raw):
+    params = params_for(START, 20, raw)
+    data, new_params = derive(params, elapsed)
+    assert data == struct.pack('>I', TARGET)
+    expected = offsets_for(new_params['start'], 20)
+    if raw:
+        assert new_params['offsets'] == expected
+    else:
+        assert base64.b64decode(new_params['offsets']) == expected
+    assert new_params['start'] == START + elapsed * STEP * 1000
+
+
+def test_consecutive_derives_keep_the_target():
+    params = params_for(START, 10)
+    for elapsed in (3, 1, 9, 0, 5):
+        data, params = derive(params, elapsed)
+        assert data == struct.pack('>I', TARGET)
+
+
+def test_window_exceeded():
+    params = params_for(START, 5)
+    with pytest.raises(ValueError):
+        derive(params, 5)
+    assert derive(params, 4)[0] == struct.pack('>I', TARGET)
+
+
+def test_wrong_code_misses_the_target():
+    params = params_for(START, 5)
+    material = TOTP(0, {'time': START}).generate_factor(params)
+    assert material['data'] != struct.pack('>I', TARGET)
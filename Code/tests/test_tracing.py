@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from conftest import make_policy
+from src.derive.factors.password import Password
+from src.derive.key import Key
+from src.tracing.spans import NULL_SPAN, CallbackSubscriber, Tracer
+
+
+@pytest.fixture
+def spans():
+    ended = []
+    subscriber = Tracer.subscribe(CallbackSubscriber(end=ended.append))
+    yield ended
+    Tracer.unsubscribe(subscriber)
+
+
+def test_no_subscribers_means_no_spans():
+    assert not Tracer.enabled()
+    assert Tracer.span('phase', k=1) is NULL_SPAN
+    with Tracer.span('phase') as span:
+        span.set('ignored', True)
+
+
+def test_spans_nest_time_and_record_errors(spans):
+    with Tracer.span('outer', k=2) as outer:
+        with Tracer.span('inner') as inner:
+            inner.set('bytes', 32)
+        with pytest.raises(KeyError):
+            with Tracer.span('failing'):
+                raise KeyError('boom')
+    assert [span.name for span in spans] == ['inner', 'failing', 'outer']
+    assert inner.parent is outer and outer.parent is None
+    assert inner.attributes == {'bytes': 32} and outer.attributes == {'k': 2}
+    assert isinstance(spans[1].error, KeyError) and outer.error is None
+    assert all(span.duration_ns >= 0 for span in spans)
+    assert outer.start_ns <= inner.start_ns and inner.end_ns <= outer.end_ns
+
+
+def test_parents_follow_tasks_and_threads(spans):
+    def work():
+        with Tracer.span('thread'):
+            pass
+
+    async def child():
+        with Tracer.span('task'):
+            await asyncio.to_thread(work)
+
+    async def main():
+        with Tracer.span('root') as root:
+            await asyncio.gather(child(), child())
+        return root
+
+    root = asyncio.run(main())
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span.name, []).append(span)
+    assert len(by_name['task']) == 2 and all(span.parent is root for span in by_name['task'])
+    assert {span.parent for span in by_name['thread']} == set(by_name['task'])
+
+
+def test_traced_wraps_functions_and_coroutines(spans):
+    @Tracer.traced('sync.phase', kind='sync')
+    def double(value):
+        return value * 2
+
+    @Tracer.traced('async.phase', kind='async')
+    async def triple(value):
+        return value * 3
+
+    assert double(2) == 4 and asyncio.run(triple(2)) == 6
+    assert [(span.name, span.attributes) for span in spans] == [('sync.phase', {'kind': 'sync'}), ('async.phase', {'kind': 'async'})]
+    Tracer.unsubscribe(Tracer.subscribers[0])
+    assert double(3) == 6 and len(spans) == 2
+
+
+def test_unsubscribed_subscriber_still_sees_open_spans_end(spans):
+    late = []
+    subscriber = Tracer.subscribe(CallbackSubscriber(end=late.append))
+    with Tracer.span('open'):
+        Tracer.unsubscribe(subscriber)
+    assert [span.name for span in late] == ['open']
+
+
+def test_derive_reports_its_phases(spans):
+    pytest.importorskip('argon2')
+    policy, secret = make_policy(1, [('password', 'password', b'hunter2', {})])
+
+    async def password(params):
+        return await Password('hunter2', estimate='skip').generate_factor(params)
+
+    result = asyncio.run(Key(policy, {'password': password}).generate_key())
+    assert result.secret == secret
+    names = {span.name for span in spans}
+    assert {'key.generate', 'key.material', 'factor.generate', 'kdf.derive'} <= names
+    generate = next(span for span in spans if span.name == 'key.generate')
+    assert generate.attributes['k'] == 1 and generate.attributes['n'] == 1
+    assert all(span.parent is not None for span in spans if span is not generate)
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from src.secrets.xor import NUMPY_THRESHOLD, xor
+
+# Sizes on both sides of the NumPy threshold, and the empty buffer.
+SIZES = [0, 1, 31, 32, NUMPY_THRESHOLD - 1, NUMPY_THRESHOLD, 3 * NUMPY_THRESHOLD + 5]
+
+
+def reference(a, b):
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_xor_matches_the_byte_loop(size):
+    a, b = os.urandom(size), os.urandom(size)
+    assert xor(a, b) == reference(a, b)
+    assert xor(xor(a, b), b) == a
+    assert xor(a, bytes(size)) == a
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_xor_in_place_writes_into_a(size):
+    a, b = bytearray(os.urandom(size)), os.urandom(size)
+    expected = reference(a, b)
+    assert xor(a, b, inplace=True) is a
+    assert a == expected
+
+
+@pytest.mark.parametrize('size', [16, NUMPY_THRESHOLD + 16])
+def test_xor_uses_the_common_prefix_and_accepts_views(size):
+    a, b = os.urandom(size), os.urandom(size - 7)
+    assert xor(a, b) == reference(a, b) == xor(memoryview(a), bytearray(b))
+    target = bytearray(a)
+    xor(memoryview(target)[:size - 3], b, inplace=True)
+    assert target == reference(a, b) + a[size - 7:]
+
+
+@pytest.mark.parametrize('size', [16, NUMPY_THRESHOLD])
+def test_xor_in_place_rejects_read_only_buffers(size):
+    with pytest.raises(TypeError):
+        xor(bytes(size), bytes(size), inplace=True)
+    with pytest.raises(TypeError):
+        xor(memoryview(bytes(size)), bytes(size), inplace=True)